@@ -0,0 +1,245 @@
+import asyncio
+import math
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from enum import IntEnum
+from typing import AsyncIterator, Deque, Dict, Optional, Tuple
+
+from fastapi import HTTPException, Request, status
+
+from app.auth import get_user_from_token
+from app.core.config import settings
+from app.metrics import ADMISSION_ACTIVE, ADMISSION_QUEUE_DEPTH, ADMISSION_REJECTED, ADMISSION_WAIT_SECONDS
+
+class Priority(IntEnum):
+    """Work classes for parse/embed admission. Lower values are served first."""
+    INTERACTIVE = 0
+    BULK = 1
+
+    @property
+    def label(self) -> str:
+        return self.name.lower()
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def try_acquire(self, cost: float = 1.0) -> Tuple[bool, float]:
+        """Takes cost tokens if available. Returns (admitted, seconds until enough tokens would be available)."""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        # A request larger than the bucket can still go through once the bucket is full.
+        cost = min(cost, self.capacity)
+        if self.tokens >= cost:
+            self.tokens -= cost
+            return True, 0.0
+        return False, (cost - self.tokens) / self.rate if self.rate > 0 else float("inf")
+
+class _Waiter:
+    __slots__ = ("client", "future", "enqueued_at")
+
+    def __init__(self, client: str, future: asyncio.Future):
+        self.client = client
+        self.future = future
+        self.enqueued_at = time.monotonic()
+
+def _retry_after_header(seconds: float) -> Dict[str, str]:
+    return {"Retry-After": str(max(1, math.ceil(seconds)))}
+
+class AdmissionController:
+    """
+    Admission control for CPU-heavy parse/embed work, so bulk uploads cannot
+    starve cheap endpoints:
+
+    - a token bucket per (client, priority) limits how fast a client may submit work (429);
+    - at most max_concurrent units of work run at once, of which bulk work may
+      use all but reserved_interactive, and one client at most per_client_concurrent;
+    - work over those limits waits in a bounded FIFO queue per priority, served
+      interactive first; a full queue or a wait longer than queue_timeout is
+      rejected with 503.
+
+    All state lives on the event loop, so no locking is needed.
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int,
+        reserved_interactive: int,
+        per_client_concurrent: int,
+        max_queue_depth: int,
+        queue_timeout: float,
+        rates: Dict[Priority, Tuple[float, float]],
+        max_clients: int = 10_000,
+    ):
+        self.max_concurrent = max(1, max_concurrent)
+        self.reserved_interactive = min(max(0, reserved_interactive), self.max_concurrent - 1)
+        self.per_client_concurrent = max(1, per_client_concurrent)
+        self.max_queue_depth = max_queue_depth
+        self.queue_timeout = queue_timeout
+        self.rates = rates
+        self.max_clients = max_clients
+        self._buckets: "OrderedDict[Tuple[str, Priority], TokenBucket]" = OrderedDict()
+        self._queues: Dict[Priority, Deque[_Waiter]] = {priority: deque() for priority in Priority}
+        self._active: Dict[Priority, int] = {priority: 0 for priority in Priority}
+        self._active_by_client: Dict[str, int] = {}
+        # Smoothed seconds per unit of work, used to estimate Retry-After.
+        self._work_seconds: Dict[Priority, float] = {priority: 1.0 for priority in Priority}
+
+    def _limit(self, priority: Priority) -> int:
+        return self.max_concurrent if priority == Priority.INTERACTIVE else self.max_concurrent - self.reserved_interactive
+
+    def _total_active(self) -> int:
+        return sum(self._active.values())
+
+    def _can_run(self, priority: Priority, client: str) -> bool:
+        return (
+            self._total_active() < self.max_concurrent
+            and self._active[priority] < self._limit(priority)
+            and self._active_by_client.get(client, 0) < self.per_client_concurrent
+        )
+
+    def _estimated_wait(self, priority: Priority) -> float:
+        ahead = sum(len(self._queues[p]) for p in Priority if p <= priority) + 1
+        return ahead * self._work_seconds[priority] / max(1, self._limit(priority))
+
+    def _reject(self, priority: Priority, reason: str, status_code: int, detail: str, retry_after: float) -> HTTPException:
+        ADMISSION_REJECTED.inc(priority=priority.label, reason=reason)
+        return HTTPException(status_code=status_code, detail=detail, headers=_retry_after_header(retry_after))
+
+    def check_rate(self, client: str, priority: Priority, cost: float = 1.0) -> None:
+        """Charges cost tokens to the client's bucket, or raises 429 with Retry-After."""
+        rate, burst = self.rates[priority]
+        if rate <= 0:
+            return
+        key = (client, priority)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = TokenBucket(rate, burst)
+            if len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+        admitted, retry_after = bucket.try_acquire(cost)
+        if not admitted:
+            raise self._reject(priority, "rate_limited", status.HTTP_429_TOO_MANY_REQUESTS, "Rate limit exceeded. Please retry later.", retry_after)
+
+    def _take(self, priority: Priority, client: str) -> None:
+        self._active[priority] += 1
+        self._active_by_client[client] = self._active_by_client.get(client, 0) + 1
+        ADMISSION_ACTIVE.set(self._active[priority], priority=priority.label)
+
+    def _release(self, priority: Priority, client: str, seconds: float) -> None:
+        self._active[priority] -= 1
+        remaining = self._active_by_client[client] - 1
+        if remaining:
+            self._active_by_client[client] = remaining
+        else:
+            del self._active_by_client[client]
+        ADMISSION_ACTIVE.set(self._active[priority], priority=priority.label)
+        self._work_seconds[priority] = 0.8 * self._work_seconds[priority] + 0.2 * seconds
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        """Hands free slots to queued work, interactive first, FIFO within a priority."""
+        for priority in Priority:
+            queue = self._queues[priority]
+            blocked: Deque[_Waiter] = deque()
+            while queue and self._total_active() < self.max_concurrent and self._active[priority] < self._limit(priority):
+                waiter = queue.popleft()
+                if waiter.future.done():
+                    continue
+                if self._active_by_client.get(waiter.client, 0) >= self.per_client_concurrent:
+                    blocked.append(waiter)
+                    continue
+                self._take(priority, waiter.client)
+                waiter.future.set_result(None)
+            queue.extendleft(reversed(blocked))
+            ADMISSION_QUEUE_DEPTH.set(len(queue), priority=priority.label)
+
+    async def _acquire(self, priority: Priority, client: str) -> None:
+        queue = self._queues[priority]
+        if not any(self._queues[p] for p in Priority if p <= priority) and self._can_run(priority, client):
+            self._take(priority, client)
+            return
+        if len(queue) >= self.max_queue_depth:
+            raise self._reject(priority, "queue_full", status.HTTP_503_SERVICE_UNAVAILABLE, "Server is busy. Please retry later.", self._estimated_wait(priority))
+
+        waiter = _Waiter(client, asyncio.get_running_loop().create_future())
+        queue.append(waiter)
+        # Slots may be free while earlier waiters are held back by their per-client limit.
+        self._dispatch()
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter.future), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            if waiter.future.done():
+                # Granted just as the timeout fired; keep the slot.
+                return
+            waiter.future.cancel()
+            raise self._reject(priority, "queue_timeout", status.HTTP_503_SERVICE_UNAVAILABLE, "Server is busy. Please retry later.", self._estimated_wait(priority))
+        except asyncio.CancelledError:
+            if waiter.future.done() and not waiter.future.cancelled():
+                self._release(priority, client, 0.0)
+            else:
+                waiter.future.cancel()
+            raise
+        finally:
+            if waiter in queue:
+                queue.remove(waiter)
+            ADMISSION_QUEUE_DEPTH.set(len(queue), priority=priority.label)
+        ADMISSION_WAIT_SECONDS.observe(time.monotonic() - waiter.enqueued_at, priority=priority.label)
+
+    @asynccontextmanager
+    async def slot(self, client: str, priority: Priority) -> AsyncIterator[None]:
+        """Holds one unit of parse/embed concurrency for the duration of the block."""
+        await self._acquire(priority, client)
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self._release(priority, client, time.monotonic() - start)
+
+    def snapshot(self) -> Dict[str, Dict[str, int]]:
+        return {
+            priority.label: {"active": self._active[priority], "queued": len(self._queues[priority])}
+            for priority in Priority
+        }
+
+class ClientKey(str):
+    """
+    Per-client admission key. Compares and hashes as the client's identity
+    alone; the self-reported X-Client-Id travels with it as `label`, so it can
+    tell a client's callers apart without splitting its limits across buckets.
+    """
+
+    def __new__(cls, identity: str, label: Optional[str] = None) -> "ClientKey":
+        key = super().__new__(cls, identity)
+        key.label = label
+        return key
+
+def client_key(request: Request) -> ClientKey:
+    """
+    Identifies the client for per-client limits: the authenticated user when
+    the request carries a valid bearer token, else the remote address.
+    X-Client-Id is only the key's label, since any caller can set it.
+    """
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    user = get_user_from_token(token.strip()) if scheme.lower() == "bearer" and token.strip() else None
+    identity = f"user:{user.id}" if user is not None else f"addr:{request.client.host if request.client else 'unknown'}"
+    return ClientKey(identity, request.headers.get("x-client-id"))
+
+admission_controller = AdmissionController(
+    max_concurrent=settings.ADMISSION_MAX_CONCURRENT,
+    reserved_interactive=settings.ADMISSION_RESERVED_INTERACTIVE,
+    per_client_concurrent=settings.ADMISSION_PER_CLIENT_CONCURRENT,
+    max_queue_depth=settings.ADMISSION_MAX_QUEUE_DEPTH,
+    queue_timeout=settings.ADMISSION_QUEUE_TIMEOUT_SECONDS,
+    rates={
+        Priority.INTERACTIVE: (settings.ADMISSION_INTERACTIVE_RATE, settings.ADMISSION_INTERACTIVE_BURST),
+        Priority.BULK: (settings.ADMISSION_BULK_RATE, settings.ADMISSION_BULK_BURST),
+    },
+)
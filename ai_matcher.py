@@ -1,29 +1,61 @@
-from sentence_transformers import SentenceTransformer
 from sklearn.metrics.pairwise import cosine_similarity
-from app.schemas import CandidateProfile, Education, Experience, JobDescription
-from typing import List, Dict
+from app.schemas import CandidateProfile, Education, Experience, JobDescription, CANDIDATE_SUMMARY_FIELDS
+from typing import List, Dict, Optional, Tuple
 import numpy as np
 import re
-
-model_name = "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"
-try:
-    sentence_transformer_model = SentenceTransformer(model_name)
-    EMBEDDING_DIMENSION = sentence_transformer_model.get_sentence_embedding_dimension()
-except Exception as e:
-    print(f"Error loading SentenceTransformer model '{model_name}': {e}")
-    print("Please ensure you have an internet connection or the model is cached.")
-    sentence_transformer_model = None
-    EMBEDDING_DIMENSION = 384
-
+from app.core.config import settings
+from app.embedding_backends import EmbeddingBackend, create_embedding_backend
+from app.metrics import EMBEDDING_BATCH_SIZE, timed_stage
+
+def load_embedding_backend(name: str = "") -> Optional[EmbeddingBackend]:
+    name = name or settings.EMBEDDING_BACKEND
+    try:
+        return create_embedding_backend(settings, name)
+    except Exception as e:
+        print(f"Error loading embedding backend '{name}' ({settings.EMBEDDING_MODEL_NAME}): {e}")
+        if name == "sentence-transformers":
+            print("Please ensure you have an internet connection or the model is cached.")
+            return None
+    print("Falling back to the sentence-transformers backend.")
+    return load_embedding_backend("sentence-transformers")
+
+embedding_backend = load_embedding_backend()
+EMBEDDING_DIMENSION = embedding_backend.dimension if embedding_backend is not None else settings.EMBEDDING_DIMENSION
+
+def set_embedding_backend(backend: EmbeddingBackend) -> None:
+    """Swaps the active backend (benchmarks, comparisons). Existing embeddings are not recomputed."""
+    global embedding_backend, EMBEDDING_DIMENSION
+    embedding_backend = backend
+    EMBEDDING_DIMENSION = backend.dimension
+
+@timed_stage("embedding")
 def generate_text_embedding(text: str) -> List[float]:
-    if sentence_transformer_model is None:
-        print("Warning: SentenceTransformer model not loaded. Returning zero embedding.")
+    if embedding_backend is None:
+        print("Warning: Embedding model not loaded. Returning zero embedding.")
         return np.zeros(EMBEDDING_DIMENSION).tolist()
 
     if not text or not isinstance(text, str) or not text.strip():
         return np.zeros(EMBEDDING_DIMENSION).tolist()
     
-    return sentence_transformer_model.encode(text, convert_to_tensor=False).tolist()
+    EMBEDDING_BATCH_SIZE.observe(1)
+    return embedding_backend.encode([text])[0].tolist()
+
+@timed_stage("embedding")
+def generate_text_embeddings(texts: List[str], batch_size: int = 64) -> List[List[float]]:
+    """Batched generate_text_embedding: one model call per batch_size texts, zeros for empty texts."""
+    embeddings = [np.zeros(EMBEDDING_DIMENSION).tolist() for _ in texts]
+    if embedding_backend is None:
+        print("Warning: Embedding model not loaded. Returning zero embeddings.")
+        return embeddings
+
+    indexed = [(i, text) for i, text in enumerate(texts) if text and isinstance(text, str) and text.strip()]
+    for offset in range(0, len(indexed), batch_size):
+        batch = indexed[offset:offset + batch_size]
+        EMBEDDING_BATCH_SIZE.observe(len(batch))
+        vectors = embedding_backend.encode([text for _, text in batch], batch_size=batch_size)
+        for (i, _), vector in zip(batch, vectors):
+            embeddings[i] = vector.tolist()
+    return embeddings
 
 def create_candidate_embedding_text(profile: CandidateProfile) -> str:
     text_parts = []
@@ -59,11 +91,19 @@ def create_job_embedding_text(job: JobDescription) -> str:
 def get_jd_embedding(jd_text: str) -> List[float]:
     return generate_text_embedding(jd_text)
 
+@timed_stage("explainability")
 def generate_explainability(jd_text: str, profile: CandidateProfile) -> Dict:
-    explanation = {}
-    
+    return _explain(set(re.findall(r'\b\w+\b', jd_text.lower())), profile)
+
+@timed_stage("explainability")
+def explain_scored_candidates(jd_text: str, scored: List[Tuple[CandidateProfile, float]]) -> List[Tuple[CandidateProfile, float, Dict]]:
+    """Adds explainability to already scored (profile, match_score) pairs, tokenizing the job description once."""
     jd_words = set(re.findall(r'\b\w+\b', jd_text.lower()))
-    
+    return [(profile, match_score, _explain(jd_words, profile)) for profile, match_score in scored]
+
+def _explain(jd_words: set, profile: CandidateProfile) -> Dict:
+    explanation = {}
+
     candidate_skills_lower = set([skill.lower() for skill in profile.skills])
     matched_skills = list(jd_words.intersection(candidate_skills_lower))
     if matched_skills:
@@ -91,7 +131,17 @@ def generate_explainability(jd_text: str, profile: CandidateProfile) -> Dict:
 
     return explanation
 
-def rank_candidates(job_description_obj: JobDescription, candidates: List[CandidateProfile]) -> List[Dict]:
+def match_scores(job_embedding: List[float], candidate_embeddings: np.ndarray) -> np.ndarray:
+    """Vectorized match scores of one job against many candidates, on the same 0-100 scale as score_candidates."""
+    job_vector = np.asarray(job_embedding, dtype=np.float64)
+    matrix = np.asarray(candidate_embeddings, dtype=np.float64)
+    norms = np.linalg.norm(matrix, axis=1) * np.linalg.norm(job_vector)
+    similarity = np.divide(matrix @ job_vector, norms, out=np.zeros(len(matrix)), where=norms > 0)
+    return np.round(similarity * 100, 2)
+
+@timed_stage("rank_candidates")
+def score_candidates(job_description_obj: JobDescription, candidates: List[CandidateProfile]) -> List[Tuple[CandidateProfile, float, Dict]]:
+    """Scores candidates against a job and returns (profile, match_score, explainability) tuples, best first."""
     if job_description_obj.embedding is None:
         print("Warning: Job description has no pre-computed embedding. Generating on the fly from summary text.")
         jd_summary_text = create_job_embedding_text(job_description_obj)
@@ -122,11 +172,21 @@ def rank_candidates(job_description_obj: JobDescription, candidates: List[Candid
             candidate_embedding_np.reshape(1, -1)
         )[0][0] * 100
 
-        ranked_candidates.append({
-            "candidate_profile": profile.model_dump(exclude={"raw_text"}),
-            "match_score": round(similarity, 2),
-            "explainability": generate_explainability(job_description_obj.description, profile)
-        })
+        ranked_candidates.append((
+            profile,
+            round(float(similarity), 2),
+            generate_explainability(job_description_obj.description, profile)
+        ))
+
+    ranked_candidates.sort(key=lambda x: x[1], reverse=True)
+    return ranked_candidates
 
-    ranked_candidates.sort(key=lambda x: x["match_score"], reverse=True)
-    return ranked_candidates
\ No newline at end of file
+def rank_candidates(job_description_obj: JobDescription, candidates: List[CandidateProfile]) -> List[Dict]:
+    return [
+        {
+            "candidate_profile": profile.model_dump(include=CANDIDATE_SUMMARY_FIELDS),
+            "match_score": match_score,
+            "explainability": explainability
+        }
+        for profile, match_score, explainability in score_candidates(job_description_obj, candidates)
+    ]
\ No newline at end of file
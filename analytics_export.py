@@ -0,0 +1,350 @@
+"""
+Columnar exports of candidates, applications (with status history), jobs and
+match scores for the analytics dashboards.
+
+Exports are incremental: each run writes only the rows changed since the last
+successful run (the watermark, a ChangeJournal sequence number) into new
+part files under EXPORT_DIR/<table>/. Rows carry the sequence of the change
+they reflect, so consumers keep the row with the highest sequence per key.
+The journal persists its sequence (EXPORT_DIR/_sequence.json), so sequences
+keep increasing across restarts and that rule holds across processes.
+Rows are built and written EXPORT_CHUNK_ROWS at a time.
+
+Parquet and Arrow IPC need pyarrow; without it exports fall back to CSV.
+"""
+import csv
+import json
+import os
+import threading
+from collections import OrderedDict, defaultdict
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from app.change_journal import ChangeJournal, APPLICATIONS, APPLICATION_STATUS_HISTORY, CANDIDATES, JOBS
+from app.core.config import settings
+from app.core.database import applications_db, candidates_db, jobs_db, change_journal, job_candidates, score_job_candidates
+from app.schemas import ExportFormat, ExportJob, ExportStatus
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:
+    print("Warning: pyarrow is not installed. Analytics exports will be written as CSV.")
+    pa = None
+
+MATCH_SCORES = "match_scores"
+WATERMARK_FILE = "_watermark.json"
+
+# table -> [(column, type)]; types: string, float, int, bool, timestamp, string_list
+TABLE_COLUMNS: Dict[str, List[Tuple[str, str]]] = {
+    CANDIDATES: [
+        ("id", "string"), ("user_id", "string"), ("name", "string"), ("email", "string"), ("phone", "string"),
+        ("total_experience_years", "float"), ("skills", "string_list"), ("education", "string"), ("experience", "string"),
+        ("change_sequence", "int"),
+    ],
+    APPLICATIONS: [
+        ("id", "string"), ("candidate_user_id", "string"), ("job_id", "string"), ("candidate_profile_id", "string"),
+        ("status", "string"), ("applied_at", "timestamp"), ("change_sequence", "int"),
+    ],
+    APPLICATION_STATUS_HISTORY: [
+        ("application_id", "string"), ("job_id", "string"), ("candidate_profile_id", "string"), ("position", "int"),
+        ("status", "string"), ("changed_at", "timestamp"), ("change_sequence", "int"),
+    ],
+    JOBS: [
+        ("id", "string"), ("title", "string"), ("description", "string"), ("posted_by", "string"), ("is_public", "bool"),
+        ("processed_candidates", "int"), ("deleted", "bool"), ("change_sequence", "int"),
+    ],
+    MATCH_SCORES: [
+        ("job_id", "string"), ("candidate_profile_id", "string"), ("match_score", "float"), ("change_sequence", "int"),
+    ],
+}
+
+class ExportInProgress(Exception):
+    pass
+
+def _arrow_schema(columns: Sequence[Tuple[str, str]]):
+    types = {
+        "string": pa.string(),
+        "float": pa.float64(),
+        "int": pa.int64(),
+        "bool": pa.bool_(),
+        "timestamp": pa.timestamp("us", tz="UTC"),
+        "string_list": pa.list_(pa.string()),
+    }
+    return pa.schema([(name, types[kind]) for name, kind in columns])
+
+class _CsvPartWriter:
+    def __init__(self, path: str, columns: Sequence[Tuple[str, str]]):
+        self._file = open(path, "w", newline="", encoding="utf-8")
+        self._names = [name for name, _ in columns]
+        self._lists = {name for name, kind in columns if kind == "string_list"}
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(self._names)
+
+    def write(self, rows: List[Dict]) -> None:
+        for row in rows:
+            self._writer.writerow([
+                json.dumps(row[name]) if name in self._lists and row[name] is not None
+                else row[name].isoformat() if isinstance(row[name], datetime)
+                else row[name]
+                for name in self._names
+            ])
+
+    def close(self) -> None:
+        self._file.close()
+
+class _ArrowPartWriter:
+    def __init__(self, path: str, columns: Sequence[Tuple[str, str]], export_format: ExportFormat):
+        self._schema = _arrow_schema(columns)
+        if export_format == ExportFormat.PARQUET:
+            self._writer = pyarrow.parquet.ParquetWriter(path, self._schema)
+            self._write = lambda batch: self._writer.write_table(pa.Table.from_batches([batch]))
+        else:
+            self._sink = pa.OSFile(path, "wb")
+            self._writer = pyarrow.ipc.new_file(self._sink, self._schema)
+            self._write = self._writer.write_batch
+
+    def write(self, rows: List[Dict]) -> None:
+        self._write(pa.RecordBatch.from_pylist(rows, schema=self._schema))
+
+    def close(self) -> None:
+        self._writer.close()
+        if hasattr(self, "_sink"):
+            self._sink.close()
+
+FILE_EXTENSIONS = {ExportFormat.PARQUET: "parquet", ExportFormat.ARROW: "arrow", ExportFormat.CSV: "csv"}
+
+def write_table(path: str, table: str, rows: Iterable[Dict], export_format: ExportFormat, chunk_rows: int) -> int:
+    """Streams rows into one part file chunk by chunk. Writes nothing (and returns 0) for an empty table."""
+    columns = TABLE_COLUMNS[table]
+    writer = None
+    count = 0
+    chunk: List[Dict] = []
+    tmp_path = path + ".tmp"
+    try:
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) >= chunk_rows:
+                writer = writer or _open_writer(tmp_path, columns, export_format)
+                writer.write(chunk)
+                count += len(chunk)
+                chunk = []
+        if chunk:
+            writer = writer or _open_writer(tmp_path, columns, export_format)
+            writer.write(chunk)
+            count += len(chunk)
+    except Exception:
+        if writer is not None:
+            writer.close()
+            os.remove(tmp_path)
+        raise
+    if writer is not None:
+        writer.close()
+        os.replace(tmp_path, path)
+    return count
+
+def _open_writer(path: str, columns: Sequence[Tuple[str, str]], export_format: ExportFormat):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    if export_format == ExportFormat.CSV:
+        return _CsvPartWriter(path, columns)
+    return _ArrowPartWriter(path, columns, export_format)
+
+def candidate_rows(changes: List[Tuple[str, int]]) -> Iterator[Dict]:
+    for profile_id, sequence in changes:
+        profile = candidates_db.get(profile_id)
+        if profile is None:
+            continue
+        yield {
+            "id": profile.id,
+            "user_id": profile.user_id,
+            "name": profile.name,
+            "email": profile.email,
+            "phone": profile.phone,
+            "total_experience_years": profile.total_experience_years,
+            "skills": list(profile.skills),
+            "education": json.dumps([edu.model_dump() for edu in profile.education]),
+            "experience": json.dumps([exp.model_dump() for exp in profile.experience]),
+            "change_sequence": sequence,
+        }
+
+def application_rows(changes: List[Tuple[str, int]]) -> Iterator[Dict]:
+    for application_id, sequence in changes:
+        application = applications_db.get(application_id)
+        if application is None:
+            continue
+        yield {
+            "id": application.id,
+            "candidate_user_id": application.candidate_user_id,
+            "job_id": application.job_id,
+            "candidate_profile_id": application.candidate_profile_id,
+            "status": application.status.value,
+            "applied_at": application.applied_at,
+            "change_sequence": sequence,
+        }
+
+def status_history_rows(changes: List[Tuple[Tuple[str, int], int]]) -> Iterator[Dict]:
+    for (application_id, position), sequence in changes:
+        application = applications_db.get(application_id)
+        if application is None or position >= len(application.status_history):
+            continue
+        change = application.status_history[position]
+        yield {
+            "application_id": application_id,
+            "job_id": application.job_id,
+            "candidate_profile_id": application.candidate_profile_id,
+            "position": position,
+            "status": change.status.value,
+            "changed_at": change.changed_at,
+            "change_sequence": sequence,
+        }
+
+def job_rows(changes: List[Tuple[str, int]]) -> Iterator[Dict]:
+    for job_id, sequence in changes:
+        job = jobs_db.get(job_id)
+        if job is None:
+            yield {
+                "id": job_id, "title": None, "description": None, "posted_by": None, "is_public": None,
+                "processed_candidates": None, "deleted": True, "change_sequence": sequence,
+            }
+            continue
+        yield {
+            "id": job.id,
+            "title": job.title,
+            "description": job.description,
+            "posted_by": job.posted_by,
+            "is_public": job.is_public,
+            "processed_candidates": job_candidates.count(job.id),
+            "deleted": False,
+            "change_sequence": sequence,
+        }
+
+def score_pairs(job_changes: List[Tuple[str, int]], application_changes: List[Tuple[str, int]]) -> Dict[str, Dict[str, int]]:
+    """job id -> {candidate profile id: sequence} for every pair whose score may have changed."""
+    pairs: Dict[str, Dict[str, int]] = defaultdict(dict)
+    changed_jobs = dict(job_changes)
+    if changed_jobs:
+        # A changed job is re-scored against all of its candidates: uploaded resumes and applicants.
+        for job_id, sequence in changed_jobs.items():
+            if job_id in jobs_db:
+                pairs[job_id].update(dict.fromkeys(job_candidates.candidate_ids(job_id), sequence))
+        for application in list(applications_db.values()):
+            if application.job_id in changed_jobs and application.job_id in pairs:
+                pairs[application.job_id].setdefault(application.candidate_profile_id, changed_jobs[application.job_id])
+    for application_id, sequence in application_changes:
+        application = applications_db.get(application_id)
+        if application is not None and application.job_id in jobs_db:
+            current = pairs[application.job_id].get(application.candidate_profile_id, 0)
+            pairs[application.job_id][application.candidate_profile_id] = max(current, sequence)
+    return pairs
+
+def match_score_rows(pairs: Dict[str, Dict[str, int]], chunk_rows: int) -> Iterator[Dict]:
+    for job_id, candidates in pairs.items():
+        job = jobs_db.get(job_id)
+        if job is None or not job.embedding:
+            continue
+        profile_ids = list(candidates)
+        for offset in range(0, len(profile_ids), chunk_rows):
+            # Scored on the candidate shards when enabled; candidates_db then holds no embeddings.
+            scores = score_job_candidates(job, profile_ids[offset:offset + chunk_rows])
+            for profile_id, score in scores.items():
+                yield {"job_id": job_id, "candidate_profile_id": profile_id, "match_score": float(score), "change_sequence": candidates[profile_id]}
+
+class ExportManager:
+    """Runs one export at a time (typically as a background task) and keeps recent export jobs for status lookups."""
+
+    def __init__(self, journal: ChangeJournal, output_dir: str, default_format: str, chunk_rows: int, max_history: int = 100):
+        self.journal = journal
+        self.output_dir = output_dir
+        self.default_format = ExportFormat(default_format)
+        self.chunk_rows = max(1, chunk_rows)
+        self.max_history = max_history
+        self._lock = threading.Lock()
+        self._running: Optional[str] = None
+        self._jobs: "OrderedDict[str, ExportJob]" = OrderedDict()
+
+    def _watermark_path(self) -> str:
+        return os.path.join(self.output_dir, WATERMARK_FILE)
+
+    def read_watermark(self) -> int:
+        """
+        The last exported sequence, or 0 when there is none. Also 0 when the
+        journal is behind it (its sequence state was lost), so the next export
+        is a full one rather than silently skipping rows.
+        """
+        try:
+            with open(self._watermark_path(), "r", encoding="utf-8") as f:
+                watermark = json.load(f)
+        except (OSError, ValueError):
+            return 0
+        sequence = watermark.get("sequence", 0)
+        return sequence if sequence <= self.journal.sequence else 0
+
+    def _write_watermark(self, job: ExportJob) -> None:
+        os.makedirs(self.output_dir, exist_ok=True)
+        tmp_path = self._watermark_path() + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"sequence": job.to_sequence, "export_id": job.id, "finished_at": job.finished_at.isoformat()}, f)
+        os.replace(tmp_path, self._watermark_path())
+
+    def start(self, export_format: Optional[ExportFormat] = None, full: bool = False) -> ExportJob:
+        """Registers a new export covering the changes since the watermark (or everything when full). Call run() to execute it."""
+        export_format = export_format or self.default_format
+        if pa is None and export_format != ExportFormat.CSV:
+            print(f"Warning: pyarrow is not installed; writing the {export_format.value} export as CSV.")
+            export_format = ExportFormat.CSV
+        with self._lock:
+            if self._running is not None:
+                raise ExportInProgress(f"Export {self._running} is still running.")
+            job = ExportJob(
+                format=export_format,
+                full=full,
+                from_sequence=0 if full else self.read_watermark(),
+                to_sequence=self.journal.sequence,
+            )
+            self._running = job.id
+            self._jobs[job.id] = job
+            while len(self._jobs) > self.max_history:
+                self._jobs.popitem(last=False)
+        return job
+
+    def run(self, job: ExportJob) -> ExportJob:
+        try:
+            changes = {
+                table: self.journal.changed_between(table, job.from_sequence, job.to_sequence)
+                for table in (CANDIDATES, APPLICATIONS, APPLICATION_STATUS_HISTORY, JOBS)
+            }
+            tables = {
+                CANDIDATES: candidate_rows(changes[CANDIDATES]),
+                APPLICATIONS: application_rows(changes[APPLICATIONS]),
+                APPLICATION_STATUS_HISTORY: status_history_rows(changes[APPLICATION_STATUS_HISTORY]),
+                JOBS: job_rows(changes[JOBS]),
+                MATCH_SCORES: match_score_rows(score_pairs(changes[JOBS], changes[APPLICATIONS]), self.chunk_rows),
+            }
+            part_name = f"{job.started_at.strftime('%Y%m%dT%H%M%S')}_{job.from_sequence}-{job.to_sequence}.{FILE_EXTENSIONS[job.format]}"
+            for table, rows in tables.items():
+                path = os.path.join(self.output_dir, table, part_name)
+                count = write_table(path, table, rows, job.format, self.chunk_rows)
+                job.row_counts[table] = count
+                if count:
+                    job.files.append(path)
+            job.finished_at = datetime.now(timezone.utc)
+            self._write_watermark(job)
+            job.status = ExportStatus.COMPLETED
+        except Exception as e:
+            print(f"Error during analytics export {job.id}: {e}")
+            job.error = str(e)
+            job.finished_at = datetime.now(timezone.utc)
+            job.status = ExportStatus.FAILED
+        finally:
+            with self._lock:
+                self._running = None
+        return job
+
+    def get(self, export_id: str) -> Optional[ExportJob]:
+        return self._jobs.get(export_id)
+
+    def list_jobs(self) -> List[ExportJob]:
+        return list(reversed(self._jobs.values()))
+
+export_manager = ExportManager(change_journal, settings.EXPORT_DIR, settings.EXPORT_FORMAT, settings.EXPORT_CHUNK_ROWS)
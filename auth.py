@@ -1,20 +1,124 @@
 # app/auth.py
+import base64
+import hashlib
+import hmac
+import json
+import os
+import time
 import uuid
+from collections import OrderedDict
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
-from typing import Optional
+from typing import Dict, Optional, Tuple
 
 from app.schemas import User, UserCreate, UserRole, Token
+from app.core.config import settings
 from app.core.database import users_db # Import the shared users_db
 
 router = APIRouter()
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/token")
 
+PASSWORD_HASH_SCHEME = "pbkdf2_sha256"
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+def _sign(payload: str) -> str:
+    return _b64encode(hmac.new(settings.SECRET_KEY.encode("utf-8"), payload.encode("ascii"), hashlib.sha256).digest())
+
+def create_access_token(user: User, expires_in_seconds: Optional[int] = None) -> str:
+    """Issues an HMAC-SHA256 signed token: base64url(claims).base64url(signature)."""
+    expires_in = expires_in_seconds if expires_in_seconds is not None else settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+    claims = {"sub": user.username, "uid": user.id, "role": user.role.value, "exp": int(time.time()) + expires_in}
+    payload = _b64encode(json.dumps(claims, separators=(",", ":")).encode("utf-8"))
+    return f"{payload}.{_sign(payload)}"
+
+def decode_access_token(token: str) -> Optional[Dict]:
+    """Returns the token claims if the signature is valid and the token has not expired, otherwise None."""
+    try:
+        payload, signature = token.split(".")
+        if not hmac.compare_digest(signature.encode("ascii"), _sign(payload).encode("ascii")):
+            return None
+        claims = json.loads(_b64decode(payload))
+    except (ValueError, TypeError):
+        return None
+    if not isinstance(claims, dict) or claims.get("exp", 0) <= time.time():
+        return None
+    return claims
+
+class PrincipalCache:
+    """Small TTL + LRU cache of verified token -> User, so repeat requests skip signature checks and user lookups."""
+
+    def __init__(self, ttl_seconds: int, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, User]]" = OrderedDict()
+
+    def get(self, token: str) -> Optional[User]:
+        entry = self._entries.get(token)
+        if entry is None:
+            return None
+        expires_at, user = entry
+        if expires_at <= time.time():
+            del self._entries[token]
+            return None
+        self._entries.move_to_end(token)
+        return user
+
+    def put(self, token: str, user: User, token_expires_at: float) -> None:
+        if self.max_entries <= 0:
+            return
+        self._entries[token] = (min(time.time() + self.ttl_seconds, token_expires_at), user)
+        self._entries.move_to_end(token)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate_user(self, username: str) -> None:
+        for token in [token for token, (_, user) in self._entries.items() if user.username == username]:
+            del self._entries[token]
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+principal_cache = PrincipalCache(settings.PRINCIPAL_CACHE_TTL_SECONDS, settings.PRINCIPAL_CACHE_MAX_ENTRIES)
+
+def hash_password(password: str) -> str:
+    """PBKDF2-SHA256 with a random salt. CPU-heavy by design; call through run_in_threadpool from async code."""
+    salt = os.urandom(16)
+    iterations = settings.PASSWORD_HASH_ITERATIONS
+    digest = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, iterations)
+    return f"{PASSWORD_HASH_SCHEME}${iterations}${_b64encode(salt)}${_b64encode(digest)}"
+
+def verify_password(password: str, stored: str) -> bool:
+    if not stored.startswith(f"{PASSWORD_HASH_SCHEME}$"):
+        # Accounts created before hashing was introduced still hold the plaintext password.
+        return hmac.compare_digest(password.encode("utf-8"), stored.encode("utf-8"))
+    try:
+        _, iterations, salt, expected = stored.split("$")
+        digest = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), _b64decode(salt), int(iterations))
+    except ValueError:
+        return False
+    return hmac.compare_digest(_b64encode(digest), expected)
+
 def get_user_from_token(token: str) -> Optional[User]:
-    """Retrieves a user from the mock database using their username as a token."""
-    # In a real application, this would decode a JWT token
-    return users_db.get(token)
+    """Resolves a signed access token to its user, using the principal cache when possible."""
+    user = principal_cache.get(token)
+    if user is not None:
+        return user
+
+    claims = decode_access_token(token)
+    if claims is None:
+        return None
+    user = users_db.get(claims.get("sub"))
+    if user is None or user.id != claims.get("uid"):
+        return None
+    principal_cache.put(token, user, claims["exp"])
+    return user
 
 async def get_current_user(token: str = Depends(oauth2_scheme)) -> User:
     """Dependency to get the currently authenticated user."""
@@ -39,7 +143,7 @@ async def get_current_candidate_user(current_user: User = Depends(get_current_us
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized: Candidate role required.")
     return current_user
 
-@router.post("/register", response_model=User)
+@router.post("/register", response_model=User, response_model_exclude={"password"})
 async def register_user(user_data: UserCreate):
     """Registers a new user (candidate or recruiter)."""
     if user_data.username in users_db:
@@ -52,27 +156,29 @@ async def register_user(user_data: UserCreate):
     # UserCreate doesn't have a role, User does. We need to decide how role is set upon registration.
     # For now, let's assume `UserCreate` includes role, or we default it.
     # To simplify, I'll modify UserCreate schema in schemas.py to include role.
+    # Hashing is deliberately slow, so keep it off the event loop.
+    user_data_dict["password"] = await run_in_threadpool(hash_password, user_data.password)
     
     new_user = User(**user_data_dict) 
     
     users_db[user_data.username] = new_user
+    principal_cache.invalidate_user(user_data.username)
     return new_user
 
 @router.post("/token", response_model=Token)
 async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends()):
-    """Authenticates a user and returns an access token."""
+    """Authenticates a user and returns a signed, expiring access token."""
     user = users_db.get(form_data.username)
-    if not user or user.password != form_data.password:
+    if not user or not await run_in_threadpool(verify_password, form_data.password, user.password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    # In this mock setup, the access_token is just the username
-    access_token = user.username
+    access_token = create_access_token(user)
     return {"access_token": access_token, "token_type": "bearer"}
 
-@router.get("/me", response_model=User)
+@router.get("/me", response_model=User, response_model_exclude={"password"})
 async def read_users_me(current_user: User = Depends(get_current_user)):
     """Retrieves the profile of the currently authenticated user."""
-    return current_user
\ No newline at end of file
+    return current_user
@@ -0,0 +1,112 @@
+"""
+Auth overhead under concurrent load.
+
+Drives a small app that mounts the auth router next to an unauthenticated and
+an authenticated probe endpoint, in-process through httpx's ASGI transport:
+
+- per-request latency of the authenticated probe vs. the open one, with the
+  principal cache warm and disabled;
+- latency of the open probe while a burst of logins is hashing passwords,
+  to show that password hashing stays off the event loop.
+
+Importing the app seeds example jobs with embeddings, so the embedding model
+is replaced with the hashing stub first (as pipeline_bench does) and the
+benchmark runs offline.
+
+Run with: python -m app.benchmarks.auth_bench --concurrency 50 --requests 2000
+"""
+import argparse
+import asyncio
+import time
+from typing import Dict, List
+
+import httpx
+from fastapi import Depends, FastAPI
+
+from app.benchmarks.pipeline_bench import percentile
+from app.benchmarks.stub_model import install_stub_embedding_model
+from app.schemas import User
+
+def build_app() -> FastAPI:
+    # Imported here, after main() installed the stub model, since they load app.core.database.
+    from app.auth import router as auth_router, get_current_user
+
+    app = FastAPI()
+    app.include_router(auth_router, prefix="/auth")
+
+    @app.get("/open")
+    async def open_probe():
+        return {"ok": True}
+
+    @app.get("/protected")
+    async def protected_probe(current_user: User = Depends(get_current_user)):
+        return {"ok": True, "user": current_user.username}
+
+    return app
+
+async def drive(client: httpx.AsyncClient, path: str, total: int, concurrency: int, headers: Dict[str, str]) -> List[float]:
+    latencies: List[float] = []
+    remaining = iter(range(total))
+
+    async def worker():
+        for _ in remaining:
+            start = time.perf_counter()
+            response = await client.get(path, headers=headers)
+            latencies.append((time.perf_counter() - start) * 1000)
+            response.raise_for_status()
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies
+
+def describe(label: str, latencies: List[float], elapsed: float) -> None:
+    print(
+        f"{label:<40} p50 {percentile(latencies, 50):7.3f} ms  p99 {percentile(latencies, 99):7.3f} ms  "
+        f"{len(latencies) / elapsed:8.0f} req/s"
+    )
+
+async def run(concurrency: int, total: int, logins: int) -> None:
+    from app.auth import principal_cache
+    from app.core.database import users_db
+
+    app = build_app()
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        await client.post("/auth/register", json={"username": "bench_user", "password": "s3cret-pass", "role": "recruiter"})
+        token = (await client.post("/auth/token", data={"username": "bench_user", "password": "s3cret-pass"})).json()["access_token"]
+        auth_headers = {"Authorization": f"Bearer {token}"}
+
+        for label, path, headers in (("open endpoint (no auth)", "/open", {}), ("protected, principal cache warm", "/protected", auth_headers)):
+            start = time.perf_counter()
+            latencies = await drive(client, path, total, concurrency, headers)
+            describe(label, latencies, time.perf_counter() - start)
+
+        max_entries = principal_cache.max_entries
+        principal_cache.clear()
+        principal_cache.max_entries = 0
+        start = time.perf_counter()
+        latencies = await drive(client, "/protected", total, concurrency, auth_headers)
+        describe("protected, principal cache disabled", latencies, time.perf_counter() - start)
+        principal_cache.max_entries = max_entries
+
+        async def login():
+            await client.post("/auth/token", data={"username": "bench_user", "password": "s3cret-pass"})
+
+        start = time.perf_counter()
+        login_burst = asyncio.gather(*(login() for _ in range(logins)))
+        latencies = await drive(client, "/open", total, concurrency, {})
+        describe(f"open endpoint during {logins} logins", latencies, time.perf_counter() - start)
+        await login_burst
+
+    users_db.pop("bench_user", None)
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description="Measure auth overhead under concurrent load.")
+    arg_parser.add_argument("--concurrency", type=int, default=50)
+    arg_parser.add_argument("--requests", type=int, default=2000)
+    arg_parser.add_argument("--logins", type=int, default=20)
+    args = arg_parser.parse_args()
+    install_stub_embedding_model()
+    asyncio.run(run(args.concurrency, args.requests, args.logins))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+"""
+Accuracy vs. speed comparison of the embedding backends.
+
+Embeds a fixed set of synthetic resumes and job descriptions with every
+backend, then ranks the candidates for each job and compares the rankings
+with the reference backend (the first one listed):
+
+- spearman: rank correlation of all candidate scores, averaged over jobs
+- top_k_overlap: share of the reference top-k that the backend also puts in its top-k
+- top_k_same_order: share of jobs whose top-k comes out in exactly the same order
+- mean_cosine: cosine between the backend's and the reference's vector for
+  the same text (only reported when both embed into the same space)
+
+    python -m app.benchmarks.embedding_bench --backends sentence-transformers onnx onnx-int8 hash
+    python -m app.benchmarks.embedding_bench --threads 4 --max-seq-length 128 --output embedding_bench.json
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.benchmarks.pipeline_bench import percentile
+from app.benchmarks.synthetic import generate_resumes, generate_job_descriptions
+
+def build_corpus(resume_count: int, job_count: int, seed: int) -> Tuple[List[str], List[str]]:
+    """Candidate and job embedding texts, built the same way the app builds them."""
+    from app import parser
+    from app.ai_matcher import create_candidate_embedding_text, create_job_embedding_text
+    from app.schemas import JobDescription
+
+    if parser.nlp is None:
+        import spacy
+        print("Warning: en_core_web_sm is not installed; parsing with a blank English pipeline.")
+        parser.nlp = spacy.blank("en")
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        profiles = [parser.parse_resume_file(text, embed=False) for text in generate_resumes(resume_count, seed=seed)]
+    candidate_texts = [create_candidate_embedding_text(profile) for profile in profiles]
+    job_texts = [create_job_embedding_text(JobDescription(**jd)) for jd in generate_job_descriptions(job_count, seed=seed)]
+    return candidate_texts, job_texts
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+def _ranks(values: np.ndarray) -> np.ndarray:
+    ranks = np.empty(len(values))
+    ranks[np.argsort(values)] = np.arange(len(values))
+    return ranks
+
+def spearman(a: np.ndarray, b: np.ndarray) -> float:
+    ranks_a, ranks_b = _ranks(a), _ranks(b)
+    if ranks_a.std() == 0 or ranks_b.std() == 0:
+        return 0.0
+    return float(np.corrcoef(ranks_a, ranks_b)[0, 1])
+
+def ranking_agreement(scores: np.ndarray, reference_scores: np.ndarray, top_k: int) -> Dict[str, float]:
+    """Compares two (jobs x candidates) score matrices job by job."""
+    correlations, overlaps, same_order = [], [], []
+    for row, reference_row in zip(scores, reference_scores):
+        top = np.argsort(-row, kind="stable")[:top_k]
+        reference_top = np.argsort(-reference_row, kind="stable")[:top_k]
+        correlations.append(spearman(row, reference_row))
+        overlaps.append(len(set(top) & set(reference_top)) / len(reference_top))
+        same_order.append(float(np.array_equal(top, reference_top)))
+    return {
+        "spearman": round(float(np.mean(correlations)), 4),
+        "top_k_overlap": round(float(np.mean(overlaps)), 4),
+        "top_k_same_order": round(float(np.mean(same_order)), 4),
+    }
+
+def measure_backend(name: str, settings, candidate_texts: List[str], job_texts: List[str], batch_size: int, latency_runs: int) -> Dict:
+    from app.embedding_backends import create_embedding_backend
+
+    start = time.perf_counter()
+    backend = create_embedding_backend(settings, name)
+    load_seconds = time.perf_counter() - start
+
+    backend.encode(candidate_texts[:batch_size], batch_size=batch_size)  # warm-up
+
+    start = time.perf_counter()
+    candidate_vectors = backend.encode(candidate_texts, batch_size=batch_size)
+    batch_seconds = time.perf_counter() - start
+    job_vectors = backend.encode(job_texts, batch_size=batch_size)
+
+    single_ms = []
+    for text in candidate_texts[:latency_runs]:
+        start = time.perf_counter()
+        backend.encode([text])
+        single_ms.append((time.perf_counter() - start) * 1000)
+
+    return {
+        "result": {
+            "dimension": backend.dimension,
+            "load_seconds": round(load_seconds, 3),
+            "texts_per_second": round(len(candidate_texts) / batch_seconds, 1) if batch_seconds else 0.0,
+            "single_text_p50_ms": round(percentile(single_ms, 50), 3),
+            "single_text_p95_ms": round(percentile(single_ms, 95), 3),
+        },
+        "candidate_vectors": _normalize(candidate_vectors),
+        "job_vectors": _normalize(job_vectors),
+    }
+
+def compare(backends: List[str], settings, candidate_texts: List[str], job_texts: List[str], batch_size: int, latency_runs: int, top_k: int) -> Dict[str, Dict]:
+    results: Dict[str, Dict] = {}
+    reference: Optional[Dict] = None
+    for name in backends:
+        print(f"Measuring {name}...")
+        try:
+            measured = measure_backend(name, settings, candidate_texts, job_texts, batch_size, latency_runs)
+        except Exception as e:
+            print(f"  Skipping {name}: {e}")
+            results[name] = {"error": str(e)}
+            continue
+
+        result = measured["result"]
+        scores = measured["job_vectors"] @ measured["candidate_vectors"].T
+        if reference is None:
+            reference = {"name": name, "scores": scores, "candidate_vectors": measured["candidate_vectors"]}
+        result["reference"] = reference["name"]
+        result.update(ranking_agreement(scores, reference["scores"], top_k))
+        # Vectors are only comparable when both backends run the same model ("hash" never does).
+        if name != "hash" and reference["name"] != "hash" and measured["candidate_vectors"].shape == reference["candidate_vectors"].shape:
+            result["mean_cosine"] = round(float(np.mean(np.sum(measured["candidate_vectors"] * reference["candidate_vectors"], axis=1))), 4)
+        results[name] = result
+    return results
+
+def recommend(results: Dict[str, Dict], min_spearman: float, min_overlap: float) -> Optional[str]:
+    """The fastest backend whose rankings stay within the thresholds of the reference."""
+    eligible = [
+        (stats["texts_per_second"], name)
+        for name, stats in results.items()
+        if "error" not in stats and stats["spearman"] >= min_spearman and stats["top_k_overlap"] >= min_overlap
+    ]
+    return max(eligible)[1] if eligible else None
+
+def main(argv: Optional[List[str]] = None) -> int:
+    arg_parser = argparse.ArgumentParser(description="Compare embedding backends for speed and ranking stability.")
+    arg_parser.add_argument("--backends", nargs="+", default=["sentence-transformers", "onnx", "onnx-int8", "hash"], help="The first backend is the reference")
+    arg_parser.add_argument("--resumes", type=int, default=300)
+    arg_parser.add_argument("--jobs", type=int, default=20)
+    arg_parser.add_argument("--seed", type=int, default=7)
+    arg_parser.add_argument("--batch-size", type=int, default=32)
+    arg_parser.add_argument("--latency-runs", type=int, default=50, help="Single-text encodes for the latency percentiles")
+    arg_parser.add_argument("--top-k", type=int, default=10)
+    arg_parser.add_argument("--threads", type=int, help="Overrides EMBEDDING_THREADS")
+    arg_parser.add_argument("--max-seq-length", type=int, help="Overrides EMBEDDING_MAX_SEQ_LENGTH")
+    arg_parser.add_argument("--min-spearman", type=float, default=0.98)
+    arg_parser.add_argument("--min-overlap", type=float, default=0.9)
+    arg_parser.add_argument("--output", default="embedding_bench.json")
+    args = arg_parser.parse_args(argv)
+
+    # Every backend is created explicitly below; don't also load the configured one when ai_matcher is imported.
+    os.environ.setdefault("EMBEDDING_BACKEND", "hash")
+    from app.core.config import settings
+    overrides = {}
+    if args.threads is not None:
+        overrides["EMBEDDING_THREADS"] = args.threads
+    if args.max_seq_length is not None:
+        overrides["EMBEDDING_MAX_SEQ_LENGTH"] = args.max_seq_length
+    bench_settings = settings.model_copy(update=overrides)
+
+    candidate_texts, job_texts = build_corpus(args.resumes, args.jobs, args.seed)
+    results = compare(args.backends, bench_settings, candidate_texts, job_texts, args.batch_size, args.latency_runs, args.top_k)
+    recommended = recommend(results, args.min_spearman, args.min_overlap)
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump({
+            "parameters": {**vars(args), "model": bench_settings.EMBEDDING_MODEL_NAME, "threads": bench_settings.EMBEDDING_THREADS, "max_seq_length": bench_settings.EMBEDDING_MAX_SEQ_LENGTH},
+            "backends": results,
+            "recommended": recommended,
+        }, f, indent=2)
+
+    print(f"{'backend':<24}{'texts/s':>10}{'p50 ms':>10}{'spearman':>10}{'top-k':>8}{'order':>8}{'cosine':>8}")
+    for name, stats in results.items():
+        if "error" in stats:
+            print(f"{name:<24}  unavailable: {stats['error']}")
+            continue
+        cosine = f"{stats['mean_cosine']:.4f}" if "mean_cosine" in stats else "-"
+        print(
+            f"{name:<24}{stats['texts_per_second']:>10.1f}{stats['single_text_p50_ms']:>10.3f}"
+            f"{stats['spearman']:>10.4f}{stats['top_k_overlap']:>8.2f}{stats['top_k_same_order']:>8.2f}{cosine:>8}"
+        )
+    print(f"Fastest backend that keeps the ranking order: {recommended or 'none within thresholds'}")
+    print(f"Results written to {args.output}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,367 @@
+"""
+Concurrent load test for the heavy API endpoints.
+
+Drives a mixed workload of resume applications, bulk resume uploads, ranked
+candidate lookups and public job listings, either in-process (httpx ASGI
+transport, the default), against a uvicorn server it starts itself
+(--spawn-server), or against an already running server (--base-url). Runs
+offline with synthetic resumes and the hash embedding backend, so it works on
+a plain CI box.
+
+Closed loop, N concurrent users with optional think time:
+
+    python -m app.benchmarks.load_test --users 50 --duration 30
+
+Open loop, Poisson arrivals at a fixed rate with at most N requests in flight:
+
+    python -m app.benchmarks.load_test --rate 200 --users 500 --duration 60 --spawn-server
+
+Mixed workload weights, saving results and comparing with a previous run:
+
+    python -m app.benchmarks.load_test --mix apply=4,ranked_candidates=4,list_jobs=10,process_resumes=1 --output load_results.json
+    python -m app.benchmarks.load_test --baseline load_baseline.json --threshold 0.25
+
+Latency is measured from the scheduled send time, so in open-loop runs
+client-side queueing counts against the server instead of being hidden.
+
+Admission control keys its per-client limits on the authenticated user, so
+each simulated user gets a recruiter account and a bearer token: registered
+in-process, or in the spawned server with a SECRET_KEY shared with it.
+Against --base-url there are no accounts, and all simulated users share one
+client (this machine's address).
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import platform
+import random
+import secrets
+import subprocess
+import sys
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+
+from app.benchmarks.pipeline_bench import percentile, compare_to_baseline, use_blank_spacy_if_missing
+from app.benchmarks.stub_model import install_stub_embedding_model
+from app.benchmarks.synthetic import generate_resumes, generate_job_descriptions, resume_pdf_bytes
+
+ENDPOINTS = ("apply", "process_resumes", "ranked_candidates", "list_jobs")
+DEFAULT_MIX = "apply=4,process_resumes=1,ranked_candidates=4,list_jobs=10"
+REJECTION_STATUSES = (429, 503)
+
+# (endpoint, status code or 0 for transport errors, latency ms)
+Sample = Tuple[str, int, float]
+
+def parse_mix(spec: str) -> Dict[str, float]:
+    mix: Dict[str, float] = {}
+    for part in spec.split(","):
+        name, _, weight = part.strip().partition("=")
+        if name not in ENDPOINTS:
+            raise ValueError(f"Unknown endpoint '{name}' in --mix. Choose from {', '.join(ENDPOINTS)}.")
+        mix[name] = float(weight or 1)
+    if not any(weight > 0 for weight in mix.values()):
+        raise ValueError("--mix needs at least one endpoint with a positive weight.")
+    return mix
+
+def load_test_users(count: int) -> List:
+    """Recruiter accounts for the simulated users user-0 .. user-{count - 1}."""
+    from app.schemas import User, UserRole
+    return [User(id=f"load-user-{i}", username=f"user-{i}", email=f"user-{i}@loadtest.invalid", password="", role=UserRole.RECRUITER) for i in range(count)]
+
+def register_users(count: int) -> None:
+    """Adds the simulated users to this process's users_db, i.e. on the server side."""
+    from app.core.database import users_db
+    for user in load_test_users(count):
+        users_db[user.username] = user
+
+def authorization_headers(count: int) -> Dict[str, str]:
+    """Authorization header per simulated user, signed with this process's SECRET_KEY."""
+    from app.auth import create_access_token
+    return {user.username: f"Bearer {create_access_token(user)}" for user in load_test_users(count)}
+
+class Workload:
+    def __init__(
+        self,
+        client: httpx.AsyncClient,
+        job_ids: List[str],
+        pdfs: List[bytes],
+        batch_size: int,
+        mix: Dict[str, float],
+        seed: int,
+        authorization: Optional[Dict[str, str]] = None,
+    ):
+        self.client = client
+        self.authorization = authorization or {}
+        self.job_ids = job_ids
+        self.pdfs = pdfs
+        self.batch_size = batch_size
+        self.endpoints = list(mix)
+        self.weights = [mix[name] for name in self.endpoints]
+        self.rng = random.Random(seed)
+        self.samples: List[Sample] = []
+
+    def pick(self) -> str:
+        return self.rng.choices(self.endpoints, weights=self.weights)[0]
+
+    def _resume(self) -> bytes:
+        return self.rng.choice(self.pdfs)
+
+    async def _send(self, endpoint: str, user: str) -> httpx.Response:
+        job_id = self.rng.choice(self.job_ids)
+        headers = {"X-Client-Id": user}
+        if user in self.authorization:
+            headers["Authorization"] = self.authorization[user]
+        if endpoint == "apply":
+            return await self.client.post(
+                f"/candidate/apply/{job_id}",
+                files={"resume_file": ("resume.pdf", self._resume(), "application/pdf")},
+                params={"candidate_user_id": f"load-{uuid.uuid4().hex[:12]}"},
+                headers=headers,
+            )
+        if endpoint == "process_resumes":
+            files = [("resumes", (f"resume_{i}.pdf", self._resume(), "application/pdf")) for i in range(self.batch_size)]
+            return await self.client.post(f"/recruiter/jobs/{job_id}/process_resumes", files=files, headers=headers)
+        if endpoint == "ranked_candidates":
+            return await self.client.get(f"/recruiter/jobs/{job_id}/ranked_candidates", headers=headers)
+        return await self.client.get("/candidate/jobs", params={"limit": 20}, headers=headers)
+
+    async def call(self, endpoint: str, user: str, scheduled_at: Optional[float] = None) -> None:
+        start = scheduled_at if scheduled_at is not None else time.perf_counter()
+        try:
+            status_code = (await self._send(endpoint, user)).status_code
+        except httpx.HTTPError:
+            status_code = 0
+        self.samples.append((endpoint, status_code, (time.perf_counter() - start) * 1000))
+
+async def run_closed_loop(workload: Workload, users: int, duration: float, think_time: float) -> None:
+    deadline = time.perf_counter() + duration
+
+    async def user_loop(index: int):
+        user = f"user-{index}"
+        while time.perf_counter() < deadline:
+            await workload.call(workload.pick(), user)
+            if think_time:
+                await asyncio.sleep(workload.rng.expovariate(1 / think_time))
+
+    await asyncio.gather(*(user_loop(i) for i in range(users)))
+
+async def run_open_loop(workload: Workload, rate: float, max_in_flight: int, duration: float) -> None:
+    in_flight = asyncio.Semaphore(max_in_flight)
+    tasks = set()
+    start = time.perf_counter()
+    next_at = start
+    index = 0
+
+    async def fire(endpoint: str, user: str, scheduled_at: float):
+        async with in_flight:
+            await workload.call(endpoint, user, scheduled_at)
+
+    while next_at < start + duration:
+        delay = next_at - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        task = asyncio.create_task(fire(workload.pick(), f"user-{index % max_in_flight}", next_at))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+        index += 1
+        next_at += workload.rng.expovariate(rate)
+    if tasks:
+        await asyncio.gather(*tasks)
+
+def summarize_samples(samples: List[Sample], elapsed: float) -> Dict[str, Dict]:
+    by_endpoint: Dict[str, List[Sample]] = defaultdict(list)
+    for sample in samples:
+        by_endpoint[sample[0]].append(sample)
+        by_endpoint["all"].append(sample)
+
+    results: Dict[str, Dict] = {}
+    for endpoint, endpoint_samples in sorted(by_endpoint.items()):
+        latencies = [latency for _, _, latency in endpoint_samples]
+        statuses: Dict[str, int] = defaultdict(int)
+        for _, status_code, _ in endpoint_samples:
+            statuses[str(status_code)] += 1
+        ok = sum(1 for _, status_code, _ in endpoint_samples if 200 <= status_code < 400)
+        rejected = sum(1 for _, status_code, _ in endpoint_samples if status_code in REJECTION_STATUSES)
+        errors = len(endpoint_samples) - ok - rejected
+        results[endpoint] = {
+            "requests": len(endpoint_samples),
+            "ok": ok,
+            "rejected": rejected,
+            "errors": errors,
+            "error_rate": round(errors / len(endpoint_samples), 4),
+            "rejection_rate": round(rejected / len(endpoint_samples), 4),
+            "throughput_rps": round(len(endpoint_samples) / elapsed, 2) if elapsed else 0.0,
+            "p50_ms": round(percentile(latencies, 50), 3),
+            "p95_ms": round(percentile(latencies, 95), 3),
+            "p99_ms": round(percentile(latencies, 99), 3),
+            "max_ms": round(max(latencies), 3),
+            "statuses": dict(statuses),
+        }
+    return results
+
+async def seed_jobs(client: httpx.AsyncClient, job_count: int, pdfs: List[bytes], seed: int) -> List[str]:
+    """Creates the jobs under test and uploads a first batch of resumes to each, so rankings have candidates."""
+    job_ids = []
+    for i, jd in enumerate(generate_job_descriptions(job_count, seed=seed)):
+        response = await client.post("/recruiter/jobs", json={**jd, "posted_by": "load-test", "is_public": True})
+        response.raise_for_status()
+        job_id = response.json()["id"]
+        files = [("resumes", (f"seed_{n}.pdf", pdf, "application/pdf")) for n, pdf in enumerate(pdfs[i * 5:i * 5 + 5] or pdfs[:5])]
+        (await client.post(f"/recruiter/jobs/{job_id}/process_resumes", files=files, headers={"X-Client-Id": f"seed-{i}"})).raise_for_status()
+        job_ids.append(job_id)
+    return job_ids
+
+async def run_load(args: argparse.Namespace, client: httpx.AsyncClient, authorization: Optional[Dict[str, str]] = None) -> Dict:
+    rng = random.Random(args.seed)
+    pdfs = [resume_pdf_bytes(text) for text in generate_resumes(args.resume_pool, seed=args.seed)]
+    job_ids = await seed_jobs(client, args.jobs, pdfs, args.seed)
+
+    workload = Workload(client, job_ids, pdfs, args.batch_size, parse_mix(args.mix), rng.randrange(2**32), authorization)
+    start = time.perf_counter()
+    if args.rate:
+        await run_open_loop(workload, args.rate, args.users, args.duration)
+    else:
+        await run_closed_loop(workload, args.users, args.duration, args.think_time)
+    elapsed = time.perf_counter() - start
+    return {"elapsed_seconds": round(elapsed, 3), "endpoints": summarize_samples(workload.samples, elapsed)}
+
+async def run_in_process(args: argparse.Namespace) -> Dict:
+    install_stub_embedding_model()
+    use_blank_spacy_if_missing()
+    from app.main import app
+
+    register_users(args.users)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=args.timeout) as client:
+        # The parser prints a debug trace per resume; keep the report readable.
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            return await run_load(args, client, authorization_headers(args.users))
+
+async def run_against(args: argparse.Namespace, base_url: str, authorization: Optional[Dict[str, str]] = None) -> Dict:
+    limits = httpx.Limits(max_connections=args.users, max_keepalive_connections=args.users)
+    async with httpx.AsyncClient(base_url=base_url, timeout=args.timeout, limits=limits) as client:
+        return await run_load(args, client, authorization)
+
+def serve(port: int, users: int) -> None:
+    """Runs the app under uvicorn with the offline stubs and the simulated users' accounts; used by --spawn-server."""
+    import uvicorn
+
+    install_stub_embedding_model()
+    use_blank_spacy_if_missing()
+    from app.main import app
+
+    register_users(users)
+
+    uvicorn.run(app, host="127.0.0.1", port=port, log_level="warning", access_log=False)
+
+@contextlib.contextmanager
+def spawned_server(port: int, users: int, startup_timeout: float = 60.0):
+    # Inherits SECRET_KEY from this process, so the tokens signed here are valid there.
+    process = subprocess.Popen(
+        [sys.executable, "-m", "app.benchmarks.load_test", "--serve", "--port", str(port), "--users", str(users)],
+        stdout=subprocess.DEVNULL,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        deadline = time.monotonic() + startup_timeout
+        while True:
+            if process.poll() is not None:
+                raise RuntimeError(f"uvicorn exited with status {process.returncode} during startup.")
+            try:
+                if httpx.get(f"{base_url}/", timeout=1.0).status_code == 200:
+                    break
+            except httpx.HTTPError:
+                pass
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"uvicorn did not start within {startup_timeout:.0f}s.")
+            time.sleep(0.25)
+        yield base_url
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+def main(argv: Optional[List[str]] = None) -> int:
+    arg_parser = argparse.ArgumentParser(description="Load test the heavy API endpoints with a mixed workload.")
+    arg_parser.add_argument("--users", type=int, default=50, help="Concurrent users (closed loop) or max in-flight requests (open loop)")
+    arg_parser.add_argument("--rate", type=float, help="Open-loop arrival rate in requests/sec (Poisson); closed loop when omitted")
+    arg_parser.add_argument("--duration", type=float, default=30.0, help="Seconds of load after setup")
+    arg_parser.add_argument("--think-time", type=float, default=0.0, help="Mean seconds between a closed-loop user's requests")
+    arg_parser.add_argument("--mix", default=DEFAULT_MIX, help="Endpoint weights, e.g. apply=4,process_resumes=1,ranked_candidates=4,list_jobs=10")
+    arg_parser.add_argument("--jobs", type=int, default=5, help="Jobs created for the run")
+    arg_parser.add_argument("--resume-pool", type=int, default=50, help="Distinct synthetic resumes to draw uploads from")
+    arg_parser.add_argument("--batch-size", type=int, default=10, help="Resumes per process_resumes request")
+    arg_parser.add_argument("--timeout", type=float, default=60.0, help="Per-request timeout in seconds")
+    arg_parser.add_argument("--seed", type=int, default=7)
+    arg_parser.add_argument("--base-url", help="Run against an already running server instead of in-process")
+    arg_parser.add_argument("--spawn-server", action="store_true", help="Start a local uvicorn with the offline stubs and run against it")
+    arg_parser.add_argument("--port", type=int, default=8765, help="Port for --spawn-server / --serve")
+    arg_parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    arg_parser.add_argument("--output", default="load_results.json", help="Where to write the results JSON")
+    arg_parser.add_argument("--baseline", help="Results JSON to compare against")
+    arg_parser.add_argument("--threshold", type=float, default=0.25, help="Allowed p95 slowdown ratio before flagging a regression")
+    args = arg_parser.parse_args(argv)
+
+    if args.serve:
+        serve(args.port, args.users)
+        return 0
+
+    if args.base_url:
+        target = args.base_url
+        results = asyncio.run(run_against(args, args.base_url))
+    elif args.spawn_server:
+        os.environ.setdefault("SECRET_KEY", secrets.token_urlsafe(32))
+        install_stub_embedding_model()
+        authorization = authorization_headers(args.users)
+        with spawned_server(args.port, args.users) as base_url:
+            target = f"uvicorn {base_url}"
+            results = asyncio.run(run_against(args, base_url, authorization))
+    else:
+        target = "in-process"
+        results = asyncio.run(run_in_process(args))
+
+    report = {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "target": target,
+        },
+        "parameters": {name: value for name, value in vars(args).items() if name not in ("serve", "output", "baseline")},
+        **results,
+    }
+
+    exit_code = 0
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare_to_baseline(report["endpoints"], baseline.get("endpoints", {}), args.threshold, metric="p95_ms")
+        report["regressions"] = regressions
+        exit_code = 1 if regressions else 0
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    print(f"{'endpoint':<20}{'reqs':>7}{'rps':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>8}{'rejected':>10}")
+    for endpoint, stats in report["endpoints"].items():
+        print(
+            f"{endpoint:<20}{stats['requests']:>7}{stats['throughput_rps']:>9.1f}{stats['p50_ms']:>10.1f}{stats['p95_ms']:>10.1f}"
+            f"{stats['p99_ms']:>10.1f}{stats['error_rate']:>8.1%}{stats['rejection_rate']:>10.1%}"
+        )
+    for regression in report.get("regressions", []):
+        print(f"REGRESSION {regression['stage']}: p95 {regression['baseline']:.1f} ms -> {regression['current']:.1f} ms (x{regression['ratio']})")
+    print(f"Results written to {args.output}")
+    return exit_code
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,249 @@
+"""
+Benchmark suite for the parse -> embed -> rank pipeline.
+
+Runs fully offline on synthetic resumes and job descriptions. By default the
+embedding model is replaced with a deterministic hashing stub; pass
+--real-model to use the locally cached SentenceTransformer instead.
+
+    python -m app.benchmarks.pipeline_bench --output bench_results.json
+    python -m app.benchmarks.pipeline_bench --baseline bench_baseline.json --threshold 0.25
+    python -m app.benchmarks.pipeline_bench --output bench_baseline.json   # record a new baseline
+
+Exits with status 1 when any stage is slower than the baseline by more than
+the threshold.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
+
+from app.benchmarks.synthetic import generate_resumes, generate_job_descriptions, resume_pdf_bytes, write_resume_pdfs
+from app.benchmarks.stub_model import install_stub_embedding_model
+
+def percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * (len(ordered) - 1)))))
+    return ordered[index]
+
+def summarize(samples_ms: List[float]) -> Dict:
+    return {
+        "runs": len(samples_ms),
+        "mean_ms": round(statistics.fmean(samples_ms), 4) if samples_ms else 0.0,
+        "p50_ms": round(percentile(samples_ms, 50), 4),
+        "p95_ms": round(percentile(samples_ms, 95), 4),
+        "total_ms": round(sum(samples_ms), 4),
+    }
+
+def time_each(func: Callable, inputs: List, quiet: bool = True) -> List[float]:
+    """Times func(item) for every item, discarding the pipeline's debug prints."""
+    samples = []
+    sink = io.StringIO() if quiet else None
+    for item in inputs:
+        with contextlib.redirect_stdout(sink) if quiet else contextlib.nullcontext():
+            start = time.perf_counter()
+            func(item)
+            samples.append((time.perf_counter() - start) * 1000)
+        if sink is not None:
+            sink.seek(0)
+            sink.truncate()
+    return samples
+
+def bench_stages(resume_count: int, rank_pool: int, seed: int) -> Dict[str, Dict]:
+    from app import parser
+    from app.ai_matcher import (
+        generate_text_embedding,
+        rank_candidates,
+        generate_explainability,
+        explain_scored_candidates,
+        create_candidate_embedding_text,
+    )
+    from app.schemas import JobDescription
+    from app.job_candidates import JobCandidateIndex
+
+    resumes = generate_resumes(resume_count, seed=seed)
+    jd = generate_job_descriptions(1, seed=seed)[0]
+    results: Dict[str, Dict] = {}
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        pdf_paths = write_resume_pdfs(resumes, tmp_dir)
+        results["extract_text_from_pdf"] = summarize(time_each(parser.extract_text_from_pdf, pdf_paths))
+
+    cleaned = [parser.clean_text(text) for text in resumes]
+    results["clean_text"] = summarize(time_each(parser.clean_text, resumes))
+    results["spacy_nlp"] = summarize(time_each(parser.nlp, cleaned))
+    results["extract_education"] = summarize(time_each(parser.extract_education, cleaned))
+    results["extract_experience"] = summarize(time_each(parser.extract_experience, cleaned))
+
+    profiles = []
+    results["parse_resume_file"] = summarize(time_each(lambda text: profiles.append(parser.parse_resume_file(text)), resumes))
+
+    embedding_texts = [create_candidate_embedding_text(profile) for profile in profiles]
+    results["generate_text_embedding"] = summarize(time_each(generate_text_embedding, embedding_texts))
+
+    job = JobDescription(**jd)
+    job.embedding = generate_text_embedding(f"Job Title: {job.title}. Job Description: {job.description}.")
+
+    pool = [profiles[i % len(profiles)].model_copy(update={"id": f"bench-{i}"}) for i in range(rank_pool)]
+    results["generate_explainability"] = summarize(time_each(lambda p: generate_explainability(job.description, p), profiles))
+    results[f"rank_candidates_{rank_pool}"] = summarize(time_each(lambda candidates: rank_candidates(job, candidates), [pool] * 5))
+
+    # The ranked_candidates endpoint path: scores from the job's row array, then explainability.
+    index = JobCandidateIndex()
+    index.add(job.id, pool)
+    by_id = {profile.id: profile for profile in pool}
+
+    def rank_indexed(_):
+        return explain_scored_candidates(job.description, [(by_id[cid], score) for cid, score in index.rank(job.id, job.embedding)])
+
+    results[f"rank_job_candidates_{rank_pool}"] = summarize(time_each(rank_indexed, [None] * 5))
+    return results
+
+def bench_end_to_end(resume_count: int, batch_size: int, seed: int) -> Dict[str, Dict]:
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    client = TestClient(app)
+    resumes = generate_resumes(resume_count, seed=seed + 1)
+    jd = generate_job_descriptions(1, seed=seed + 1)[0]
+    results: Dict[str, Dict] = {}
+    sink = io.StringIO()
+
+    with contextlib.redirect_stdout(sink):
+        create_samples = []
+        start = time.perf_counter()
+        job_id = client.post("/recruiter/jobs", json=jd).json()["id"]
+        create_samples.append((time.perf_counter() - start) * 1000)
+        results["api_create_job"] = summarize(create_samples)
+
+        upload_samples = []
+        for offset in range(0, resume_count, batch_size):
+            files = [
+                ("resumes", (f"resume_{offset + i}.pdf", resume_pdf_bytes(text), "application/pdf"))
+                for i, text in enumerate(resumes[offset:offset + batch_size])
+            ]
+            start = time.perf_counter()
+            response = client.post(f"/recruiter/jobs/{job_id}/process_resumes", files=files)
+            upload_samples.append((time.perf_counter() - start) * 1000)
+            response.raise_for_status()
+        results[f"api_process_resumes_batch_{batch_size}"] = summarize(upload_samples)
+
+        ranked_samples, revalidate_samples = [], []
+        for _ in range(10):
+            start = time.perf_counter()
+            response = client.get(f"/recruiter/jobs/{job_id}/ranked_candidates")
+            ranked_samples.append((time.perf_counter() - start) * 1000)
+            etag = response.headers.get("etag")
+
+            start = time.perf_counter()
+            client.get(f"/recruiter/jobs/{job_id}/ranked_candidates", headers={"If-None-Match": etag})
+            revalidate_samples.append((time.perf_counter() - start) * 1000)
+        results["api_ranked_candidates"] = summarize(ranked_samples)
+        results["api_ranked_candidates_304"] = summarize(revalidate_samples)
+
+        listing_samples = []
+        for _ in range(20):
+            start = time.perf_counter()
+            client.get("/candidate/jobs")
+            listing_samples.append((time.perf_counter() - start) * 1000)
+        results["api_public_jobs"] = summarize(listing_samples)
+    return results
+
+def compare_to_baseline(current: Dict[str, Dict], baseline: Dict[str, Dict], threshold: float, metric: str = "p50_ms") -> List[Dict]:
+    regressions = []
+    for stage, stats in current.items():
+        previous = baseline.get(stage)
+        if not previous or not previous.get(metric):
+            continue
+        ratio = stats[metric] / previous[metric]
+        if ratio > 1 + threshold:
+            regressions.append({"stage": stage, "baseline": previous[metric], "current": stats[metric], "ratio": round(ratio, 3)})
+    return regressions
+
+def use_blank_spacy_if_missing() -> str:
+    """Falls back to a blank English spaCy pipeline when en_core_web_sm is not installed. Returns the pipeline in use."""
+    from app import parser
+    if parser.nlp is not None:
+        return "en_core_web_sm"
+    import spacy
+    print("Warning: en_core_web_sm is not installed; using a blank English spaCy pipeline.")
+    parser.nlp = spacy.blank("en")
+    return "blank:en"
+
+def run(args: argparse.Namespace) -> Dict:
+    if not args.real_model:
+        install_stub_embedding_model()
+
+    spacy_model = use_blank_spacy_if_missing()
+
+    random.seed(args.seed)
+    stages = bench_stages(args.resumes, args.rank_pool, args.seed)
+    if not args.skip_api:
+        stages.update(bench_end_to_end(args.api_resumes, args.batch_size, args.seed))
+
+    return {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "embedding_model": "real" if args.real_model else "hashing-stub",
+            "spacy_model": spacy_model,
+        },
+        "parameters": {
+            "resumes": args.resumes,
+            "rank_pool": args.rank_pool,
+            "api_resumes": args.api_resumes,
+            "batch_size": args.batch_size,
+            "seed": args.seed,
+        },
+        "stages": stages,
+    }
+
+def main(argv: Optional[List[str]] = None) -> int:
+    arg_parser = argparse.ArgumentParser(description="Benchmark the resume parse -> embed -> rank pipeline.")
+    arg_parser.add_argument("--resumes", type=int, default=50, help="Synthetic resumes for the per-stage benchmarks")
+    arg_parser.add_argument("--rank-pool", type=int, default=1000, help="Candidates per rank_candidates call")
+    arg_parser.add_argument("--api-resumes", type=int, default=40, help="Resumes uploaded through the API")
+    arg_parser.add_argument("--batch-size", type=int, default=10, help="Resumes per process_resumes request")
+    arg_parser.add_argument("--seed", type=int, default=7)
+    arg_parser.add_argument("--real-model", action="store_true", help="Use the cached SentenceTransformer instead of the stub")
+    arg_parser.add_argument("--skip-api", action="store_true", help="Skip the end-to-end FastAPI benchmarks")
+    arg_parser.add_argument("--output", default="bench_results.json", help="Where to write the results JSON")
+    arg_parser.add_argument("--baseline", help="Results JSON to compare against")
+    arg_parser.add_argument("--threshold", type=float, default=0.25, help="Allowed slowdown ratio before flagging a regression")
+    args = arg_parser.parse_args(argv)
+
+    results = run(args)
+
+    exit_code = 0
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare_to_baseline(results["stages"], baseline.get("stages", {}), args.threshold)
+        results["regressions"] = regressions
+        exit_code = 1 if regressions else 0
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+
+    print(f"{'stage':<36}{'runs':>6}{'p50 ms':>12}{'p95 ms':>12}{'mean ms':>12}")
+    for stage, stats in results["stages"].items():
+        print(f"{stage:<36}{stats['runs']:>6}{stats['p50_ms']:>12.3f}{stats['p95_ms']:>12.3f}{stats['mean_ms']:>12.3f}")
+    for regression in results.get("regressions", []):
+        print(f"REGRESSION {regression['stage']}: {regression['baseline']:.3f} ms -> {regression['current']:.3f} ms (x{regression['ratio']})")
+    print(f"Results written to {args.output}")
+    return exit_code
+
+if __name__ == "__main__":
+    sys.exit(main())
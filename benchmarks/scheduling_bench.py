@@ -0,0 +1,134 @@
+"""
+Interview scheduling benchmark.
+
+Builds a panel of interviewers with working-hours availability over a
+multi-week window, fills a stub calendar with random meetings for each of
+them, and times:
+
+- find_slots for the whole panel plus one candidate over the full window;
+- schedule_many holding a slot for every candidate of a shortlist.
+
+Every slot returned is checked against the stub calendar, availability and
+existing holds, so a fast but wrong result is reported as such. A busy enough
+calendar leaves no common slot at all; that is reported separately.
+
+Run with: python -m app.benchmarks.scheduling_bench --interviewers 10 --weeks 4
+"""
+import argparse
+import json
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Tuple
+
+from app.benchmarks.pipeline_bench import summarize
+from app.scheduling import (
+    InMemoryCalendarProvider,
+    SchedulingEngine,
+    Span,
+    candidate_key,
+    interviewer_key,
+    _to_epoch,
+)
+
+WINDOW_START = datetime(2026, 11, 2, tzinfo=timezone.utc)
+
+def build_engine(interviewers: int, weeks: int, meetings_per_day: int, seed: int) -> Tuple[SchedulingEngine, InMemoryCalendarProvider, List[str], Span]:
+    rng = random.Random(seed)
+    calendar = InMemoryCalendarProvider()
+    engine = SchedulingEngine(calendar, hold_ttl=timedelta(hours=1), slot_step=timedelta(minutes=15))
+    interviewer_ids = [f"interviewer-{i}" for i in range(interviewers)]
+    days = [WINDOW_START + timedelta(days=day) for day in range(weeks * 7)]
+
+    for interviewer_id in interviewer_ids:
+        # Working hours 08:00-18:00 UTC give or take an hour, weekdays only.
+        shift = timedelta(hours=rng.randint(-1, 1))
+        workdays = [day for day in days if day.weekday() < 5]
+        engine.set_availability(
+            interviewer_key(interviewer_id),
+            [(_to_epoch(day + timedelta(hours=8) + shift), _to_epoch(day + timedelta(hours=18) + shift)) for day in workdays],
+        )
+        busy = []
+        for day in workdays:
+            for _ in range(meetings_per_day):
+                start = day + timedelta(hours=8, minutes=15 * rng.randint(0, 36)) + shift
+                busy.append((start, start + timedelta(minutes=rng.choice((30, 45, 60, 90)))))
+        calendar.busy[interviewer_key(interviewer_id)] = busy
+
+    window = (_to_epoch(days[0]), _to_epoch(days[-1] + timedelta(days=1)))
+    return engine, calendar, interviewer_ids, window
+
+def slot_is_free(engine: SchedulingEngine, calendar: InMemoryCalendarProvider, participants: List[str], slot: Span, hold_id: str = "") -> bool:
+    start, end = slot
+    for participant in participants:
+        availability = engine.get_availability(participant)
+        if availability and not any(s <= start and end <= e for s, e in availability):
+            return False
+        if any(_to_epoch(s) < end and _to_epoch(e) > start for s, e in calendar.busy.get(participant, [])):
+            return False
+        bookings = engine._bookings.get(participant)
+        if bookings is not None and any(label != hold_id for _, _, label in bookings.overlapping(start, end)):
+            return False
+    return True
+
+def run(args: argparse.Namespace) -> Dict:
+    engine, calendar, interviewer_ids, window = build_engine(args.interviewers, args.weeks, args.meetings_per_day, args.seed)
+    panel = [interviewer_key(i) for i in interviewer_ids]
+    duration = timedelta(minutes=args.duration)
+
+    timings, correct, answered = [], True, 0
+    for i in range(args.queries):
+        participants = panel + [candidate_key(f"candidate-{i}")]
+        start = time.perf_counter()
+        slots = engine.find_slots(participants, [window], duration, limit=5)
+        timings.append((time.perf_counter() - start) * 1000)
+        answered += bool(slots)
+        correct = correct and all(slot_is_free(engine, calendar, participants, slot) for slot in slots)
+
+    shortlist = [f"shortlisted-{i}" for i in range(args.shortlist)]
+    start = time.perf_counter()
+    holds = engine.schedule_many("bench-job", shortlist, interviewer_ids, [window], duration)
+    schedule_ms = (time.perf_counter() - start) * 1000
+    scheduled = [hold for hold in holds.values() if hold is not None]
+    correct = correct and all(
+        slot_is_free(engine, calendar, panel + [candidate_key(hold.candidate_profile_id)], (_to_epoch(hold.start), _to_epoch(hold.end)), hold.id)
+        for hold in scheduled
+    )
+
+    return {
+        "interviewers": args.interviewers,
+        "weeks": args.weeks,
+        "calendar_events": sum(len(busy) for busy in calendar.busy.values()),
+        "find_slots": {**summarize(timings), "queries_with_slots": answered},
+        "schedule_many": {"candidates": len(shortlist), "scheduled": len(scheduled), "total_ms": round(schedule_ms, 3)},
+        "correct": correct,
+    }
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description="Benchmark panel slot finding over a stub calendar.")
+    arg_parser.add_argument("--interviewers", type=int, default=10)
+    arg_parser.add_argument("--weeks", type=int, default=4)
+    arg_parser.add_argument("--meetings-per-day", type=int, default=2, help="Random calendar events per interviewer per workday")
+    arg_parser.add_argument("--duration", type=int, default=60, help="Interview length in minutes")
+    arg_parser.add_argument("--queries", type=int, default=200)
+    arg_parser.add_argument("--shortlist", type=int, default=20)
+    arg_parser.add_argument("--seed", type=int, default=42)
+    arg_parser.add_argument("--output", help="Write results as JSON")
+    args = arg_parser.parse_args()
+
+    result = run(args)
+    find = result["find_slots"]
+    print(
+        f"{result['interviewers']} interviewers, {result['weeks']} weeks, {result['calendar_events']} calendar events\n"
+        f"find_slots     p50 {find['p50_ms']:.3f} ms  p95 {find['p95_ms']:.3f} ms  ({find['queries_with_slots']}/{find['runs']} found a slot)\n"
+        f"schedule_many  {result['schedule_many']['scheduled']}/{result['schedule_many']['candidates']} held in "
+        f"{result['schedule_many']['total_ms']:.2f} ms\n"
+        f"correct        {result['correct']}"
+    )
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"parameters": vars(args), "result": result}, f, indent=2)
+        print(f"Results written to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Serialization benchmark for ranked candidate responses.
+
+Compares the previous response path (model_dump of the full profile, FastAPI
+re-validation into the response model, JSON encoding) against assembling the
+body from cached per-profile fragments.
+
+Run with: python -m app.benchmarks.serialization_bench
+"""
+import json
+import random
+import time
+import uuid
+from typing import Dict, List, Tuple
+
+from pydantic import BaseModel, TypeAdapter
+
+from app.schemas import CandidateProfile, Education, Experience
+from app.serialization import render_ranked_candidates, clear_profile_fragments
+
+EMBEDDING_DIMENSION = 384
+SKILL_POOL = ["python", "java", "sql", "aws", "docker", "kubernetes", "react", "fastapi", "pandas", "numpy"]
+
+class LegacyRankedCandidateResponse(BaseModel):
+    """Response shape before the lean projection: the full profile including its embedding."""
+    candidate_profile: CandidateProfile
+    match_score: float
+    explainability: Dict
+
+def make_scored_candidates(count: int, seed: int = 42) -> List[Tuple[CandidateProfile, float, Dict]]:
+    rng = random.Random(seed)
+    scored = []
+    for i in range(count):
+        skills = sorted(rng.sample(SKILL_POOL, 4))
+        profile = CandidateProfile(
+            id=str(uuid.UUID(int=rng.getrandbits(128))),
+            name=f"Candidate {i}",
+            email=f"candidate{i}@example.com",
+            phone="555-010-0000",
+            total_experience_years=float(rng.randint(0, 20)),
+            skills=skills,
+            education=[Education(degree="Bachelor of Science", institution="State University", year="2015")],
+            experience=[Experience(title="Software Engineer", company="Acme Corp", years="2016 - 2020", description="Built APIs.")],
+            raw_text="Sample resume text " * 50,
+            embedding=[rng.uniform(-1, 1) for _ in range(EMBEDDING_DIMENSION)],
+        )
+        explainability = {"matched_skills": skills[:2], "total_experience": f"{profile.total_experience_years} years"}
+        scored.append((profile, round(rng.uniform(0, 100), 2), explainability))
+    scored.sort(key=lambda x: x[1], reverse=True)
+    return scored
+
+def serialize_legacy(scored: List[Tuple[CandidateProfile, float, Dict]]) -> bytes:
+    adapter = TypeAdapter(List[LegacyRankedCandidateResponse])
+    ranked = [
+        {"candidate_profile": profile.model_dump(exclude={"raw_text"}), "match_score": score, "explainability": explanation}
+        for profile, score, explanation in scored
+    ]
+    validated = adapter.validate_python(ranked)
+    return json.dumps(adapter.dump_python(validated, mode="json")).encode("utf-8")
+
+def time_call(func, *args, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+def run(sizes: Tuple[int, ...] = (1_000, 10_000)) -> List[Dict]:
+    results = []
+    for size in sizes:
+        scored = make_scored_candidates(size)
+
+        legacy_ms = time_call(serialize_legacy, scored)
+
+        def cold():
+            clear_profile_fragments()
+            render_ranked_candidates(scored)
+
+        cold_ms = time_call(cold)
+        render_ranked_candidates(scored)
+        warm_ms = time_call(render_ranked_candidates, scored)
+
+        results.append({
+            "candidates": size,
+            "legacy_ms": round(legacy_ms, 2),
+            "cached_cold_ms": round(cold_ms, 2),
+            "cached_warm_ms": round(warm_ms, 2),
+            "legacy_bytes": len(serialize_legacy(scored)),
+            "cached_bytes": len(render_ranked_candidates(scored)),
+        })
+    return results
+
+if __name__ == "__main__":
+    for row in run():
+        print(
+            f"{row['candidates']:>6} candidates | legacy {row['legacy_ms']:>9.2f} ms ({row['legacy_bytes']} B) | "
+            f"cached cold {row['cached_cold_ms']:>8.2f} ms | cached warm {row['cached_warm_ms']:>8.2f} ms ({row['cached_bytes']} B)"
+        )
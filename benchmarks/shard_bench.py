@@ -0,0 +1,111 @@
+"""
+Sharded candidate ranking benchmark.
+
+Starts local shard processes on Unix sockets, loads a fixed number of random
+candidate embeddings per shard and times scatter-gather top-k queries as the
+shard count (and with it the candidate count) grows. With one core per shard,
+latency should stay roughly flat. Also checks that merged results match an
+in-process ranking of the same candidates and measures how many candidates a
+rebalance moves when one more shard is added.
+
+Run with: python -m app.benchmarks.shard_bench --shards 1,2,4 --per-shard 20000
+"""
+import argparse
+import json
+import os
+import time
+import uuid
+from typing import Dict, List, Set
+
+import numpy as np
+
+from app.benchmarks.pipeline_bench import summarize
+from app.schemas import CandidateProfile
+from app.sharding import LocalShardCluster, shard_authkey
+
+def make_profiles(count: int, dimension: int, rng: np.random.Generator) -> List[CandidateProfile]:
+    embeddings = rng.normal(size=(count, dimension)).astype(np.float32)
+    return [
+        CandidateProfile(id=str(uuid.UUID(int=int(rng.integers(0, 2**63)) << 64 | i)), name=f"Candidate {i}", raw_text="", embedding=embedding.tolist())
+        for i, embedding in enumerate(embeddings)
+    ]
+
+def reference_top_k(profiles: List[CandidateProfile], query: np.ndarray, k: int) -> Set[str]:
+    matrix = np.asarray([profile.embedding for profile in profiles], dtype=np.float32)
+    scores = matrix @ (query / np.linalg.norm(query)) / np.linalg.norm(matrix, axis=1)
+    return {profiles[row].id for row in np.argsort(-scores)[:k]}
+
+def bench_shard_count(shard_count: int, per_shard: int, args: argparse.Namespace) -> Dict:
+    rng = np.random.default_rng(args.seed)
+    profiles = make_profiles(shard_count * per_shard, args.dimension, rng)
+    queries = rng.normal(size=(args.queries, args.dimension)).astype(np.float32)
+
+    with LocalShardCluster(shard_authkey("shard-bench")) as cluster:
+        coordinator = cluster.start(shard_count)
+        start = time.perf_counter()
+        for offset in range(0, len(profiles), 5000):
+            coordinator.put_profiles(profiles[offset:offset + 5000])
+        load_seconds = time.perf_counter() - start
+        counts = coordinator.count()
+
+        coordinator.rank(queries[0].tolist(), args.top_k)
+        timings = []
+        for query in queries:
+            start = time.perf_counter()
+            coordinator.rank(query.tolist(), args.top_k)
+            timings.append((time.perf_counter() - start) * 1000)
+
+        probe = queries[0]
+        expected = reference_top_k(profiles, probe, args.top_k)
+        matches_reference = {entry[0] for entry in coordinator.rank(probe.tolist(), args.top_k)} == expected
+
+        start = time.perf_counter()
+        moved = cluster.add_shard()
+        rebalance_seconds = time.perf_counter() - start
+        after_rebalance = {entry[0] for entry in coordinator.rank(probe.tolist(), args.top_k)} == expected
+
+    return {
+        "shards": shard_count,
+        "candidates": len(profiles),
+        "per_shard": counts,
+        "load_seconds": round(load_seconds, 3),
+        "rank": summarize(timings),
+        "matches_reference": matches_reference,
+        "rebalance": {
+            "moved": moved,
+            "moved_fraction": round(moved / len(profiles), 4),
+            "ideal_fraction": round(1 / (shard_count + 1), 4),
+            "seconds": round(rebalance_seconds, 3),
+            "matches_reference": after_rebalance,
+        },
+    }
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description="Benchmark scatter-gather ranking over local candidate shards.")
+    arg_parser.add_argument("--shards", default="1,2,4", help="Comma-separated shard counts to run")
+    arg_parser.add_argument("--per-shard", type=int, default=20000, help="Candidates per shard")
+    arg_parser.add_argument("--dimension", type=int, default=384)
+    arg_parser.add_argument("--queries", type=int, default=50)
+    arg_parser.add_argument("--top-k", type=int, default=50)
+    arg_parser.add_argument("--seed", type=int, default=42)
+    arg_parser.add_argument("--output", help="Write results as JSON")
+    args = arg_parser.parse_args()
+
+    results = []
+    print(f"{'shards':>6}{'candidates':>12}{'p50 ms':>10}{'p95 ms':>10}{'moved on +1':>13}{'correct':>9}")
+    for shard_count in (int(count) for count in args.shards.split(",")):
+        result = bench_shard_count(shard_count, args.per_shard, args)
+        results.append(result)
+        print(
+            f"{result['shards']:>6}{result['candidates']:>12}{result['rank']['p50_ms']:>10.2f}{result['rank']['p95_ms']:>10.2f}"
+            f"{result['rebalance']['moved_fraction']:>13.1%}{str(result['matches_reference'] and result['rebalance']['matches_reference']):>9}"
+        )
+    print(f"CPU cores: {os.cpu_count()} (latency only stays flat while each shard has a core to itself)")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"cpu_count": os.cpu_count(), "parameters": vars(args), "results": results}, f, indent=2)
+        print(f"Results written to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,18 @@
+"""
+Offline stand-in for the embedding model used by benchmarks.
+
+Switches ai_matcher to the "hash" embedding backend, whose embeddings are a
+signed hashed bag-of-words: deterministic across runs, and texts sharing
+vocabulary still score as similar.
+"""
+import os
+
+def install_stub_embedding_model() -> None:
+    """Replaces the loaded embedding backend with the hash backend. Call before any embedding work."""
+    # Keep huggingface_hub from retrying network downloads when ai_matcher is first imported,
+    # and skip loading the real model altogether unless a backend was chosen explicitly.
+    os.environ.setdefault("HF_HUB_OFFLINE", "1")
+    os.environ.setdefault("EMBEDDING_BACKEND", "hash")
+    import app.ai_matcher as ai_matcher
+    from app.embedding_backends import HashEmbeddingBackend
+    ai_matcher.set_embedding_backend(HashEmbeddingBackend(ai_matcher.settings.EMBEDDING_DIMENSION))
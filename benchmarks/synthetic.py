@@ -0,0 +1,83 @@
+"""
+Synthetic resume and job description generator for benchmarks.
+
+Output follows the layout the parser expects (name on the first line, contact
+details, upper-case section headers) so every extraction path gets exercised.
+"""
+import os
+import random
+from typing import List
+
+import fitz
+
+FIRST_NAMES = ["Alice", "Bruno", "Chen", "Divya", "Elena", "Farid", "Grace", "Hiro", "Ines", "Jonas", "Kemi", "Lucas"]
+LAST_NAMES = ["Anderson", "Bauer", "Costa", "Dubois", "Evans", "Fischer", "Garcia", "Hansen", "Ito", "Jensen", "Kowalski"]
+SKILLS = ["python", "java", "javascript", "react", "sql", "aws", "azure", "docker", "kubernetes", "git", "linux",
+          "machine learning", "tensorflow", "pytorch", "pandas", "numpy", "fastapi", "django", "flask", "excel"]
+TITLES = ["Software Engineer", "Data Scientist", "Backend Developer", "Machine Learning Engineer", "Data Analyst",
+          "Cloud Architect", "Product Manager", "Frontend Developer"]
+COMPANIES = ["Acme Corp", "Globex Inc", "Initech Solutions", "Umbrella Technologies", "Stark Systems", "Wayne Group"]
+DEGREES = ["Bachelor of Science in Computer Science", "Master of Science in Data Science", "Bachelor of Engineering",
+           "Master of Business Administration"]
+INSTITUTIONS = ["Stanford University", "Imperial College", "Massachusetts Institute", "Delhi Technological University",
+                "Lakeside College"]
+DUTIES = ["Designed and shipped REST APIs", "Built data pipelines", "Led a team of engineers", "Improved latency by 40%",
+          "Deployed models to production", "Automated CI/CD workflows", "Mentored junior developers"]
+
+def generate_resume_text(rng: random.Random) -> str:
+    name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+    email = f"{name.lower().replace(' ', '.')}{rng.randint(1, 999)}@example.com"
+    phone = f"555-{rng.randint(100, 999)}-{rng.randint(1000, 9999)}"
+
+    lines = [name, email, phone, "", "SUMMARY", "Engineer with experience delivering production systems.", ""]
+
+    lines.append("EXPERIENCE")
+    year = 2024
+    for _ in range(rng.randint(1, 4)):
+        start = year - rng.randint(1, 4)
+        lines.append(f"{rng.choice(TITLES)} at {rng.choice(COMPANIES)} {start} - {year}")
+        for duty in rng.sample(DUTIES, 2):
+            lines.append(f"- {duty}")
+        lines.append("")
+        year = start - 1
+
+    lines.append("EDUCATION")
+    for _ in range(rng.randint(1, 2)):
+        lines.append(f"{rng.choice(DEGREES)} at {rng.choice(INSTITUTIONS)} {year - rng.randint(0, 4)}")
+    lines.append("")
+
+    lines.append("SKILLS")
+    lines.append(", ".join(rng.sample(SKILLS, rng.randint(3, 8))))
+    return "\n".join(lines)
+
+def generate_job_description(rng: random.Random) -> dict:
+    title = rng.choice(TITLES)
+    skills = rng.sample(SKILLS, 5)
+    description = (
+        f"We are hiring a {title} to join our team. Required skills: {', '.join(skills)}. "
+        f"You will {rng.choice(DUTIES).lower()} and {rng.choice(DUTIES).lower()}."
+    )
+    return {"title": title, "description": description}
+
+def generate_resumes(count: int, seed: int = 0) -> List[str]:
+    rng = random.Random(seed)
+    return [generate_resume_text(rng) for _ in range(count)]
+
+def generate_job_descriptions(count: int, seed: int = 0) -> List[dict]:
+    rng = random.Random(seed)
+    return [generate_job_description(rng) for _ in range(count)]
+
+def resume_pdf_bytes(text: str) -> bytes:
+    with fitz.open() as doc:
+        page = doc.new_page()
+        page.insert_textbox(fitz.Rect(50, 50, page.rect.width - 50, page.rect.height - 50), text, fontsize=10)
+        return doc.tobytes()
+
+def write_resume_pdf(text: str, path: str) -> str:
+    with open(path, "wb") as f:
+        f.write(resume_pdf_bytes(text))
+    return path
+
+def write_resume_pdfs(texts: List[str], directory: str, prefix: str = "resume") -> List[str]:
+    os.makedirs(directory, exist_ok=True)
+    return [write_resume_pdf(text, os.path.join(directory, f"{prefix}_{i:05d}.pdf")) for i, text in enumerate(texts)]
@@ -1,34 +1,108 @@
-from fastapi import APIRouter, HTTPException, status, Path, UploadFile, File, Query
-from typing import List
+from fastapi import APIRouter, HTTPException, status, Path, UploadFile, File, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from typing import List, Optional, Tuple
 from datetime import datetime, timezone
 import uuid
 
 from app.schemas import (
     JobDescription,
+    JobListing,
+    JobSearchMode,
     CandidateProfile,
     CandidateApplication,
     ApplicationStatus,
+    ApplicationStatusChange,
     CandidateAvailability,
+    JobRecommendation,
 )
-from app.core.database import jobs_db, candidates_db, applications_db
+from app.core.database import (
+    jobs_db, candidates_db, applications_db, job_catalogue, change_journal, standing_matches, candidate_shards, job_with_candidates,
+    resident_profile, index_candidate_profiles,
+)
+from app.change_journal import APPLICATIONS, APPLICATION_STATUS_HISTORY, CANDIDATES
 from app.parser import parse_resume_file
 from app.utils import read_uploaded_file_to_text
+from app.admission import admission_controller, client_key, Priority
+from app.serialization import dumps, render_job, invalidate_profile_fragment
+from app.job_catalogue import decode_cursor, encode_cursor, parse_fields, project_job, DEFAULT_LISTING_FIELDS
+from app.ai_matcher import generate_text_embedding
+from app.metrics import RESUMES_PARSED, RESUMES_FAILED
+from app.scheduling import scheduling_engine, parse_slots, default_timezone, candidate_key, SlotParseError
+from app.http_cache import conditional_response, JOBS_COLLECTION_KEY, job_key
 
 router = APIRouter(prefix="/candidate", tags=["Candidate"])
 
-@router.get("/jobs", response_model=List[JobDescription])
-async def get_public_jobs():
-    return [job for job in jobs_db.values() if job.is_public]
+def _parse_listing_params(cursor: Optional[str], fields: Optional[str]):
+    try:
+        return decode_cursor(cursor), parse_fields(fields)
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
+
+def _project_listing(job: JobDescription, projection: Tuple[str, ...]) -> dict:
+    if "processed_candidate_profiles_ids" in projection:
+        job = job_with_candidates(job)
+    return project_job(job, projection)
+
+def _page_headers(next_position: Optional[int]) -> dict:
+    return {"X-Next-Cursor": encode_cursor(next_position)} if next_position is not None else {}
+
+@router.get("/jobs", response_model=List[JobListing])
+async def get_public_jobs(
+    request: Request,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header of the previous page"),
+    fields: Optional[str] = Query(None, description="Comma-separated job fields to return"),
+):
+    position, projection = _parse_listing_params(cursor, fields)
+
+    def build_page():
+        page, next_position = job_catalogue.list_page(position, limit)
+        return dumps([_project_listing(job, projection) for job in page]), _page_headers(next_position)
+
+    return conditional_response(
+        request,
+        JOBS_COLLECTION_KEY,
+        build_page,
+        variant=f"public:{position}:{limit}:{','.join(projection)}",
+    )
+
+@router.get("/jobs/search", response_model=List[JobListing])
+async def search_public_jobs(
+    request: Request,
+    q: str = Query(..., min_length=1),
+    mode: JobSearchMode = Query(JobSearchMode.KEYWORD),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header of the previous page"),
+    fields: Optional[str] = Query(None, description="Comma-separated job fields to return"),
+):
+    offset, projection = _parse_listing_params(cursor, fields)
+
+    def build_results():
+        if mode == JobSearchMode.SEMANTIC:
+            matches = [job for job, _ in job_catalogue.semantic_search(generate_text_embedding(q), offset + limit + 1)]
+        else:
+            matches = job_catalogue.keyword_search(q)
+        page = matches[offset:offset + limit]
+        next_position = offset + limit if len(matches) > offset + limit else None
+        return dumps([_project_listing(job, projection) for job in page]), _page_headers(next_position)
+
+    return conditional_response(
+        request,
+        JOBS_COLLECTION_KEY,
+        build_results,
+        variant=f"search:{mode.value}:{q}:{offset}:{limit}:{','.join(projection)}",
+    )
 
 @router.get("/jobs/{job_id}", response_model=JobDescription)
-async def get_public_job_details(job_id: str = Path(...)):
+async def get_public_job_details(request: Request, job_id: str = Path(...)):
     job = jobs_db.get(job_id)
     if not job or not job.is_public:
         raise HTTPException(status_code=404, detail="Public job not found")
-    return job
+    return conditional_response(request, job_key(job_id), lambda: render_job(job_with_candidates(job)))
 
 @router.post("/apply/{job_id}", response_model=CandidateApplication, status_code=status.HTTP_201_CREATED)
 async def apply_for_job(
+    request: Request,
     job_id: str = Path(...),
     resume_file: UploadFile = File(...),
     candidate_user_id: str = Query("test_candidate_user_001", description="Dummy user ID for testing without authentication")
@@ -41,32 +115,46 @@ async def apply_for_job(
         if app_entry.candidate_user_id == candidate_user_id and app_entry.job_id == job_id:
             raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="You have already applied for this job.")
 
-    try:
-        resume_text = await read_uploaded_file_to_text(resume_file)
-        candidate_profile = parse_resume_file(resume_text, user_id=candidate_user_id)
-        
-        if not (candidate_profile and candidate_profile.raw_text and candidate_profile.raw_text.strip()):
-            raise ValueError("Resume parsing failed or resulted in empty content.")
-
-        candidates_db[candidate_profile.id] = candidate_profile
-
-        new_application = CandidateApplication(
-            id=str(uuid.uuid4()),
-            candidate_user_id=candidate_user_id,
-            job_id=job_id,
-            candidate_profile_id=candidate_profile.id,
-            status=ApplicationStatus.APPLIED,
-            applied_at=datetime.now(timezone.utc)
-        )
-        applications_db[new_application.id] = new_application
+    client = client_key(request)
+    admission_controller.check_rate(client, Priority.INTERACTIVE)
 
-        return new_application
-
-    except ValueError as ve:
-        raise HTTPException(status_code=400, detail=str(ve))
-    except Exception as e:
-        print(f"Error during application for job {job_id} by candidate {candidate_user_id}: {e}")
-        raise HTTPException(status_code=500, detail="An internal error occurred during application processing.")
+    async with admission_controller.slot(client, Priority.INTERACTIVE):
+        try:
+            resume_text = await read_uploaded_file_to_text(resume_file)
+            candidate_profile = await run_in_threadpool(parse_resume_file, resume_text, candidate_user_id)
+        
+            if not (candidate_profile and candidate_profile.raw_text and candidate_profile.raw_text.strip()):
+                raise ValueError("Resume parsing failed or resulted in empty content.")
+            RESUMES_PARSED.inc(source="application")
+
+            candidates_db[candidate_profile.id] = resident_profile(candidate_profile)
+            invalidate_profile_fragment(candidate_profile.id)
+            change_journal.record(CANDIDATES, candidate_profile.id)
+            await run_in_threadpool(index_candidate_profiles, [candidate_profile])
+
+            applied_at = datetime.now(timezone.utc)
+            new_application = CandidateApplication(
+                id=str(uuid.uuid4()),
+                candidate_user_id=candidate_user_id,
+                job_id=job_id,
+                candidate_profile_id=candidate_profile.id,
+                status=ApplicationStatus.APPLIED,
+                applied_at=applied_at,
+                status_history=[ApplicationStatusChange(status=ApplicationStatus.APPLIED, changed_at=applied_at)]
+            )
+            applications_db[new_application.id] = new_application
+            change_journal.record(APPLICATIONS, new_application.id)
+            change_journal.record(APPLICATION_STATUS_HISTORY, (new_application.id, 0))
+
+            return new_application
+
+        except ValueError as ve:
+            RESUMES_FAILED.inc(source="application")
+            raise HTTPException(status_code=400, detail=str(ve))
+        except Exception as e:
+            RESUMES_FAILED.inc(source="application")
+            print(f"Error during application for job {job_id} by candidate {candidate_user_id}: {e}")
+            raise HTTPException(status_code=500, detail="An internal error occurred during application processing.")
 
 @router.get("/{candidate_user_id}/applications", response_model=List[CandidateApplication])
 async def get_candidate_applications(
@@ -79,23 +167,23 @@ async def submit_candidate_availability(
     availability_data: CandidateAvailability,
     candidate_user_id: str = Path(...),
 ):
-    found_application_for_job = False
+    application_for_job = None
     for app_obj in applications_db.values():
         if app_obj.candidate_user_id == candidate_user_id and app_obj.job_id == availability_data.job_id:
-            found_application_for_job = True
+            application_for_job = app_obj
             break
     
-    if not found_application_for_job:
+    if not application_for_job:
         raise HTTPException(status_code=400, detail=f"Candidate has not applied for job '{availability_data.job_id}'.")
 
-    print(f"\n--- CANDIDATE AVAILABILITY RECEIVED ---")
-    print(f"Candidate User: {candidate_user_id}")
-    print(f"Job: {availability_data.job_id}")
-    print(f"Available Slots: {availability_data.available_slots}")
-    print(f"Notes: {availability_data.notes or 'None'}")
-    print(f"--- Handing off to scheduling matching service... (Chaithanya's part) ---\n")
+    try:
+        spans = parse_slots(availability_data.available_slots, default_timezone())
+    except SlotParseError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    scheduling_engine.set_availability(candidate_key(application_for_job.candidate_profile_id), spans)
 
-    return {"message": "Candidate availability received and will be processed."}
+    return {"message": "Candidate availability received and will be processed.", "normalized_slots": len(spans)}
 
 @router.get("/profiles/{candidate_profile_id}", response_model=CandidateProfile)
 async def get_candidate_profile(
@@ -104,5 +192,32 @@ async def get_candidate_profile(
     candidate_profile = candidates_db.get(candidate_profile_id)
     if not candidate_profile:
         raise HTTPException(status_code=404, detail="Candidate profile not found.")
-    
-    return candidate_profile.model_dump(exclude={"raw_text"})
\ No newline at end of file
+
+    if candidate_shards is not None:
+        # candidates_db keeps sharded profiles without their embedding.
+        embedding = await run_in_threadpool(candidate_shards.embedding, candidate_profile_id)
+        candidate_profile = candidate_profile.model_copy(update={"embedding": embedding})
+    return candidate_profile.model_dump(exclude={"raw_text"})
+
+@router.get("/profiles/{candidate_profile_id}/recommended_jobs", response_model=List[JobRecommendation])
+async def get_recommended_jobs(
+    candidate_profile_id: str = Path(...),
+    limit: Optional[int] = Query(None, ge=1),
+):
+    """
+    Best matching open jobs for a candidate profile, precomputed as jobs and profiles change.
+    With candidate sharding enabled, the candidate's embedding is read from its shard and matched on demand instead.
+    """
+    if candidate_profile_id not in candidates_db:
+        raise HTTPException(status_code=404, detail="Candidate profile not found.")
+
+    if candidate_shards is not None:
+        embedding = await run_in_threadpool(candidate_shards.embedding, candidate_profile_id)
+        matches = standing_matches.match_jobs(embedding, limit)
+    else:
+        matches = standing_matches.top_jobs(candidate_profile_id, limit)
+    return [
+        {"job": project_job(job_catalogue.get(job_id), DEFAULT_LISTING_FIELDS), "match_score": score}
+        for job_id, score in matches
+        if job_id in job_catalogue
+    ]
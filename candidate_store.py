@@ -0,0 +1,94 @@
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from typing import Iterable, Iterator, List, Optional, Set, Tuple
+
+import numpy as np
+
+from app.schemas import CandidateProfile
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS candidates (
+    id TEXT PRIMARY KEY,
+    user_id TEXT,
+    source TEXT,
+    profile_json TEXT NOT NULL,
+    embedding BLOB,
+    created_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS ingested_files (
+    source_key TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    candidate_id TEXT,
+    error TEXT,
+    ingested_at TEXT NOT NULL
+);
+"""
+
+# (source_key, candidate_id or None, error or None)
+IngestRecord = Tuple[str, Optional[str], Optional[str]]
+
+class CandidateStore:
+    """
+    SQLite-backed persistent store for parsed candidate profiles.
+
+    Embeddings are stored as float32 blobs next to the profile JSON. The
+    ingested_files table doubles as the bulk ingester's checkpoint: a file's
+    outcome is written in the same transaction as its profile, so an
+    interrupted run never records a file without its candidate (or vice versa).
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def write_batch(self, profiles: List[Tuple[CandidateProfile, str]], failures: Iterable[Tuple[str, str]] = ()) -> None:
+        """Writes (profile, source_key) pairs and (source_key, error) failures in one transaction."""
+        now = datetime.now(timezone.utc).isoformat()
+        candidate_rows = []
+        file_rows = []
+        for profile, source_key in profiles:
+            embedding = np.asarray(profile.embedding, dtype=np.float32).tobytes() if profile.embedding is not None else None
+            candidate_rows.append((
+                profile.id,
+                profile.user_id,
+                source_key,
+                profile.model_dump_json(exclude={"embedding"}),
+                embedding,
+                now,
+            ))
+            file_rows.append((source_key, "parsed", profile.id, None, now))
+        file_rows.extend((source_key, "failed", None, error, now) for source_key, error in failures)
+
+        with self._lock, self._conn:
+            self._conn.executemany("INSERT OR REPLACE INTO candidates VALUES (?, ?, ?, ?, ?, ?)", candidate_rows)
+            self._conn.executemany("INSERT OR REPLACE INTO ingested_files VALUES (?, ?, ?, ?, ?)", file_rows)
+
+    def completed_sources(self, include_failed: bool = True) -> Set[str]:
+        query = "SELECT source_key FROM ingested_files" if include_failed else "SELECT source_key FROM ingested_files WHERE status = 'parsed'"
+        with self._lock:
+            return {row[0] for row in self._conn.execute(query)}
+
+    def iter_profiles(self) -> Iterator[CandidateProfile]:
+        with self._lock:
+            rows = self._conn.execute("SELECT profile_json, embedding FROM candidates ORDER BY created_at").fetchall()
+        for profile_json, embedding in rows:
+            profile = CandidateProfile.model_validate_json(profile_json)
+            if embedding is not None:
+                profile.embedding = np.frombuffer(embedding, dtype=np.float32).tolist()
+            yield profile
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM candidates").fetchone()[0]
+
+    def failures(self) -> List[Tuple[str, str]]:
+        with self._lock:
+            return self._conn.execute("SELECT source_key, error FROM ingested_files WHERE status = 'failed'").fetchall()
@@ -0,0 +1,90 @@
+import json
+import os
+import threading
+from typing import Dict, Hashable, List, Optional, Tuple
+
+CANDIDATES = "candidates"
+APPLICATIONS = "applications"
+APPLICATION_STATUS_HISTORY = "application_status_history"
+JOBS = "jobs"
+
+# Kept next to the export watermark, so the two are reset together.
+SEQUENCE_FILE = "_sequence.json"
+SEQUENCE_RESERVATION = 10000
+
+class ChangeJournal:
+    """
+    Records which rows of the in-memory stores changed, keyed by a global,
+    monotonically increasing sequence number. Only the latest sequence per row
+    is kept, so memory is bounded by the number of rows rather than the number
+    of writes. Exports use the sequence as their watermark.
+
+    With a state_path the sequence keeps increasing across restarts: blocks of
+    `reserve` numbers are recorded in the file before any of them is handed
+    out, and a new process continues after the last reserved block. A restart
+    leaves a gap but never reuses a number.
+    """
+
+    def __init__(self, state_path: Optional[str] = None, reserve: int = SEQUENCE_RESERVATION):
+        self.state_path = state_path
+        self.reserve = max(1, reserve)
+        self._lock = threading.Lock()
+        # Highest number this process may hand out without reserving another block.
+        self._reserved = self._load_reserved()
+        self._current = self._reserved
+        self._latest: Dict[str, Dict[Hashable, int]] = {}
+
+    def _load_reserved(self) -> int:
+        if not self.state_path:
+            return 0
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                return int(json.load(f).get("reserved", 0))
+        except FileNotFoundError:
+            return 0
+        except (OSError, ValueError, TypeError, AttributeError) as e:
+            print(f"Warning: Could not read change sequence state {self.state_path}: {e}. Starting from 0.")
+            return 0
+
+    def _reserve_block(self) -> None:
+        reserved = self._current + self.reserve - 1
+        if self.state_path:
+            try:
+                os.makedirs(os.path.dirname(self.state_path) or ".", exist_ok=True)
+                tmp_path = self.state_path + ".tmp"
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump({"reserved": reserved}, f)
+                os.replace(tmp_path, self.state_path)
+            except OSError as e:
+                print(f"Warning: Could not persist change sequence state {self.state_path}: {e}. Sequences may repeat after a restart.")
+        self._reserved = reserved
+
+    @property
+    def sequence(self) -> int:
+        """The sequence number of the most recent change (where the previous process left off before any change)."""
+        return self._current
+
+    def record(self, table: str, *keys: Hashable) -> int:
+        with self._lock:
+            rows = self._latest.setdefault(table, {})
+            for key in keys:
+                self._current += 1
+                if self._current > self._reserved:
+                    self._reserve_block()
+                # Re-insert so each table's dict stays ordered by sequence.
+                rows.pop(key, None)
+                rows[key] = self._current
+            return self._current
+
+    def changed_between(self, table: str, after: int, up_to: int) -> List[Tuple[Hashable, int]]:
+        """(key, sequence) for rows of table whose latest change is in (after, up_to], oldest first."""
+        changed = []
+        with self._lock:
+            # Each table's dict is ordered by sequence, so only the changed tail is visited.
+            for key, sequence in reversed(self._latest.get(table, {}).items()):
+                if sequence <= after:
+                    break
+                if sequence <= up_to:
+                    changed.append((key, sequence))
+        changed.reverse()
+        return changed
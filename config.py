@@ -1,12 +1,60 @@
 import os
+import secrets
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
     APP_NAME: str = "AI Hiring Assistant API"
     APP_VERSION: str = "1.0.0"
     UPLOAD_DIR: str = "temp_uploads"
+    RESPONSE_CACHE_MAX_ENTRIES: int = 256
+    PROFILE_FRAGMENT_CACHE_MAX_ENTRIES: int = 10_000
+    TRACE_HEADERS: bool = False
+    PROFILER_SAMPLE_RATE: float = 0.0
+    PROFILER_OUTPUT_DIR: str = "profiles"
+    SCHEDULING_DEFAULT_TIMEZONE: str = "UTC"
+    SCHEDULING_SLOT_STEP_MINUTES: int = 15
+    INTERVIEW_HOLD_TTL_MINUTES: int = 30
+    SECRET_KEY: str = ""
+    ACCESS_TOKEN_EXPIRE_MINUTES: int = 60
+    PASSWORD_HASH_ITERATIONS: int = 200_000
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 60
+    PRINCIPAL_CACHE_MAX_ENTRIES: int = 10_000
+    CANDIDATE_STORE_PATH: str = "candidates.db"
+    EMBEDDING_BACKEND: str = "sentence-transformers"
+    EMBEDDING_MODEL_NAME: str = "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"
+    EMBEDDING_THREADS: int = 0
+    EMBEDDING_MAX_SEQ_LENGTH: int = 0
+    EMBEDDING_QUANTIZATION: str = "avx2"
+    EMBEDDING_ONNX_EXPORT_DIR: str = "onnx_models"
+    EMBEDDING_DIMENSION: int = 384
+    ADMISSION_MAX_CONCURRENT: int = os.cpu_count() or 2
+    ADMISSION_RESERVED_INTERACTIVE: int = 1
+    ADMISSION_PER_CLIENT_CONCURRENT: int = 2
+    ADMISSION_MAX_QUEUE_DEPTH: int = 64
+    ADMISSION_QUEUE_TIMEOUT_SECONDS: float = 30.0
+    ADMISSION_INTERACTIVE_RATE: float = 1.0
+    ADMISSION_INTERACTIVE_BURST: float = 5.0
+    ADMISSION_BULK_RATE: float = 5.0
+    ADMISSION_BULK_BURST: float = 200.0
+    EXPORT_DIR: str = "exports"
+    EXPORT_FORMAT: str = "parquet"
+    EXPORT_CHUNK_ROWS: int = 5000
+    STANDING_MATCH_TOP_K: int = 50
+    STANDING_MATCH_MIN_SCORE: float = 0.0
+    CANDIDATE_SHARDS: int = 0
+    CANDIDATE_SHARD_ADDRESSES: str = ""
+    CANDIDATE_SHARD_AUTHKEY: str = ""
+    CANDIDATE_SHARD_SOCKET_DIR: str = ""
+    CANDIDATE_SHARD_VIRTUAL_NODES: int = 128
 
     class Config:
         env_file = ".env"
 
-settings = Settings()
\ No newline at end of file
+settings = Settings()
+
+if not settings.SECRET_KEY:
+    settings.SECRET_KEY = secrets.token_urlsafe(32)
+    print(
+        "Warning: SECRET_KEY is not set; using a random key for this process. "
+        "Access tokens will not survive a restart or be accepted by other workers."
+    )
@@ -1,13 +1,87 @@
-from typing import Dict
-from app.schemas import CandidateProfile, JobDescription, User, CandidateApplication, UserRole
+import os
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from app.schemas import CandidateProfile, JobDescription, User, CandidateApplication, UserRole, ApplicationStatus, ApplicationStatusChange
 import uuid
-from app.ai_matcher import generate_text_embedding, create_job_embedding_text
+from app.ai_matcher import generate_text_embedding, create_job_embedding_text, match_scores
+from app.job_catalogue import JobCatalogue
+from app.candidate_store import CandidateStore
+from app.change_journal import ChangeJournal, APPLICATIONS, APPLICATION_STATUS_HISTORY, CANDIDATES, JOBS, SEQUENCE_FILE
+from app.standing_matches import StandingMatchEngine
+from app.job_candidates import JobCandidateIndex
+from app.sharding import ShardCoordinator, create_shard_coordinator
+from app.core.config import settings
 
 jobs_db: Dict[str, JobDescription] = {}
 candidates_db: Dict[str, CandidateProfile] = {}
 users_db: Dict[str, User] = {}
 applications_db: Dict[str, CandidateApplication] = {}
 
+# Public job listing/search index, kept in sync with jobs_db on every job mutation
+job_catalogue = JobCatalogue()
+
+# Row-level change tracking for incremental analytics exports; record every insert/update/delete.
+# The sequence is persisted next to the export watermark so it keeps increasing across restarts.
+change_journal = ChangeJournal(os.path.join(settings.EXPORT_DIR, SEQUENCE_FILE))
+
+# Optional candidate shards (CANDIDATE_SHARDS / CANDIDATE_SHARD_ADDRESSES). When enabled they are the only
+# holders of candidate embeddings and do all candidate ranking; candidates_db keeps profiles without them.
+candidate_shards: Optional[ShardCoordinator] = None
+if settings.CANDIDATE_SHARDS > 0 or settings.CANDIDATE_SHARD_ADDRESSES:
+    candidate_shards = create_shard_coordinator(settings)
+
+# Candidates processed for each job, ranked from per-job embedding row arrays; the only record of
+# JobDescription.processed_candidate_profiles_ids, which is filled in when jobs are served (job_with_candidates)
+job_candidates = JobCandidateIndex(store_embeddings=candidate_shards is None)
+
+# Precomputed top matches per job and per candidate; upsert every job change, and candidates through
+# index_candidate_profiles (with sharding, only jobs are held and candidates are matched on demand)
+standing_matches = StandingMatchEngine(top_k=settings.STANDING_MATCH_TOP_K, min_score=settings.STANDING_MATCH_MIN_SCORE)
+
+def job_with_candidates(job: JobDescription) -> JobDescription:
+    """A copy of the job with processed_candidate_profiles_ids read from job_candidates, for responses."""
+    return job.model_copy(update={"processed_candidate_profiles_ids": job_candidates.candidate_ids(job.id)})
+
+def resident_profile(profile: CandidateProfile) -> CandidateProfile:
+    """The copy of a profile kept in candidates_db: without its embedding when the candidate shards hold it."""
+    return profile.model_copy(update={"embedding": None}) if candidate_shards is not None else profile
+
+def index_candidate_profiles(profiles: List[CandidateProfile]) -> None:
+    """Makes new or updated profiles matchable: on the candidate shards if enabled, otherwise in standing_matches. Blocking."""
+    if candidate_shards is not None:
+        candidate_shards.put_profiles(profiles)
+    else:
+        standing_matches.upsert_candidates(profiles)
+
+def score_job_candidates(job: JobDescription, candidate_ids: List[str]) -> Dict[str, float]:
+    """
+    Match scores of the given candidates for a job, in candidate_ids order,
+    skipping candidates without an embedding. Scored on the candidate shards
+    when enabled, since candidates_db then holds no embeddings. Blocking.
+    """
+    if candidate_shards is not None:
+        return candidate_shards.score_profiles(job.embedding, candidate_ids)
+    embedded = [candidate_id for candidate_id in candidate_ids if candidate_id in candidates_db and candidates_db[candidate_id].embedding]
+    if not job.embedding or not embedded:
+        return {}
+    scores = match_scores(job.embedding, np.array([candidates_db[candidate_id].embedding for candidate_id in embedded]))
+    return dict(zip(embedded, scores.tolist()))
+
+def rank_job_candidates(job: JobDescription) -> List[Tuple[str, float]]:
+    """(candidate id, match score) for the job's processed candidates, best first; on the candidate shards when enabled. Blocking."""
+    if candidate_shards is None:
+        return job_candidates.rank(job.id, job.embedding)
+    scores = candidate_shards.score_profiles(job.embedding, job_candidates.candidate_ids(job.id))
+    # Stable, so equal scores keep insertion order as in job_candidates.rank.
+    return sorted(scores.items(), key=lambda item: -item[1])
+
+def update_application_status(application: CandidateApplication, new_status: ApplicationStatus) -> None:
+    """Sets the status, appends it to the application's status history and journals both."""
+    application.status = new_status
+    application.status_history.append(ApplicationStatusChange(status=new_status))
+    change_journal.record(APPLICATIONS, application.id)
+    change_journal.record(APPLICATION_STATUS_HISTORY, (application.id, len(application.status_history) - 1))
+
 # Example data for initial testing
 
 # Add public jobs with pre-computed embeddings
@@ -43,4 +117,26 @@ jobs_db[job_id_2] = JobDescription(
     posted_by="Recruiter",
     is_public=True,
     embedding=job_embedding_2
-)
\ No newline at end of file
+)
+
+for seeded_job in jobs_db.values():
+    job_catalogue.sync_job(seeded_job)
+change_journal.record(JOBS, *jobs_db)
+standing_matches.upsert_jobs(jobs_db.values())
+
+# Candidates written by the offline bulk ingester (python -m app.ingest)
+if os.path.exists(settings.CANDIDATE_STORE_PATH):
+    candidate_store = CandidateStore(settings.CANDIDATE_STORE_PATH)
+    try:
+        # Indexed in batches, so with sharding the full profiles are never all in memory at once.
+        stored_profiles = []
+        for stored_profile in candidate_store.iter_profiles():
+            stored_profiles.append(stored_profile)
+            candidates_db[stored_profile.id] = resident_profile(stored_profile)
+            if len(stored_profiles) >= 1000:
+                index_candidate_profiles(stored_profiles)
+                stored_profiles = []
+        index_candidate_profiles(stored_profiles)
+        change_journal.record(CANDIDATES, *candidates_db)
+    finally:
+        candidate_store.close()
\ No newline at end of file
@@ -0,0 +1,163 @@
+"""
+CPU embedding backends for ai_matcher.
+
+All backends turn a list of texts into a (len(texts), dimension) float32 array.
+The backend is chosen with settings.EMBEDDING_BACKEND:
+
+- "sentence-transformers": the PyTorch SentenceTransformer model (default)
+- "onnx": the same model exported to ONNX and run with ONNX Runtime
+- "onnx-int8": a dynamically int8-quantized ONNX export
+- "hash": deterministic hashed bag-of-words, no model download (tests/benchmarks)
+
+ONNX backends need `pip install sentence-transformers[onnx]`.
+"""
+import hashlib
+import os
+import re
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, List
+
+import numpy as np
+
+from app.core.config import Settings
+
+QUANTIZATION_CONFIGS = ("arm64", "avx2", "avx512", "avx512_vnni")
+
+class EmbeddingBackend(ABC):
+    name = ""
+
+    @property
+    @abstractmethod
+    def dimension(self) -> int:
+        ...
+
+    @abstractmethod
+    def encode(self, texts: List[str], batch_size: int = 32) -> np.ndarray:
+        ...
+
+class SentenceTransformerBackend(EmbeddingBackend):
+    """
+    The PyTorch SentenceTransformer model. Subclasses only change how the
+    model is loaded (_load_model / _model_args); encoding is shared.
+    """
+    name = "sentence-transformers"
+
+    def __init__(self, model_name: str, threads: int = 0, max_seq_length: int = 0):
+        if threads > 0:
+            import torch
+            torch.set_num_threads(threads)
+        self.model = self._load_model(model_name, threads)
+        if max_seq_length > 0:
+            self.model.max_seq_length = max_seq_length
+
+    def _load_model(self, model_name: str, threads: int):
+        from sentence_transformers import SentenceTransformer
+
+        return SentenceTransformer(model_name, device="cpu", **self._model_args(threads))
+
+    def _model_args(self, threads: int) -> Dict:
+        return {}
+
+    @property
+    def dimension(self) -> int:
+        return self.model.get_sentence_embedding_dimension()
+
+    def encode(self, texts: List[str], batch_size: int = 32) -> np.ndarray:
+        return np.asarray(self.model.encode(texts, batch_size=batch_size, convert_to_numpy=True), dtype=np.float32)
+
+class OnnxBackend(SentenceTransformerBackend):
+    """The SentenceTransformer model exported to ONNX and run with ONNX Runtime."""
+    name = "onnx"
+
+    def _model_args(self, threads: int) -> Dict:
+        return {"backend": "onnx", "model_kwargs": self._onnx_model_kwargs(threads)}
+
+    @staticmethod
+    def _onnx_model_kwargs(threads: int) -> Dict:
+        import onnxruntime
+
+        session_options = onnxruntime.SessionOptions()
+        if threads > 0:
+            session_options.intra_op_num_threads = threads
+        return {"provider": "CPUExecutionProvider", "session_options": session_options}
+
+class QuantizedOnnxBackend(OnnxBackend):
+    """
+    Dynamically int8-quantized ONNX model. Uses the quantized file published
+    with the model when there is one, otherwise quantizes the ONNX export once
+    into export_dir and loads it from there on later runs.
+    """
+    name = "onnx-int8"
+
+    def __init__(self, model_name: str, threads: int = 0, max_seq_length: int = 0, quantization: str = "avx2", export_dir: str = "onnx_models"):
+        if quantization not in QUANTIZATION_CONFIGS:
+            raise ValueError(f"Unknown quantization config '{quantization}'. Choose one of {QUANTIZATION_CONFIGS}.")
+        self.quantization = quantization
+        self.export_dir = export_dir
+        super().__init__(model_name, threads, max_seq_length)
+
+    def _load_model(self, model_name: str, threads: int):
+        from sentence_transformers import SentenceTransformer, export_dynamic_quantized_onnx_model
+
+        weights_dtype = "quint8" if self.quantization == "avx2" else "qint8"
+        file_name = f"onnx/model_{weights_dtype}_{self.quantization}.onnx"
+        model_kwargs = self._onnx_model_kwargs(threads)
+        local_dir = os.path.join(self.export_dir, model_name.replace("/", "__"))
+
+        if os.path.exists(os.path.join(local_dir, file_name)):
+            return SentenceTransformer(local_dir, device="cpu", backend="onnx", model_kwargs={**model_kwargs, "file_name": file_name})
+        try:
+            return SentenceTransformer(model_name, device="cpu", backend="onnx", model_kwargs={**model_kwargs, "file_name": file_name})
+        except Exception as e:
+            print(f"No pre-quantized {file_name} for {model_name} ({e}). Quantizing into {local_dir}.")
+        onnx_model = SentenceTransformer(model_name, device="cpu", backend="onnx", model_kwargs=model_kwargs)
+        onnx_model.save(local_dir)
+        export_dynamic_quantized_onnx_model(onnx_model, self.quantization, local_dir)
+        return SentenceTransformer(local_dir, device="cpu", backend="onnx", model_kwargs={**model_kwargs, "file_name": file_name})
+
+TOKEN_PATTERN = re.compile(r"\b\w+\b")
+
+class HashEmbeddingBackend(EmbeddingBackend):
+    """
+    Signed hashed bag-of-words. Deterministic across runs and processes, and
+    texts sharing vocabulary still score as similar, which is enough for tests
+    and benchmarks that must not download a model.
+    """
+    name = "hash"
+
+    def __init__(self, dimension: int = 384):
+        self._dimension = dimension
+
+    @property
+    def dimension(self) -> int:
+        return self._dimension
+
+    def _encode_one(self, text: str) -> np.ndarray:
+        vector = np.zeros(self._dimension, dtype=np.float32)
+        for token in TOKEN_PATTERN.findall(text.lower()):
+            digest = hashlib.md5(token.encode("utf-8")).digest()
+            index = int.from_bytes(digest[:4], "little") % self._dimension
+            vector[index] += 1.0 if digest[4] & 1 else -1.0
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def encode(self, texts: List[str], batch_size: int = 32) -> np.ndarray:
+        if not texts:
+            return np.zeros((0, self._dimension), dtype=np.float32)
+        return np.stack([self._encode_one(text) for text in texts])
+
+EMBEDDING_BACKENDS: Dict[str, Callable[[Settings], EmbeddingBackend]] = {
+    "sentence-transformers": lambda s: SentenceTransformerBackend(s.EMBEDDING_MODEL_NAME, s.EMBEDDING_THREADS, s.EMBEDDING_MAX_SEQ_LENGTH),
+    "onnx": lambda s: OnnxBackend(s.EMBEDDING_MODEL_NAME, s.EMBEDDING_THREADS, s.EMBEDDING_MAX_SEQ_LENGTH),
+    "onnx-int8": lambda s: QuantizedOnnxBackend(
+        s.EMBEDDING_MODEL_NAME, s.EMBEDDING_THREADS, s.EMBEDDING_MAX_SEQ_LENGTH, s.EMBEDDING_QUANTIZATION, s.EMBEDDING_ONNX_EXPORT_DIR
+    ),
+    "hash": lambda s: HashEmbeddingBackend(s.EMBEDDING_DIMENSION),
+}
+
+def create_embedding_backend(settings: Settings, name: str = "") -> EmbeddingBackend:
+    name = name or settings.EMBEDDING_BACKEND
+    factory = EMBEDDING_BACKENDS.get(name)
+    if factory is None:
+        raise ValueError(f"Unknown embedding backend '{name}'. Choose one of {sorted(EMBEDDING_BACKENDS)}.")
+    return factory(settings)
@@ -0,0 +1,133 @@
+import hashlib
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Callable, Dict, Optional, Tuple, Union
+
+from fastapi import Request, Response
+
+from app.core.config import settings
+from app.metrics import record_cache_lookup
+
+JOBS_COLLECTION_KEY = "jobs"
+
+def job_key(job_id: str) -> str:
+    return f"job:{job_id}"
+
+def ranking_key(job_id: str) -> str:
+    return f"ranking:{job_id}"
+
+class ResourceVersions:
+    """Monotonic version counters per resource key, bumped whenever the resource changes."""
+
+    def __init__(self):
+        # Distinguishes ETags across restarts, since counters start again from zero.
+        self.epoch = uuid.uuid4().hex
+        self._started_at = datetime.now(timezone.utc).replace(microsecond=0)
+        self._versions: Dict[str, Tuple[int, datetime]] = {}
+
+    def get(self, key: str) -> Tuple[int, datetime]:
+        return self._versions.get(key, (0, self._started_at))
+
+    def bump(self, *keys: str) -> None:
+        now = datetime.now(timezone.utc).replace(microsecond=0)
+        for key in keys:
+            version, _ = self.get(key)
+            self._versions[key] = (version + 1, now)
+
+# A serialized body plus any extra headers that belong to it (e.g. pagination cursors).
+CachedBody = Tuple[bytes, Dict[str, str]]
+
+class ResponseCache:
+    """Small LRU of serialized response bodies keyed by (resource key, version, variant)."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, int, str], CachedBody]" = OrderedDict()
+
+    def get(self, cache_key: Tuple[str, int, str]) -> Optional[CachedBody]:
+        body = self._entries.get(cache_key)
+        if body is not None:
+            self._entries.move_to_end(cache_key)
+        return body
+
+    def put(self, cache_key: Tuple[str, int, str], body: CachedBody) -> None:
+        if self.max_entries <= 0:
+            return
+        self._entries[cache_key] = body
+        self._entries.move_to_end(cache_key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+resource_versions = ResourceVersions()
+response_cache = ResponseCache(settings.RESPONSE_CACHE_MAX_ENTRIES)
+
+def make_etag(key: str, version: int, variant: str = "") -> str:
+    digest = hashlib.sha1(f"{resource_versions.epoch}:{key}:{version}:{variant}".encode("utf-8")).hexdigest()[:20]
+    return f'"{digest}"'
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+def not_modified_since(if_modified_since: Optional[str], last_modified: datetime) -> bool:
+    if not if_modified_since:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    return last_modified <= since
+
+def conditional_response(
+    request: Request,
+    key: str,
+    build_body: Callable[[], Union[bytes, CachedBody]],
+    variant: str = "",
+) -> Response:
+    """
+    Serves a versioned JSON resource. Returns 304 when the client's validators
+    are current, otherwise the cached body for this version, building it only
+    on a cache miss. `build_body` returns the JSON bytes, or a (bytes, headers)
+    tuple when the body comes with headers of its own.
+    """
+    version, last_modified = resource_versions.get(key)
+    etag = make_etag(key, version, variant)
+    headers = {
+        "ETag": etag,
+        "Last-Modified": format_datetime(last_modified, usegmt=True),
+        "Cache-Control": "no-cache",
+    }
+
+    if_none_match = request.headers.get("if-none-match")
+    if etag_matches(if_none_match, etag) or (
+        if_none_match is None and not_modified_since(request.headers.get("if-modified-since"), last_modified)
+    ):
+        record_cache_lookup("http_not_modified", hit=True)
+        return Response(status_code=304, headers=headers)
+
+    cache_key = (key, version, variant)
+    cached = response_cache.get(cache_key)
+    record_cache_lookup("http_response", hit=cached is not None)
+    if cached is None:
+        built = build_body()
+        cached = built if isinstance(built, tuple) else (built, {})
+        response_cache.put(cache_key, cached)
+
+    body, body_headers = cached
+    return Response(content=body, media_type="application/json", headers={**headers, **body_headers})
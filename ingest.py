@@ -0,0 +1,220 @@
+"""
+Offline bulk ingestion of historical resumes into the persistent candidate store.
+
+Streams resumes from directories and ZIP archives (members are read one at a
+time, nothing is extracted to disk), parses them in a process pool, embeds
+them in batches in the parent process and writes each batch to the SQLite
+store in a single transaction. Every file's outcome is recorded with its
+batch, so re-running the same command after an interruption picks up where
+the previous run stopped.
+
+    python -m app.ingest resumes/ archive_2019.zip --workers 8
+    python -m app.ingest resumes/ --retry-failed
+"""
+import argparse
+import os
+import sys
+import time
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from typing import Iterator, List, Optional, Set, Tuple
+
+from app.ai_matcher import create_candidate_embedding_text, generate_text_embeddings
+from app.candidate_store import CandidateStore
+from app.core.config import settings
+from app.parser import extract_text_from_pdf, parse_resume_file
+from app.schemas import CandidateProfile
+
+SUPPORTED_EXTENSIONS = (".pdf", ".txt")
+
+# (source_key, display name / path, member bytes for archive entries)
+WorkItem = Tuple[str, str, Optional[bytes]]
+
+def _is_resume(name: str) -> bool:
+    return name.lower().endswith(SUPPORTED_EXTENSIONS) and not os.path.basename(name).startswith(".")
+
+def iter_directory(root: str, skip: Set[str]) -> Iterator[WorkItem]:
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        for filename in sorted(filenames):
+            path = os.path.abspath(os.path.join(dirpath, filename))
+            if filename.lower().endswith(".zip"):
+                yield from iter_zip(path, skip)
+            elif _is_resume(filename) and path not in skip:
+                yield path, path, None
+
+def iter_zip(path: str, skip: Set[str]) -> Iterator[WorkItem]:
+    path = os.path.abspath(path)
+    with zipfile.ZipFile(path) as archive:
+        for info in archive.infolist():
+            source_key = f"{path}!{info.filename}"
+            if info.is_dir() or not _is_resume(info.filename) or source_key in skip:
+                continue
+            yield source_key, info.filename, archive.read(info)
+
+def iter_sources(sources: List[str], skip: Set[str]) -> Iterator[WorkItem]:
+    for source in sources:
+        if os.path.isdir(source):
+            yield from iter_directory(source, skip)
+        elif zipfile.is_zipfile(source):
+            yield from iter_zip(source, skip)
+        elif _is_resume(source) and os.path.abspath(source) not in skip:
+            yield os.path.abspath(source), os.path.abspath(source), None
+        else:
+            print(f"Warning: Skipping {source}: not a directory, ZIP archive or supported resume file.")
+
+def _init_worker(verbose: bool) -> None:
+    # The parser prints a debug trace per resume; keep worker output quiet unless asked.
+    if not verbose:
+        sys.stdout = open(os.devnull, "w")
+
+def parse_one(source_key: str, name: str, data: Optional[bytes]) -> Tuple[str, Optional[CandidateProfile], Optional[str]]:
+    """Runs in a worker process: text extraction and parsing, without the embedding."""
+    try:
+        if name.lower().endswith(".pdf"):
+            text = extract_text_from_pdf(name, data)
+        elif data is not None:
+            text = data.decode("utf-8", errors="ignore")
+        else:
+            with open(name, "r", encoding="utf-8", errors="ignore") as f:
+                text = f.read()
+
+        if not text.strip():
+            raise ValueError("File is empty or could not be read as text.")
+        profile = parse_resume_file(text, embed=False)
+        if profile.raw_text and profile.raw_text.startswith("Error:"):
+            raise ValueError(profile.raw_text)
+        return source_key, profile, None
+    except Exception as e:
+        return source_key, None, f"{type(e).__name__}: {e}"
+
+class IngestRun:
+    def __init__(self, store: CandidateStore, embed_batch_size: int, commit_every: int, progress_interval: float):
+        self.store = store
+        self.embed_batch_size = embed_batch_size
+        self.commit_every = commit_every
+        self.progress_interval = progress_interval
+        self.parsed = 0
+        self.failed = 0
+        self.interrupted = False
+        self.started = time.perf_counter()
+        self._last_progress = self.started
+        self._profiles: List[Tuple[CandidateProfile, str]] = []
+        self._failures: List[Tuple[str, str]] = []
+
+    @property
+    def processed(self) -> int:
+        return self.parsed + self.failed
+
+    def files_per_second(self) -> float:
+        elapsed = time.perf_counter() - self.started
+        return self.processed / elapsed if elapsed > 0 else 0.0
+
+    def add(self, source_key: str, profile: Optional[CandidateProfile], error: Optional[str]) -> None:
+        if profile is not None:
+            self._profiles.append((profile, source_key))
+        else:
+            self._failures.append((source_key, error or "Unknown error"))
+        if len(self._profiles) + len(self._failures) >= self.commit_every:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self._profiles and not self._failures:
+            return
+        texts = [create_candidate_embedding_text(profile) for profile, _ in self._profiles]
+        for (profile, _), embedding in zip(self._profiles, generate_text_embeddings(texts, self.embed_batch_size)):
+            profile.embedding = embedding
+        self.store.write_batch(self._profiles, self._failures)
+
+        self.parsed += len(self._profiles)
+        self.failed += len(self._failures)
+        for source_key, error in self._failures:
+            print(f"  FAILED {source_key}: {error}")
+        self._profiles, self._failures = [], []
+
+        now = time.perf_counter()
+        if now - self._last_progress >= self.progress_interval:
+            self._last_progress = now
+            print(f"Progress: {self.processed} files ({self.parsed} parsed, {self.failed} failed), {self.files_per_second():.1f} files/sec")
+
+def ingest(
+    sources: List[str],
+    store: CandidateStore,
+    workers: int,
+    embed_batch_size: int = 64,
+    commit_every: int = 256,
+    retry_failed: bool = False,
+    verbose: bool = False,
+    progress_interval: float = 5.0,
+) -> IngestRun:
+    skip = store.completed_sources(include_failed=not retry_failed)
+    if skip:
+        print(f"Resuming: {len(skip)} files already recorded in {store.path} will be skipped.")
+
+    run = IngestRun(store, embed_batch_size, commit_every, progress_interval)
+    # Bounded number of in-flight files, so archive members are only read shortly before they are parsed.
+    max_in_flight = workers * 4
+    in_flight: Set[Future] = set()
+    items = iter_sources(sources, skip)
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(verbose,)) as pool:
+        try:
+            for item in items:
+                in_flight.add(pool.submit(parse_one, *item))
+                if len(in_flight) >= max_in_flight:
+                    done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        run.add(*future.result())
+            while in_flight:
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    run.add(*future.result())
+        except KeyboardInterrupt:
+            print("Interrupted: saving finished files; re-run the same command to resume.")
+            run.interrupted = True
+            for future in in_flight:
+                future.cancel()
+            for future in in_flight:
+                # Workers receive the interrupt too; only keep files they actually finished.
+                if future.done() and not future.cancelled() and future.exception() is None:
+                    run.add(*future.result())
+    run.flush()
+    return run
+
+def main(argv: Optional[List[str]] = None) -> int:
+    arg_parser = argparse.ArgumentParser(description="Bulk-ingest resumes from directories and ZIP archives into the candidate store.")
+    arg_parser.add_argument("sources", nargs="+", help="Directories, ZIP archives or individual .pdf/.txt resumes")
+    arg_parser.add_argument("--store", default=settings.CANDIDATE_STORE_PATH, help="SQLite candidate store path")
+    arg_parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Parser processes")
+    arg_parser.add_argument("--embed-batch-size", type=int, default=64, help="Texts per embedding model call")
+    arg_parser.add_argument("--commit-every", type=int, default=256, help="Files per store transaction / checkpoint")
+    arg_parser.add_argument("--retry-failed", action="store_true", help="Re-process files that failed in an earlier run")
+    arg_parser.add_argument("--progress-interval", type=float, default=5.0, help="Seconds between progress lines")
+    arg_parser.add_argument("--verbose", action="store_true", help="Show the parser's per-resume output")
+    args = arg_parser.parse_args(argv)
+
+    store = CandidateStore(args.store)
+    try:
+        run = ingest(
+            args.sources,
+            store,
+            workers=max(1, args.workers),
+            embed_batch_size=args.embed_batch_size,
+            commit_every=max(1, args.commit_every),
+            retry_failed=args.retry_failed,
+            verbose=args.verbose,
+            progress_interval=args.progress_interval,
+        )
+        total = store.count()
+    finally:
+        store.close()
+
+    elapsed = time.perf_counter() - run.started
+    print(
+        f"Ingested {run.processed} files in {elapsed:.1f}s ({run.files_per_second():.1f} files/sec): "
+        f"{run.parsed} parsed, {run.failed} failed. {total} candidates in {args.store}."
+    )
+    return 130 if run.interrupted else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
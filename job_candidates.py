@@ -0,0 +1,133 @@
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from app.schemas import CandidateProfile
+from app.ai_matcher import create_candidate_embedding_text, generate_text_embedding, match_scores
+from app.metrics import timed_stage
+
+_NO_EMBEDDING = np.zeros(0, dtype=np.float32)
+
+class _JobMembers:
+    """Insertion-ordered candidate set of one job, mirrored as a growable array of matrix rows."""
+    __slots__ = ("rows_by_id", "rows", "count")
+
+    def __init__(self):
+        self.rows_by_id: Dict[str, int] = {}
+        self.rows = np.zeros(16, dtype=np.int64)
+        self.count = 0
+
+    def append(self, candidate_id: str, row: int) -> None:
+        if self.count >= self.rows.shape[0]:
+            grown = np.zeros(self.rows.shape[0] * 2, dtype=np.int64)
+            grown[:self.count] = self.rows[:self.count]
+            self.rows = grown
+        self.rows_by_id[candidate_id] = row
+        self.rows[self.count] = row
+        self.count += 1
+
+class JobCandidateIndex:
+    """
+    Which candidate profiles were processed for which job.
+
+    - Each job's candidates form an insertion-ordered set: membership checks
+      are O(1) and a batch insert is atomic, so concurrent uploads for the
+      same job cannot duplicate or lose candidates.
+    - Every associated profile gets a row in a shared embedding matrix, and
+      each job keeps the array of its candidates' rows, so ranking is one
+      gather and one matrix-vector product without building per-candidate
+      Python objects.
+
+    With store_embeddings=False (candidate sharding, where the shards hold
+    the embeddings) only membership is kept and rank returns nothing.
+    """
+
+    def __init__(self, store_embeddings: bool = True):
+        self.store_embeddings = store_embeddings
+        self._lock = threading.Lock()
+        self._jobs: Dict[str, _JobMembers] = {}
+        self._row_by_id: Dict[str, int] = {}
+        self._id_by_row: List[str] = []
+        # Embeddings are stored as given (float32, as produced by the model); rows without one are masked out.
+        self._matrix: Optional[np.ndarray] = None
+        self._embedded = np.zeros(0, dtype=bool)
+
+    def add(self, job_id: str, profiles: Iterable[CandidateProfile]) -> List[str]:
+        """
+        Associates profiles with a job. Returns the ids that were not already associated, in insertion order.
+        Profiles without an embedding are embedded from their summary text, as score_candidates does.
+        """
+        embedded_profiles = [(profile, self._embedding(profile) if self.store_embeddings else _NO_EMBEDDING) for profile in profiles]
+        added = []
+        with self._lock:
+            members = self._jobs.setdefault(job_id, _JobMembers())
+            for profile, embedding in embedded_profiles:
+                row = self._upsert_embedding(profile.id, embedding)
+                if profile.id not in members.rows_by_id:
+                    members.append(profile.id, row)
+                    added.append(profile.id)
+        return added
+
+    def remove_job(self, job_id: str) -> None:
+        with self._lock:
+            self._jobs.pop(job_id, None)
+
+    def count(self, job_id: str) -> int:
+        members = self._jobs.get(job_id)
+        return members.count if members is not None else 0
+
+    def candidate_ids(self, job_id: str) -> List[str]:
+        with self._lock:
+            members = self._jobs.get(job_id)
+            return list(members.rows_by_id) if members is not None else []
+
+    @timed_stage("rank_candidates")
+    def rank(self, job_id: str, job_embedding: Optional[List[float]]) -> List[Tuple[str, float]]:
+        """(candidate id, match score) for the job's candidates, best first, on the 0-100 scale of score_candidates."""
+        if not job_embedding or not np.any(job_embedding):
+            return []
+        with self._lock:
+            members = self._jobs.get(job_id)
+            if members is None or not members.count or self._matrix is None:
+                return []
+            rows = members.rows[:members.count]
+            rows = rows[self._embedded[rows]]
+            # Fancy indexing copies, so the scoring below works on a consistent snapshot.
+            vectors = self._matrix[rows]
+
+        scores = match_scores(job_embedding, vectors)
+        # Stable, so equal scores keep insertion order like the list-based ranking did.
+        order = np.argsort(-scores, kind="stable")
+        id_by_row = self._id_by_row
+        return [(id_by_row[row], float(score)) for row, score in zip(rows[order].tolist(), scores[order].tolist())]
+
+    @staticmethod
+    def _embedding(profile: CandidateProfile) -> np.ndarray:
+        if profile.embedding is None:
+            print(f"Warning: Candidate {profile.name or profile.id or 'Unknown'} has no pre-computed embedding. Generating on the fly from summary text.")
+            return np.asarray(generate_text_embedding(create_candidate_embedding_text(profile)), dtype=np.float32)
+        return np.asarray(profile.embedding, dtype=np.float32)
+
+    def _upsert_embedding(self, candidate_id: str, vector: np.ndarray) -> int:
+        row = self._row_by_id.get(candidate_id)
+        if row is None:
+            row = len(self._id_by_row)
+            self._id_by_row.append(candidate_id)
+            self._row_by_id[candidate_id] = row
+        if self._matrix is None and vector.size:
+            self._matrix = np.zeros((1024, vector.shape[0]), dtype=np.float32)
+            self._embedded = np.zeros(1024, dtype=bool)
+        if self._matrix is not None and row >= self._matrix.shape[0]:
+            capacity = max(self._matrix.shape[0] * 2, row + 1)
+            grown = np.zeros((capacity, self._matrix.shape[1]), dtype=np.float32)
+            grown[:self._matrix.shape[0]] = self._matrix
+            embedded = np.zeros(capacity, dtype=bool)
+            embedded[:self._embedded.shape[0]] = self._embedded
+            self._matrix, self._embedded = grown, embedded
+
+        if self._matrix is not None:
+            # All-zero embeddings are skipped like in score_candidates; mismatched dimensions can't be scored.
+            self._embedded[row] = vector.size == self._matrix.shape[1] and bool(vector.any())
+            self._matrix[row] = vector if self._embedded[row] else 0.0
+        return row
@@ -0,0 +1,218 @@
+import base64
+import re
+from bisect import bisect_right
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+from app.schemas import JobDescription
+
+TOKEN_PATTERN = re.compile(r"\b\w+\b")
+DEFAULT_LISTING_FIELDS = ("id", "title", "description", "posted_by", "is_public")
+PROJECTABLE_FIELDS = frozenset(JobDescription.model_fields)
+
+def tokenize(text: str) -> Set[str]:
+    return {token for token in TOKEN_PATTERN.findall((text or "").lower()) if len(token) > 1}
+
+def encode_cursor(position: int) -> str:
+    return base64.urlsafe_b64encode(str(position).encode("ascii")).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor: Optional[str]) -> int:
+    """Returns the position encoded in a cursor, or 0 for the first page. Raises ValueError on malformed cursors."""
+    if not cursor:
+        return 0
+    padded = cursor + "=" * (-len(cursor) % 4)
+    try:
+        position = int(base64.urlsafe_b64decode(padded.encode("ascii")).decode("ascii"))
+    except Exception:
+        raise ValueError("Invalid cursor.")
+    if position < 0:
+        raise ValueError("Invalid cursor.")
+    return position
+
+def parse_fields(fields: Optional[str]) -> Tuple[str, ...]:
+    """Parses a comma-separated field projection. Raises ValueError on unknown fields."""
+    if not fields:
+        return DEFAULT_LISTING_FIELDS
+    requested = tuple(dict.fromkeys(field.strip() for field in fields.split(",") if field.strip()))
+    unknown = [field for field in requested if field not in PROJECTABLE_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown job fields: {', '.join(unknown)}.")
+    return requested or DEFAULT_LISTING_FIELDS
+
+def project_job(job: JobDescription, fields: Iterable[str]) -> Dict:
+    return job.model_dump(mode="json", include=set(fields))
+
+class JobCatalogue:
+    """
+    Index of public jobs kept up to date on every job mutation.
+
+    - Listing order is the order jobs were first published. Each job gets a
+      sequence number and pages resume from the last sequence seen, so a page
+      costs O(log n + limit) regardless of catalogue size.
+    - Keyword search uses an inverted index over title and description tokens.
+    - Semantic search scores the query embedding against a matrix of
+      normalized job embeddings.
+    """
+
+    def __init__(self):
+        self._next_seq = 1
+        self._jobs: Dict[str, JobDescription] = {}
+        self._seq_by_id: Dict[str, int] = {}
+        # Parallel, seq-ordered arrays. Removed jobs leave a None id until compaction.
+        self._seqs: List[int] = []
+        self._ids: List[Optional[str]] = []
+        self._removed = 0
+
+        self._postings: Dict[str, Set[str]] = {}
+        self._tokens_by_id: Dict[str, Set[str]] = {}
+
+        self._row_by_id: Dict[str, int] = {}
+        self._id_by_row: List[Optional[str]] = []
+        self._free_rows: List[int] = []
+        self._matrix: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return len(self._jobs)
+
+    def __contains__(self, job_id: str) -> bool:
+        return job_id in self._jobs
+
+    def get(self, job_id: str) -> Optional[JobDescription]:
+        return self._jobs.get(job_id)
+
+    def sync_job(self, job: JobDescription) -> None:
+        """Adds, refreshes or removes a job depending on whether it is public."""
+        if job.is_public:
+            self._index_job(job)
+        else:
+            self.remove_job(job.id)
+
+    def remove_job(self, job_id: str) -> None:
+        if job_id not in self._jobs:
+            return
+        del self._jobs[job_id]
+
+        seq = self._seq_by_id.pop(job_id)
+        position = bisect_right(self._seqs, seq) - 1
+        self._ids[position] = None
+        self._removed += 1
+        if self._removed > len(self._seqs) // 2:
+            self._compact()
+
+        self._unindex_tokens(job_id)
+        self._unindex_embedding(job_id)
+
+    def list_page(self, cursor: int, limit: int) -> Tuple[List[JobDescription], Optional[int]]:
+        """Returns up to `limit` jobs published after sequence `cursor`, plus the cursor of the next page."""
+        position = bisect_right(self._seqs, cursor)
+        page: List[JobDescription] = []
+        last_seq = cursor
+        while position < len(self._seqs) and len(page) < limit:
+            job_id = self._ids[position]
+            if job_id is not None:
+                page.append(self._jobs[job_id])
+                last_seq = self._seqs[position]
+            position += 1
+
+        while position < len(self._seqs) and self._ids[position] is None:
+            position += 1
+        return page, (last_seq if position < len(self._seqs) else None)
+
+    def keyword_search(self, query: str) -> List[JobDescription]:
+        """Jobs containing every query token, best title matches first, then publication order."""
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+        postings = sorted((self._postings.get(token, set()) for token in tokens), key=len)
+        matched = set(postings[0])
+        for posting in postings[1:]:
+            matched &= posting
+            if not matched:
+                return []
+
+        def relevance(job_id: str) -> Tuple[int, int]:
+            title_hits = len(tokens & tokenize(self._jobs[job_id].title))
+            return (-title_hits, self._seq_by_id[job_id])
+
+        return [self._jobs[job_id] for job_id in sorted(matched, key=relevance)]
+
+    def semantic_search(self, query_embedding: List[float], limit: int) -> List[Tuple[JobDescription, float]]:
+        """Top `limit` jobs by cosine similarity to the query embedding."""
+        if self._matrix is None or not self._row_by_id or limit <= 0:
+            return []
+        query = np.asarray(query_embedding, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if norm == 0:
+            return []
+        scores = self._matrix[:len(self._id_by_row)] @ (query / norm)
+        for row in self._free_rows:
+            scores[row] = -np.inf
+
+        limit = min(limit, len(self._row_by_id))
+        top_rows = np.argpartition(-scores, limit - 1)[:limit]
+        top_rows = top_rows[np.argsort(-scores[top_rows])]
+        return [(self._jobs[self._id_by_row[row]], float(scores[row])) for row in top_rows]
+
+    def _index_job(self, job: JobDescription) -> None:
+        if job.id not in self._seq_by_id:
+            seq = self._next_seq
+            self._next_seq += 1
+            self._seq_by_id[job.id] = seq
+            self._seqs.append(seq)
+            self._ids.append(job.id)
+        self._jobs[job.id] = job
+
+        self._unindex_tokens(job.id)
+        tokens = tokenize(job.title) | tokenize(job.description)
+        self._tokens_by_id[job.id] = tokens
+        for token in tokens:
+            self._postings.setdefault(token, set()).add(job.id)
+
+        self._unindex_embedding(job.id)
+        if job.embedding:
+            self._index_embedding(job.id, job.embedding)
+
+    def _unindex_tokens(self, job_id: str) -> None:
+        for token in self._tokens_by_id.pop(job_id, ()):
+            posting = self._postings.get(token)
+            if posting is not None:
+                posting.discard(job_id)
+                if not posting:
+                    del self._postings[token]
+
+    def _index_embedding(self, job_id: str, embedding: List[float]) -> None:
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        if norm == 0:
+            return
+        if self._matrix is None:
+            self._matrix = np.zeros((16, vector.shape[0]), dtype=np.float32)
+
+        if self._free_rows:
+            row = self._free_rows.pop()
+        else:
+            row = len(self._id_by_row)
+            self._id_by_row.append(None)
+            if row >= self._matrix.shape[0]:
+                grown = np.zeros((self._matrix.shape[0] * 2, self._matrix.shape[1]), dtype=np.float32)
+                grown[:self._matrix.shape[0]] = self._matrix
+                self._matrix = grown
+
+        self._matrix[row] = vector / norm
+        self._row_by_id[job_id] = row
+        self._id_by_row[row] = job_id
+
+    def _unindex_embedding(self, job_id: str) -> None:
+        row = self._row_by_id.pop(job_id, None)
+        if row is None:
+            return
+        self._matrix[row] = 0.0
+        self._id_by_row[row] = None
+        self._free_rows.append(row)
+
+    def _compact(self) -> None:
+        live = [(seq, job_id) for seq, job_id in zip(self._seqs, self._ids) if job_id is not None]
+        self._seqs = [seq for seq, _ in live]
+        self._ids = [job_id for _, job_id in live]
+        self._removed = 0
@@ -1,5 +1,7 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.responses import PlainTextResponse
 import os
+import time
 
 from app.schemas import (
     CandidateProfile,
@@ -20,6 +22,7 @@ from app.core.database import users_db, jobs_db, candidates_db, applications_db
 # from app.auth import router as auth_router_instance # Auth router commented out
 from app.routers.candidate import router as candidate_router_instance
 from app.routers.recruiter import router as recruiter_router_instance
+from app.metrics import HTTP_REQUEST_SECONDS, render_prometheus, start_trace, format_server_timing, sampling_profiler
 
 
 app = FastAPI(
@@ -34,6 +37,35 @@ os.makedirs(settings.UPLOAD_DIR, exist_ok=True)
 app.include_router(candidate_router_instance)
 app.include_router(recruiter_router_instance)
 
+@app.middleware("http")
+async def observe_request(request: Request, call_next):
+    """Records request latency and, when requested, a per-stage Server-Timing breakdown and a cProfile sample."""
+    trace = start_trace() if settings.TRACE_HEADERS or "x-trace-stages" in request.headers else None
+    profiler = sampling_profiler.start() if sampling_profiler.should_sample() else None
+
+    start = time.perf_counter()
+    try:
+        response = await call_next(request)
+    finally:
+        if profiler is not None:
+            sampling_profiler.stop(profiler, f"{request.method}_{request.url.path}")
+    elapsed = time.perf_counter() - start
+
+    route = request.scope.get("route")
+    HTTP_REQUEST_SECONDS.observe(
+        elapsed,
+        method=request.method,
+        route=getattr(route, "path", "unmatched"),
+        status=str(response.status_code),
+    )
+    if trace is not None:
+        response.headers["Server-Timing"] = format_server_timing(trace, elapsed)
+    return response
+
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics():
+    return PlainTextResponse(render_prometheus(), media_type="text/plain; version=0.0.4")
+
 @app.get("/")
 async def root():
     return {"message": f"{settings.APP_NAME} API is running! Go to /docs for API documentation."}
\ No newline at end of file
@@ -0,0 +1,254 @@
+import asyncio
+import contextvars
+import cProfile
+import functools
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from app.core.config import settings
+
+DEFAULT_LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512)
+
+LabelValues = Tuple[str, ...]
+
+def _escape_label_value(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+class _Metric:
+    metric_type = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def _label_values(self, labels: Dict[str, str]) -> LabelValues:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"Metric {self.name} expects labels {self.labelnames}, got {tuple(labels)}.")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _format_labels(self, values: LabelValues, extra: Optional[Tuple[str, str]] = None) -> str:
+        pairs = list(zip(self.labelnames, values))
+        if extra:
+            pairs.append(extra)
+        if not pairs:
+            return ""
+        return "{" + ",".join(f'{name}="{_escape_label_value(value)}"' for name, value in pairs) + "}"
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.metric_type}"]
+
+class Counter(_Metric):
+    metric_type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._label_values(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._label_values(labels), 0.0)
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{self._format_labels(key)} {value:g}")
+        return lines
+
+class Gauge(_Metric):
+    metric_type = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def set(self, value: float, **labels: str) -> None:
+        key = self._label_values(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._label_values(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._label_values(labels), 0.0)
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{self._format_labels(key)} {value:g}")
+        return lines
+
+class Histogram(_Metric):
+    metric_type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> ([count per bucket, +Inf last], sum)
+        self._values: Dict[LabelValues, Tuple[List[int], float]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._label_values(labels)
+        with self._lock:
+            counts, total = self._values.get(key) or ([0] * (len(self.buckets) + 1), 0.0)
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[index] += 1
+                    break
+            else:
+                counts[-1] += 1
+            self._values[key] = (counts, total + value)
+
+    def count(self, **labels: str) -> int:
+        entry = self._values.get(self._label_values(labels))
+        return sum(entry[0]) if entry else 0
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        with self._lock:
+            for key, (counts, total) in sorted(self._values.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets, counts):
+                    cumulative += count
+                    lines.append(f"{self.name}_bucket{self._format_labels(key, ('le', f'{bound:g}'))} {cumulative}")
+                cumulative += counts[-1]
+                lines.append(f"{self.name}_bucket{self._format_labels(key, ('le', '+Inf'))} {cumulative}")
+                lines.append(f"{self.name}_sum{self._format_labels(key)} {total:g}")
+                lines.append(f"{self.name}_count{self._format_labels(key)} {cumulative}")
+        return lines
+
+REGISTRY: List[_Metric] = []
+
+PIPELINE_STAGE_SECONDS = Histogram(
+    "pipeline_stage_duration_seconds", "Time spent in each resume processing and ranking stage.", ["stage"]
+)
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route.", ["method", "route", "status"]
+)
+RESUMES_PARSED = Counter("resumes_parsed_total", "Resumes parsed into a candidate profile.", ["source"])
+RESUMES_FAILED = Counter("resumes_failed_total", "Resumes that could not be read or parsed.", ["source"])
+EMBEDDING_BATCH_SIZE = Histogram(
+    "embedding_batch_size", "Number of texts encoded per embedding model call.", buckets=BATCH_SIZE_BUCKETS
+)
+CACHE_REQUESTS = Counter("cache_requests_total", "Cache lookups by cache and result.", ["cache", "result"])
+ADMISSION_ACTIVE = Gauge("admission_active_work", "Parse/embed work currently running, by priority class.", ["priority"])
+ADMISSION_QUEUE_DEPTH = Gauge("admission_queue_depth", "Parse/embed work waiting for a slot, by priority class.", ["priority"])
+ADMISSION_REJECTED = Counter("admission_rejected_total", "Requests rejected by admission control.", ["priority", "reason"])
+ADMISSION_WAIT_SECONDS = Histogram("admission_queue_wait_seconds", "Time queued work waited for a slot.", ["priority"])
+
+def render_prometheus() -> str:
+    lines: List[str] = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+def record_cache_lookup(cache: str, hit: bool) -> None:
+    CACHE_REQUESTS.inc(cache=cache, result="hit" if hit else "miss")
+
+# Per-request stage breakdown: stage -> [total seconds, calls]. None when tracing is off for the request.
+_current_trace: contextvars.ContextVar[Optional[Dict[str, List[float]]]] = contextvars.ContextVar("stage_trace", default=None)
+
+def start_trace() -> Dict[str, List[float]]:
+    trace: Dict[str, List[float]] = {}
+    _current_trace.set(trace)
+    return trace
+
+def format_server_timing(trace: Dict[str, List[float]], total_seconds: float) -> str:
+    entries = [f'{stage};dur={seconds * 1000:.2f};desc="{int(calls)} call(s)"' for stage, (seconds, calls) in trace.items()]
+    entries.append(f"total;dur={total_seconds * 1000:.2f}")
+    return ", ".join(entries)
+
+def _record_stage(stage: str, elapsed: float) -> None:
+    PIPELINE_STAGE_SECONDS.observe(elapsed, stage=stage)
+    trace = _current_trace.get()
+    if trace is not None:
+        entry = trace.setdefault(stage, [0.0, 0])
+        entry[0] += elapsed
+        entry[1] += 1
+
+@contextmanager
+def stage_timer(stage: str) -> Iterator[None]:
+    """Records the duration of a pipeline stage in the stage histogram and the current request trace."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _record_stage(stage, time.perf_counter() - start)
+
+def timed_stage(stage: str) -> Callable:
+    """Decorator form of stage_timer for sync and async functions."""
+    def decorator(func: Callable) -> Callable:
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with stage_timer(stage):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with stage_timer(stage):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+class SamplingProfiler:
+    """
+    Opt-in cProfile hook for hot-path analysis. A random fraction of requests
+    (PROFILER_SAMPLE_RATE) is profiled and the stats are written to
+    PROFILER_OUTPUT_DIR as .prof files, one request at a time.
+    """
+
+    def __init__(self, sample_rate: float, output_dir: str):
+        self.sample_rate = sample_rate
+        self.output_dir = output_dir
+        self._active = threading.Lock()
+
+    def should_sample(self) -> bool:
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    def start(self) -> Optional[cProfile.Profile]:
+        # cProfile cannot run two profilers at once, so overlapping samples are skipped.
+        if not self._active.acquire(blocking=False):
+            return None
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            self._active.release()
+            return None
+        return profiler
+
+    def stop(self, profiler: cProfile.Profile, label: str) -> str:
+        try:
+            profiler.disable()
+            os.makedirs(self.output_dir, exist_ok=True)
+            safe_label = "".join(ch if ch.isalnum() else "_" for ch in label).strip("_") or "root"
+            timestamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%f")
+            path = os.path.join(self.output_dir, f"{timestamp}_{safe_label}.prof")
+            profiler.dump_stats(path)
+            return path
+        finally:
+            self._active.release()
+
+sampling_profiler = SamplingProfiler(settings.PROFILER_SAMPLE_RATE, settings.PROFILER_OUTPUT_DIR)
@@ -3,9 +3,10 @@ import re
 import spacy
 import fitz
 from app.schemas import CandidateProfile, Education, Experience
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 from datetime import datetime, timezone
 from app.ai_matcher import generate_text_embedding, create_candidate_embedding_text
+from app.metrics import stage_timer, timed_stage
 
 try:
     nlp = spacy.load('en_core_web_sm')
@@ -14,10 +15,12 @@ except Exception as e:
     print("Please ensure you have run 'python -m spacy download en_core_web_sm' in your activated venv.")
     nlp = None
 
-def extract_text_from_pdf(pdf_path: str) -> str:
+@timed_stage("extract_text_from_pdf")
+def extract_text_from_pdf(pdf_path: str, pdf_bytes: Optional[bytes] = None) -> str:
+    """Extracts text from a PDF on disk, or from pdf_bytes (pdf_path is then only used in messages)."""
     text = ""
     try:
-        with fitz.open(pdf_path) as doc:
+        with (fitz.open(stream=pdf_bytes, filetype="pdf") if pdf_bytes is not None else fitz.open(pdf_path)) as doc:
             for page in doc:
                 text += page.get_text()
     except Exception as e:
@@ -55,46 +58,130 @@ def parse_years_from_date_string(date_string: str) -> List[int]:
     
     return years
 
-def extract_education(full_text: str) -> List[Education]:
+# Section name -> header patterns. A header is a line that starts with one of these,
+# followed by a colon or the end of the line. Spaces match any run of spaces or tabs.
+SECTION_HEADERS: Dict[str, List[str]] = {
+    "education": [
+        r"EDUCATION(?:AL BACKGROUND)?(?: (?:AND|&) (?:TRAINING|CERTIFICATIONS?|QUALIFICATIONS))?",
+        r"ACADEMIC (?:BACKGROUND|QUALIFICATIONS)", "DEGREES", "QUALIFICATIONS",
+    ],
+    "experience": [
+        r"(?:(?:WORK|PROFESSIONAL|RELEVANT|EMPLOYMENT|CAREER) )?EXPERIENCE",
+        r"(?:WORK|EMPLOYMENT|CAREER|PROFESSIONAL) HISTORY", "EMPLOYMENT",
+    ],
+    "skills": ["TECHNICAL SKILLS", "SKILLS"],
+    "projects": ["PROJECTS"],
+    "certifications": ["CERTIFICATIONS"],
+    "awards": ["AWARDS"],
+    "summary": ["SUMMARY", "ABOUT ME"],
+    "languages": ["LANGUAGES"],
+    "publications": ["PUBLICATIONS"],
+    "interests": ["INTERESTS"],
+}
+
+SECTION_HEADER_PATTERN = re.compile(
+    r'^[ \t]*(?:' + "|".join(
+        f"(?P<{section}>" + "|".join(header.replace(" ", r"[ \t]+") for header in headers) + ")"
+        for section, headers in SECTION_HEADERS.items()
+    ) + r')[ \t]*(?::[ \t]*|$)',
+    re.IGNORECASE | re.MULTILINE
+)
+
+SectionSpans = Dict[str, Tuple[int, int]]
+
+def segment_sections(text: str) -> SectionSpans:
+    """
+    Scans the text once for every known section header and returns
+    section -> (start, end) offsets of the section body. The body runs from
+    the end of its header to the next header (or the end of the text).
+    When a section header appears more than once, the first one wins.
+    """
+    headers = [(match.lastgroup, match.start(), match.end()) for match in SECTION_HEADER_PATTERN.finditer(text)]
+    sections: SectionSpans = {}
+    for index, (section, _, body_start) in enumerate(headers):
+        if section in sections:
+            continue
+        body_end = headers[index + 1][1] if index + 1 < len(headers) else len(text)
+        sections[section] = (body_start, body_end)
+    return sections
+
+def strip_span(text: str, start: int, end: int) -> Tuple[int, int]:
+    """Narrows text[start:end] to exclude surrounding whitespace, like str.strip() without the copy."""
+    while start < end and text[start].isspace():
+        start += 1
+    while end > start and text[end - 1].isspace():
+        end -= 1
+    return start, end
+
+def split_spans(pattern: re.Pattern, text: str, start: int, end: int) -> List[Tuple[int, int]]:
+    """
+    Offsets of the non-blank pieces of text[start:end] split on pattern, each
+    stripped of surrounding whitespace; the in-place counterpart of
+    [piece.strip() for piece in pattern.split(text[start:end]) if piece.strip()].
+    """
+    spans = []
+    piece_start = start
+    for match in pattern.finditer(text, start, end):
+        spans.append(strip_span(text, piece_start, match.start()))
+        piece_start = match.end()
+    spans.append(strip_span(text, piece_start, end))
+    return [(piece_start, piece_end) for piece_start, piece_end in spans if piece_start < piece_end]
+
+EDU_ITEM_PATTERN = re.compile(
+    r'('
+        r'(?:(ph\.?d|master(?:\'?s)?|bachelor(?:\'?s)?|mba|m\.?s|b\.?s|associate(?:\'?s)?)\s+(?:of\s+)?[\w\s&,./-]+?)?'
+        r'(?:[\s,\-]*at[\s,\-]+|[\s,\-]+)?([\w\s&,./-]+\s*(?:University|College|Institute|School|Academy|Conservatory))'
+        r'(?:[\s,\-]+(\d{4}(?:\s*[\-–]?\s*(?:\d{4}|Present|Current))?))?'
+    r')|'
+    r'(?:'
+        r'([\w\s&,./-]+\s*(?:University|College|Institute|School|Academy|Conservatory))'
+        r'(?:[\s,\-]+(?:(?:(ph\.?d|master(?:\'?s)?|bachelor(?:\'?s)?|mba|m\.?s|b\.?s|associate(?:\'?s)?)\s+(?:of\s+)?[\w\s&,./-]+?))?)?'
+        r'(?:[\s,\-]+(\d{4}(?:\s*[\-–]?\s*(?:\d{4}|Present|Current))?))?'
+    r')',
+    re.IGNORECASE | re.DOTALL
+)
+
+EDU_ENTRY_SPLIT_PATTERN = re.compile(
+    r'\n(?=\s*(?:[A-Z][a-z]+\s+(?:University|College|Institute|School)|(?:ph\.?d|master|bachelor|mba|m\.?s|b\.?s|associate)\b))',
+    re.IGNORECASE | re.MULTILINE
+)
+
+JOB_TITLE_WORDS = r'(?:Engineer|Developer|Manager|Scientist|Analyst|Consultant|Architect|Designer|Specialist|Lead|Director|Physician|Doctor|Surgeon|Practitioner|Dentist|Resident|Fellow)'
+
+EXP_ITEM_BODY = (
+    r'([\w\s&,./-]+\b' + JOB_TITLE_WORDS + r')\b'
+    r'(?:(?:\s*at\s*|\s*,\s*)'
+    r'([\w\s&,./-]+\b(?:Company|Corp|Inc|LLC|Ltd|Group|Solutions|Systems|Technologies|Hospital|Clinic|Medical Center))?\b)?'
+    r'(?:[\s,\-]+(\d{4}(?:\s*[\-–]?\s*(?:\d{4}|Present|Current))?)\b)?'
+    r'(.*?)(?=\n(?:[\w\s&,./-]+\b' + JOB_TITLE_WORDS + r')|\n{2,}|$)'
+)
+
+EXP_ITEM_PATTERN = re.compile(r'(?:^|\n)\s*' + EXP_ITEM_BODY, re.IGNORECASE | re.DOTALL | re.MULTILINE)
+
+# Entries are scanned in place with pos/endpos, where '^' does not match at pos unless
+# it starts a line; this variant tries the entry start the way a sliced search would.
+EXP_ITEM_AT_START_PATTERN = re.compile(r'\s*' + EXP_ITEM_BODY, re.IGNORECASE | re.DOTALL | re.MULTILINE)
+
+EXP_ENTRY_SPLIT_PATTERN = re.compile(
+    r'\n(?=[\w\s&,./-]+\b' + JOB_TITLE_WORDS + r')|\n{2,}',
+    re.IGNORECASE | re.MULTILINE
+)
+
+@timed_stage("extract_education")
+def extract_education(full_text: str, sections: Optional[SectionSpans] = None) -> List[Education]:
     education_list: List[Education] = []
     print("\n--- Starting Education Extraction ---")
 
-    education_section_pattern = re.compile(
-        r'(?:EDUCATION|ACADEMIC BACKGROUND|DEGREES|QUALIFICATIONS)\n*(.*?)(?=\n(?:SKILLS|EXPERIENCE|WORK HISTORY|PROJECTS|AWARDS|SUMMARY|ABOUT ME|LANGUAGES|PUBLICATIONS|INTERESTS|$))',
-        re.IGNORECASE | re.DOTALL | re.MULTILINE
-    )
-    education_section_match = education_section_pattern.search(full_text)
+    if sections is None:
+        sections = segment_sections(full_text)
+    span = sections.get("education")
     
-    if education_section_match:
-        education_content = education_section_match.group(1).strip()
-        print(f"Education Section Content (first 500 chars):\n{education_content[:500]}...\n")
-
-        edu_item_pattern = re.compile(
-            r'('
-                r'(?:(ph\.?d|master(?:\'?s)?|bachelor(?:\'?s)?|mba|m\.?s|b\.?s|associate(?:\'?s)?)\s+(?:of\s+)?[\w\s&,./-]+?)?'
-                r'(?:[\s,\-]*at[\s,\-]+|[\s,\-]+)?([\w\s&,./-]+\s*(?:University|College|Institute|School|Academy|Conservatory))'
-                r'(?:[\s,\-]+(\d{4}(?:\s*[\-–]?\s*(?:\d{4}|Present|Current))?))?'
-            r')|'
-            r'(?:'
-                r'([\w\s&,./-]+\s*(?:University|College|Institute|School|Academy|Conservatory))'
-                r'(?:[\s,\-]+(?:(?:(ph\.?d|master(?:\'?s)?|bachelor(?:\'?s)?|mba|m\.?s|b\.?s|associate(?:\'?s)?)\s+(?:of\s+)?[\w\s&,./-]+?))?)?'
-                r'(?:[\s,\-]+(\d{4}(?:\s*[\-–]?\s*(?:\d{4}|Present|Current))?))?'
-            r')',
-            re.IGNORECASE | re.DOTALL
-        )
-        
-        entries = re.split(
-            r'\n(?=\s*(?:[A-Z][a-z]+\s+(?:University|College|Institute|School)|(?:ph\.?d|master|bachelor|mba|m\.?s|b\.?s|associate)\b))',
-            education_content,
-            flags=re.IGNORECASE | re.MULTILINE
-        )
-        entries = [entry.strip() for entry in entries if entry.strip()]
-        
-        if not entries and education_content:
-            entries = [education_content]
-
-        for entry in entries:
-            match = edu_item_pattern.search(entry)
+    if span is not None:
+        content_start, content_end = strip_span(full_text, *span)
+        print(f"Education Section Content (first 500 chars):\n{full_text[content_start:min(content_end, content_start + 500)]}...\n")
+
+        for entry_start, entry_end in split_spans(EDU_ENTRY_SPLIT_PATTERN, full_text, content_start, content_end):
+            match = EDU_ITEM_PATTERN.search(full_text, entry_start, entry_end)
             if match:
                 degree = match.group(2) or match.group(6)
                 institution = match.group(3) or match.group(5)
@@ -109,46 +196,29 @@ def extract_education(full_text: str) -> List[Education]:
                     education_list.append(edu_entry)
                     print(f"  Found Education: {edu_entry.model_dump_json()}")
             else:
-                print(f"  No Edu Pattern Match for entry:\n---\n{entry[:200]}...\n---\n")
+                print(f"  No Edu Pattern Match for entry:\n---\n{full_text[entry_start:min(entry_end, entry_start + 200)]}...\n---\n")
     else:
         print("  No Education section header found.")
     
     print(f"--- Finished Education Extraction. Found {len(education_list)} entries. ---")
     return education_list
 
-def extract_experience(full_text: str) -> List[Experience]:
+@timed_stage("extract_experience")
+def extract_experience(full_text: str, sections: Optional[SectionSpans] = None) -> List[Experience]:
     experience_list: List[Experience] = []
     print("\n--- Starting Experience Extraction ---")
 
-    experience_section_pattern = re.compile(
-        r'(?:EXPERIENCE|WORK HISTORY|PROFESSIONAL EXPERIENCE|EMPLOYMENT)\n*(.*?)(?=\n(?:EDUCATION|SKILLS|PROJECTS|AWARDS|CERTIFICATIONS|SUMMARY|ABOUT ME|LANGUAGES|PUBLICATIONS|INTERESTS|$))',
-        re.IGNORECASE | re.DOTALL | re.MULTILINE
-    )
-    experience_section_match = experience_section_pattern.search(full_text)
-
-    if experience_section_match:
-        experience_content = experience_section_match.group(1).strip()
-        print(f"Experience Section Content (first 500 chars):\n{experience_content[:500]}...\n")
-
-        exp_item_pattern = re.compile(
-            r'(?:^|\n)\s*'
-            r'([\w\s&,./-]+\b(?:Engineer|Developer|Manager|Scientist|Analyst|Consultant|Architect|Designer|Specialist|Lead|Director|Physician|Doctor|Surgeon|Practitioner|Dentist|Resident|Fellow))\b'
-            r'(?:(?:\s*at\s*|\s*,\s*)'
-            r'([\w\s&,./-]+\b(?:Company|Corp|Inc|LLC|Ltd|Group|Solutions|Systems|Technologies|Hospital|Clinic|Medical Center))?\b)?'
-            r'(?:[\s,\-]+(\d{4}(?:\s*[\-–]?\s*(?:\d{4}|Present|Current))?)\b)?'
-            r'(.*?)(?=\n(?:[\w\s&,./-]+\b(?:Engineer|Developer|Manager|Scientist|Analyst|Consultant|Architect|Designer|Specialist|Lead|Director|Physician|Doctor|Surgeon|Practitioner|Dentist|Resident|Fellow))|\n{2,}|$)',
-            re.IGNORECASE | re.DOTALL | re.MULTILINE
-        )
-        
-        job_entries = re.split(
-            r'\n(?=[\w\s&,./-]+\b(?:Engineer|Developer|Manager|Scientist|Analyst|Consultant|Architect|Designer|Specialist|Lead|Director|Physician|Doctor|Surgeon|Practitioner|Dentist|Resident|Fellow))|\n{2,}',
-            experience_content,
-            flags=re.IGNORECASE | re.MULTILINE
-        )
-        job_entries = [entry.strip() for entry in job_entries if entry.strip()]
-
-        for entry_block in job_entries:
-            match = exp_item_pattern.search(entry_block)
+    if sections is None:
+        sections = segment_sections(full_text)
+    span = sections.get("experience")
+
+    if span is not None:
+        content_start, content_end = strip_span(full_text, *span)
+        print(f"Experience Section Content (first 500 chars):\n{full_text[content_start:min(content_end, content_start + 500)]}...\n")
+
+        for entry_start, entry_end in split_spans(EXP_ENTRY_SPLIT_PATTERN, full_text, content_start, content_end):
+            match = (EXP_ITEM_AT_START_PATTERN.match(full_text, entry_start, entry_end)
+                     or EXP_ITEM_PATTERN.search(full_text, entry_start, entry_end))
             if match:
                 title = match.group(1)
                 company = match.group(2)
@@ -167,7 +237,7 @@ def extract_experience(full_text: str) -> List[Experience]:
                 experience_list.append(exp_entry)
                 print(f"  Found Experience: {exp_entry.model_dump_json()}")
             else:
-                print(f"  No Exp Pattern Match for entry block:\n---\n{entry_block[:200]}...\n---\n")
+                print(f"  No Exp Pattern Match for entry block:\n---\n{full_text[entry_start:min(entry_end, entry_start + 200)]}...\n---\n")
     else:
         print("  No Experience section header found.")
     
@@ -175,18 +245,25 @@ def extract_experience(full_text: str) -> List[Experience]:
     return experience_list
 
 
-def parse_resume_file(resume_text: str, user_id: Optional[str] = None) -> CandidateProfile:
+@timed_stage("parse_resume_file")
+def parse_resume_file(resume_text: str, user_id: Optional[str] = None, embed: bool = True) -> CandidateProfile:
+    """
+    Parses raw resume text into a CandidateProfile. With embed=False the
+    embedding is left unset so callers can batch it (see generate_text_embeddings).
+    """
     if nlp is None:
         print("SpaCy model not loaded, cannot parse resumes.")
         return CandidateProfile(raw_text="Error: SpaCy model not loaded.", user_id=user_id)
 
-    cleaned_text = clean_text(resume_text)
+    with stage_timer("clean_text"):
+        cleaned_text = clean_text(resume_text)
     
     if not cleaned_text.strip():
         print("Warning: No usable text extracted or cleaned from resume.")
         return CandidateProfile(raw_text="Error: No usable text extracted or cleaned.", user_id=user_id)
 
-    doc = nlp(cleaned_text)
+    with stage_timer("spacy_nlp"):
+        doc = nlp(cleaned_text)
 
     name: Optional[str] = None
     email: Optional[str] = None
@@ -194,55 +271,62 @@ def parse_resume_file(resume_text: str, user_id: Optional[str] = None) -> Candid
     skills: List[str] = []
     total_experience_years: Optional[float] = None
 
-    first_few_lines = "\n".join(cleaned_text.split('\n')[:7])
-    print(f"Parser: Name search area (first few lines):\n---\n{first_few_lines[:300]}...\n---\n")
+    with stage_timer("contact_fields"):
+        first_few_lines = "\n".join(cleaned_text.split('\n')[:7])
+        print(f"Parser: Name search area (first few lines):\n---\n{first_few_lines[:300]}...\n---\n")
 
-    name_pattern_line = re.compile(r'^\s*([A-Z][a-z]+(?:[\s-][A-Z][a-z]+){0,3}(?:\s+[A-Z]\.?)?)\s*$', re.MULTILINE)
-    name_match = name_pattern_line.search(first_few_lines)
-    if name_match:
-        name = name_match.group(1).strip()
-        print(f"Parser: Name (Line Pattern) detected: {name}")
-    else:
-        name_pattern_general = re.compile(r'\b([A-Z][a-z]+(?:[\s-][A-Z][a-z]+){1,3})\b')
-        general_name_match = name_pattern_general.search(first_few_lines)
-        if general_name_match:
-            name = general_name_match.group(1).strip()
-            print(f"Parser: Name (General Pattern) detected: {name}")
+        name_pattern_line = re.compile(r'^\s*([A-Z][a-z]+(?:[\s-][A-Z][a-z]+){0,3}(?:\s+[A-Z]\.?)?)\s*$', re.MULTILINE)
+        name_match = name_pattern_line.search(first_few_lines)
+        if name_match:
+            name = name_match.group(1).strip()
+            print(f"Parser: Name (Line Pattern) detected: {name}")
         else:
-            name_search_area = cleaned_text[:500]
-            name_doc = nlp(name_search_area)
-            person_entities = [ent.text.strip() for ent in name_doc.ents if ent.label_ == "PERSON" and len(ent.text.split()) >= 2]
-            
-            if person_entities:
-                name = sorted(person_entities, key=len)[0]
-                print(f"Parser: Name (SpaCy Fallback) detected: {name}")
+            name_pattern_general = re.compile(r'\b([A-Z][a-z]+(?:[\s-][A-Z][a-z]+){1,3})\b')
+            general_name_match = name_pattern_general.search(first_few_lines)
+            if general_name_match:
+                name = general_name_match.group(1).strip()
+                print(f"Parser: Name (General Pattern) detected: {name}")
             else:
-                print("Parser: No clear name detected by patterns or spaCy.")
-
-    email_match = re.search(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', cleaned_text)
-    if email_match:
-        email = email_match.group(0)
-        print(f"Parser: Email detected: {email}")
-
-    phone_match = re.search(r'(\+?\d{1,3}[\s.\-]?)?(\(?\d{3}\)?[\s.\-]?)?\d{3}[\s.\-]?\d{4}\b', cleaned_text)
-    if phone_match:
-        phone = phone_match.group(0)
-        print(f"Parser: Phone detected: {phone}")
-
-    tech_skills = ["python", "java", "c++", "javascript", "react", "angular", "node.js", "sql", "nosql",
-                   "aws", "azure", "gcp", "docker", "kubernetes", "git", "linux", "machine learning",
-                   "deep learning", "tensorflow", "pytorch", "data science", "tableau", "excel",
-                   "html", "css", "api", "rest", "flask", "fastapi", "django", "scikit-learn", "numpy", "pandas"]
+                name_search_area = cleaned_text[:500]
+                name_doc = nlp(name_search_area)
+                person_entities = [ent.text.strip() for ent in name_doc.ents if ent.label_ == "PERSON" and len(ent.text.split()) >= 2]
+            
+                if person_entities:
+                    name = sorted(person_entities, key=len)[0]
+                    print(f"Parser: Name (SpaCy Fallback) detected: {name}")
+                else:
+                    print("Parser: No clear name detected by patterns or spaCy.")
+
+        email_match = re.search(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', cleaned_text)
+        if email_match:
+            email = email_match.group(0)
+            print(f"Parser: Email detected: {email}")
+
+        phone_match = re.search(r'(\+?\d{1,3}[\s.\-]?)?(\(?\d{3}\)?[\s.\-]?)?\d{3}[\s.\-]?\d{4}\b', cleaned_text)
+        if phone_match:
+            phone = phone_match.group(0)
+            print(f"Parser: Phone detected: {phone}")
+
+    with stage_timer("segment_sections"):
+        sections = segment_sections(cleaned_text)
+
+    with stage_timer("skills"):
+        tech_skills = ["python", "java", "c++", "javascript", "react", "angular", "node.js", "sql", "nosql",
+                       "aws", "azure", "gcp", "docker", "kubernetes", "git", "linux", "machine learning",
+                       "deep learning", "tensorflow", "pytorch", "data science", "tableau", "excel",
+                       "html", "css", "api", "rest", "flask", "fastapi", "django", "scikit-learn", "numpy", "pandas"]
     
-    cleaned_text_lower = cleaned_text.lower()
-    skills = sorted(list(set([skill for skill in tech_skills if skill in cleaned_text_lower])))
-    if skills:
-        print(f"Parser: Skills detected: {skills}")
-    else:
-        print("Parser: No tech skills from predefined list detected.")
+        # Only the skills section when the resume has one; the whole text otherwise.
+        skills_span = sections.get("skills")
+        skills_text_lower = (cleaned_text[skills_span[0]:skills_span[1]] if skills_span is not None else cleaned_text).lower()
+        skills = sorted(list(set([skill for skill in tech_skills if skill in skills_text_lower])))
+        if skills:
+            print(f"Parser: Skills detected: {skills}")
+        else:
+            print("Parser: No tech skills from predefined list detected.")
 
-    extracted_education = extract_education(cleaned_text)
-    extracted_experience = extract_experience(cleaned_text)
+    extracted_education = extract_education(cleaned_text, sections)
+    extracted_experience = extract_experience(cleaned_text, sections)
 
     total_duration_months = 0
     current_year = datetime.now().year
@@ -272,6 +356,9 @@ def parse_resume_file(resume_text: str, user_id: Optional[str] = None) -> Candid
         raw_text=resume_text
     )
 
+    if not embed:
+        return temp_profile
+
     embedding_text = create_candidate_embedding_text(temp_profile)
     profile_embedding = generate_text_embedding(embedding_text)
 
@@ -1,5 +1,7 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Path, UploadFile, File
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, status, Path, Query, UploadFile, File, Request, Response, BackgroundTasks
+from fastapi.concurrency import run_in_threadpool
+from typing import List, Optional
+from datetime import timedelta
 import uuid
 
 from app.schemas import (
@@ -7,14 +9,44 @@ from app.schemas import (
     JobDescriptionCreate,
     CandidateProfile,
     RankedCandidateResponse,
+    CandidateRecommendation,
     InterviewRequest,
+    InterviewHold,
+    InterviewerAvailability,
+    ShortlistScheduleRequest,
+    ShortlistScheduleResponse,
+    ApplicationStatus,
+    ApplicationStatusUpdate,
+    CandidateApplication,
+    ExportJob,
+    ExportRequest,
+    CANDIDATE_SUMMARY_FIELDS,
     User # Keep User import as it might be used if auth is re-enabled
 )
-from app.core.database import jobs_db, candidates_db
+from app.core.config import settings
+from app.core.database import (
+    jobs_db, candidates_db, applications_db, job_catalogue, change_journal, standing_matches, candidate_shards, job_candidates,
+    job_with_candidates, update_application_status, resident_profile, index_candidate_profiles, score_job_candidates, rank_job_candidates,
+)
+from app.change_journal import CANDIDATES, JOBS
+from app.analytics_export import export_manager, ExportInProgress
 # from app.auth import get_current_recruiter_user # Authentication dependency (currently commented out)
 from app.parser import parse_resume_file
-from app.ai_matcher import rank_candidates, generate_text_embedding, create_job_embedding_text
+from app.ai_matcher import score_candidates, explain_scored_candidates, generate_text_embedding, create_job_embedding_text
+from app.serialization import render_ranked_candidates, render_jobs, render_job, invalidate_profile_fragment
+from app.http_cache import conditional_response, resource_versions, JOBS_COLLECTION_KEY, job_key, ranking_key
 from app.utils import read_uploaded_file_to_text
+from app.admission import admission_controller, client_key, Priority
+from app.metrics import RESUMES_PARSED, RESUMES_FAILED
+from app.scheduling import (
+    scheduling_engine,
+    parse_slots,
+    default_timezone,
+    interviewer_key,
+    candidate_key,
+    SlotParseError,
+    SchedulingConflict,
+)
 
 router = APIRouter(prefix="/recruiter", tags=["Recruiter"])
 
@@ -27,22 +59,26 @@ async def create_job(job_data: JobDescriptionCreate): # TEMP: No auth for testin
 
     new_job = JobDescription(id=str(uuid.uuid4()), **job_data.model_dump(), embedding=job_embedding)
     jobs_db[new_job.id] = new_job
+    job_catalogue.sync_job(new_job)
+    await run_in_threadpool(standing_matches.upsert_job, new_job)
+    change_journal.record(JOBS, new_job.id)
+    resource_versions.bump(JOBS_COLLECTION_KEY, job_key(new_job.id))
     return new_job
 
 @router.get("/jobs", response_model=List[JobDescription])
 # async def get_all_jobs_recruiter_view(current_recruiter: User = Depends(get_current_recruiter_user)): # Original with auth
-async def get_all_jobs_recruiter_view(): # TEMP: No auth for testing
+async def get_all_jobs_recruiter_view(request: Request): # TEMP: No auth for testing
     """Retrieve a list of all job descriptions."""
-    return list(jobs_db.values())
+    return conditional_response(request, JOBS_COLLECTION_KEY, lambda: render_jobs([job_with_candidates(job) for job in list(jobs_db.values())]))
 
 @router.get("/jobs/{job_id}", response_model=JobDescription)
 # async def get_job_recruiter_view(job_id: str = Path(...), current_recruiter: User = Depends(get_current_recruiter_user)): # Original with auth
-async def get_job_recruiter_view(job_id: str = Path(...)): # TEMP: No auth for testing
+async def get_job_recruiter_view(request: Request, job_id: str = Path(...)): # TEMP: No auth for testing
     """Retrieve details for a specific job."""
     job = jobs_db.get(job_id)
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
-    return job
+    return conditional_response(request, job_key(job_id), lambda: render_job(job_with_candidates(job)))
 
 @router.put("/jobs/{job_id}", response_model=JobDescription)
 # async def update_job(job_id: str, job_data: JobDescriptionCreate, current_recruiter: User = Depends(get_current_recruiter_user)): # Original with auth
@@ -56,7 +92,11 @@ async def update_job(job_id: str, job_data: JobDescriptionCreate): # TEMP: No au
 
     updated_job = JobDescription(id=job_id, **job_data.model_dump(), embedding=job_embedding)
     jobs_db[job_id] = updated_job
-    return updated_job
+    job_catalogue.sync_job(updated_job)
+    await run_in_threadpool(standing_matches.upsert_job, updated_job)
+    change_journal.record(JOBS, job_id)
+    resource_versions.bump(JOBS_COLLECTION_KEY, job_key(job_id), ranking_key(job_id))
+    return job_with_candidates(updated_job)
 
 @router.delete("/jobs/{job_id}", status_code=status.HTTP_204_NO_CONTENT)
 # async def delete_job(job_id: str, current_recruiter: User = Depends(get_current_recruiter_user)): # Original with auth
@@ -64,15 +104,21 @@ async def delete_job(job_id: str): # TEMP: No auth for testing
     """Delete a job description."""
     if job_id in jobs_db:
         del jobs_db[job_id]
+        job_catalogue.remove_job(job_id)
+        await run_in_threadpool(standing_matches.remove_job, job_id)
+        job_candidates.remove_job(job_id)
+        change_journal.record(JOBS, job_id)
+        resource_versions.bump(JOBS_COLLECTION_KEY, job_key(job_id), ranking_key(job_id))
         return {"message": "Job deleted successfully"}
     raise HTTPException(status_code=404, detail="Job not found")
 
 @router.post("/jobs/{job_id}/process_resumes", response_model=List[RankedCandidateResponse])
 # async def process_resumes_for_job(job_id: str = Path(...), resumes: List[UploadFile] = File(...), current_recruiter: User = Depends(get_current_recruiter_user)): # Original with auth
-async def process_resumes_for_job(job_id: str = Path(...), resumes: List[UploadFile] = File(...)): # TEMP: No auth for testing
+async def process_resumes_for_job(request: Request, job_id: str = Path(...), resumes: List[UploadFile] = File(...)): # TEMP: No auth for testing
     """
     Uploads and processes multiple resumes for a specific job.
     Parses each resume, creates candidate profiles, and ranks them against the job description.
+    Runs as bulk work under admission control: 429/503 with Retry-After when the client or server is over its limits.
     """
     job = jobs_db.get(job_id)
     if not job:
@@ -81,62 +127,122 @@ async def process_resumes_for_job(job_id: str = Path(...), resumes: List[UploadF
     if not resumes:
         raise HTTPException(status_code=400, detail="No resume files provided.")
 
+    client = client_key(request)
+    admission_controller.check_rate(client, Priority.BULK, cost=len(resumes))
+
     job_description_text = job.description
     candidate_profiles_for_ranking: List[CandidateProfile] = []
     
-    for resume_file in resumes:
-        try:
-            resume_text = await read_uploaded_file_to_text(resume_file)
-            profile = parse_resume_file(resume_text, user_id=None)
-            
-            if profile and profile.raw_text and profile.raw_text.strip():
-                candidates_db[profile.id] = profile
-                candidate_profiles_for_ranking.append(profile)
-                if profile.id not in job.processed_candidate_profiles_ids:
-                    job.processed_candidate_profiles_ids.append(profile.id)
-            else:
-                print(f"Warning: Resume {resume_file.filename} parsed to an empty or invalid profile.")
-        except Exception as e:
-            print(f"Error processing resume {resume_file.filename}: {e}")
-
-    if not candidate_profiles_for_ranking:
-        raise HTTPException(status_code=500, detail="No resumes could be parsed successfully or no valid profiles extracted.")
-
-    ranked_results = rank_candidates(job, candidate_profiles_for_ranking)
+    async with admission_controller.slot(client, Priority.BULK):
+        for resume_file in resumes:
+            try:
+                resume_text = await read_uploaded_file_to_text(resume_file)
+                profile = await run_in_threadpool(parse_resume_file, resume_text, None)
+                
+                if profile and profile.raw_text and profile.raw_text.strip():
+                    RESUMES_PARSED.inc(source="recruiter_upload")
+                    candidates_db[profile.id] = resident_profile(profile)
+                    invalidate_profile_fragment(profile.id)
+                    candidate_profiles_for_ranking.append(profile)
+                else:
+                    RESUMES_FAILED.inc(source="recruiter_upload")
+                    print(f"Warning: Resume {resume_file.filename} parsed to an empty or invalid profile.")
+            except Exception as e:
+                RESUMES_FAILED.inc(source="recruiter_upload")
+                print(f"Error processing resume {resume_file.filename}: {e}")
+
+        if not candidate_profiles_for_ranking:
+            raise HTTPException(status_code=500, detail="No resumes could be parsed successfully or no valid profiles extracted.")
+
+        # One atomic insert per request, so concurrent uploads for this job cannot interleave.
+        job_candidates.add(job_id, candidate_profiles_for_ranking)
+        resource_versions.bump(JOBS_COLLECTION_KEY, job_key(job_id), ranking_key(job_id))
+        change_journal.record(CANDIDATES, *(profile.id for profile in candidate_profiles_for_ranking))
+        await run_in_threadpool(index_candidate_profiles, candidate_profiles_for_ranking)
+        change_journal.record(JOBS, job_id)
+
+        if candidate_shards is not None:
+            # The shards now hold the only copies of these embeddings, so they do the scoring.
+            scores = await run_in_threadpool(score_job_candidates, job, [profile.id for profile in candidate_profiles_for_ranking])
+            scored = sorted(
+                ((profile, scores[profile.id]) for profile in candidate_profiles_for_ranking if profile.id in scores),
+                key=lambda pair: -pair[1],
+            )
+            ranked_results = explain_scored_candidates(job.description, scored)
+        else:
+            ranked_results = await run_in_threadpool(score_candidates, job, candidate_profiles_for_ranking)
 
     if not ranked_results:
         raise HTTPException(status_code=500, detail="Candidate ranking failed or returned no results.")
 
-    return ranked_results
+    return Response(content=render_ranked_candidates(ranked_results), media_type="application/json")
 
 @router.get("/jobs/{job_id}/ranked_candidates", response_model=List[RankedCandidateResponse])
 # async def get_ranked_candidates_for_job(job_id: str = Path(...), current_recruiter: User = Depends(get_current_recruiter_user)): # Original with auth
-async def get_ranked_candidates_for_job(job_id: str = Path(...)): # TEMP: No auth for testing
+async def get_ranked_candidates_for_job(request: Request, job_id: str = Path(...)): # TEMP: No auth for testing
     """Retrieve ranked candidates for a specific job."""
     job = jobs_db.get(job_id)
     if not job:
         raise HTTPException(status_code=404, detail="Job not found.")
     
-    if not job.processed_candidate_profiles_ids:
+    if not job_candidates.count(job_id):
         raise HTTPException(status_code=404, detail="No candidates have been processed for this job yet.")
 
-    candidates_for_job = [candidates_db[cid] for cid in job.processed_candidate_profiles_ids if cid in candidates_db]
-    
-    if not candidates_for_job:
-        raise HTTPException(status_code=500, detail="No valid candidate profiles found for this job.")
+    def build_ranking() -> bytes:
+        scored = [(candidates_db[cid], score) for cid, score in rank_job_candidates(job) if cid in candidates_db]
+        ranked_results = explain_scored_candidates(job.description, scored)
 
-    ranked_results = rank_candidates(job, candidates_for_job)
+        if not ranked_results:
+            raise HTTPException(status_code=500, detail="Ranking could not be performed or returned no results.")
 
-    if not ranked_results:
-        raise HTTPException(status_code=500, detail="Ranking could not be performed or returned no results.")
+        return render_ranked_candidates(ranked_results)
+
+    return conditional_response(request, ranking_key(job_id), build_ranking)
+
+@router.get("/jobs/{job_id}/recommended_candidates", response_model=List[CandidateRecommendation])
+async def get_recommended_candidates_for_job(job_id: str = Path(...), limit: Optional[int] = Query(None, ge=1)):
+    """
+    Best matching candidates from the whole candidate pool, precomputed as jobs and profiles change.
+    With candidate sharding enabled, ranked on demand across the shards instead.
+    """
+    job = jobs_db.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found.")
+
+    if candidate_shards is not None:
+        if not job.embedding:
+            return []
+        ranked = await run_in_threadpool(candidate_shards.rank, job.embedding, limit or settings.STANDING_MATCH_TOP_K)
+        return [{"candidate_profile": summary, "match_score": score} for _, score, summary in ranked]
+
+    return [
+        {"candidate_profile": candidates_db[candidate_id].model_dump(include=CANDIDATE_SUMMARY_FIELDS), "match_score": score}
+        for candidate_id, score in standing_matches.top_candidates(job_id, limit)
+        if candidate_id in candidates_db
+    ]
+
+def _parse_windows(slots: List[str]):
+    try:
+        return parse_slots(slots, default_timezone())
+    except SlotParseError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def _mark_interview_scheduled(job_id: str, candidate_profile_id: str) -> None:
+    for application in applications_db.values():
+        if application.job_id == job_id and application.candidate_profile_id == candidate_profile_id:
+            update_application_status(application, ApplicationStatus.INTERVIEW_SCHEDULED)
 
-    return ranked_results
+@router.put("/interviewers/{interviewer_id}/availability", status_code=status.HTTP_204_NO_CONTENT)
+async def set_interviewer_availability(availability: InterviewerAvailability, interviewer_id: str = Path(...)):
+    """Replace an interviewer's available slots. Interviewers without availability are treated as free."""
+    scheduling_engine.set_availability(interviewer_key(interviewer_id), _parse_windows(availability.available_slots))
 
-@router.post("/schedule_interview", status_code=status.HTTP_202_ACCEPTED)
+@router.post("/schedule_interview", response_model=InterviewHold, status_code=status.HTTP_202_ACCEPTED)
 # async def schedule_interview_trigger(request: InterviewRequest, current_recruiter: User = Depends(get_current_recruiter_user)): # Original with auth
 async def schedule_interview_trigger(request: InterviewRequest): # TEMP: No auth for testing
     """
-    Initiates an interview scheduling request for a candidate for a specific job.
+    Finds the earliest slot inside the preferred dates/times when the candidate and every
+    interviewer are free, and places a hold on it. Confirm the hold to create the calendar event.
     """
     job = jobs_db.get(request.job_id)
     candidate_profile = candidates_db.get(request.candidate_profile_id)
@@ -150,13 +256,101 @@ async def schedule_interview_trigger(request: InterviewRequest): # TEMP: No auth
     if not request.preferred_dates_times:
         raise HTTPException(status_code=400, detail="Preferred dates/times are required for scheduling.")
 
-    print(f"\n--- SCHEDULING REQUEST RECEIVED ---")
-    print(f"Job: {job.title} ({job.id})")
-    print(f"Candidate Profile: {candidate_profile.name} ({candidate_profile.id})")
-    print(f"Candidate User ID (if linked): {candidate_profile.user_id}")
-    print(f"Interviewers: {request.interviewer_ids}")
-    print(f"Preferred Times: {request.preferred_dates_times}")
-    print(f"Notes: {request.notes or 'None'}")
-    print(f"--- Handing off to scheduling service... (Chaithanya's part) ---\n")
+    windows = _parse_windows(request.preferred_dates_times)
+    interviewer_ids = list(dict.fromkeys(request.interviewer_ids))
+    participants = [candidate_key(candidate_profile.id)] + [interviewer_key(i) for i in interviewer_ids]
+    slots = scheduling_engine.find_slots(participants, windows, timedelta(minutes=request.duration_minutes), limit=1)
+    if not slots:
+        raise HTTPException(status_code=409, detail="No common free slot for the candidate and interviewers in the preferred dates/times.")
 
-    return {"message": "Interview scheduling request received and being processed asynchronously."}
\ No newline at end of file
+    try:
+        return scheduling_engine.hold(job.id, candidate_profile.id, interviewer_ids, slots[0])
+    except SchedulingConflict as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+@router.post("/interviews/{hold_id}/confirm", response_model=InterviewHold)
+async def confirm_interview(hold_id: str = Path(...)):
+    """Confirm a held interview slot and create the calendar event."""
+    try:
+        hold = scheduling_engine.confirm(hold_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Interview hold not found or expired.")
+    _mark_interview_scheduled(hold.job_id, hold.candidate_profile_id)
+    return hold
+
+@router.delete("/interviews/{hold_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def release_interview(hold_id: str = Path(...)):
+    """Release a held or confirmed interview slot."""
+    try:
+        scheduling_engine.release(hold_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Interview hold not found or expired.")
+
+@router.post("/jobs/{job_id}/schedule_shortlist", response_model=ShortlistScheduleResponse, status_code=status.HTTP_202_ACCEPTED)
+async def schedule_shortlist(request: ShortlistScheduleRequest, job_id: str = Path(...)):
+    """
+    Holds the earliest common slot with the interviewer panel for each shortlisted candidate.
+    Defaults to the job's applications in Shortlisted status when no candidate IDs are given.
+    """
+    if job_id not in jobs_db:
+        raise HTTPException(status_code=404, detail="Job not found.")
+    if not request.interviewer_ids:
+        raise HTTPException(status_code=400, detail="At least one interviewer ID is required.")
+
+    candidate_profile_ids = request.candidate_profile_ids
+    if candidate_profile_ids is None:
+        candidate_profile_ids = [
+            application.candidate_profile_id for application in applications_db.values()
+            if application.job_id == job_id and application.status == ApplicationStatus.SHORTLISTED
+        ]
+    missing = [cid for cid in candidate_profile_ids if cid not in candidates_db]
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Candidate profiles not found: {', '.join(missing)}")
+
+    results = scheduling_engine.schedule_many(
+        job_id,
+        list(dict.fromkeys(candidate_profile_ids)),
+        list(dict.fromkeys(request.interviewer_ids)),
+        _parse_windows(request.preferred_dates_times),
+        timedelta(minutes=request.duration_minutes),
+    )
+    return ShortlistScheduleResponse(
+        scheduled=[hold for hold in results.values() if hold is not None],
+        unscheduled_candidate_profile_ids=[cid for cid, hold in results.items() if hold is None],
+    )
+
+@router.put("/applications/{application_id}/status", response_model=CandidateApplication)
+async def set_application_status(update: ApplicationStatusUpdate, application_id: str = Path(...)):
+    """Move an application to a new status; every change is kept in its status history."""
+    application = applications_db.get(application_id)
+    if not application:
+        raise HTTPException(status_code=404, detail="Application not found.")
+    if application.status != update.status:
+        update_application_status(application, update.status)
+    return application
+
+@router.post("/exports", response_model=ExportJob, status_code=status.HTTP_202_ACCEPTED)
+async def start_analytics_export(background_tasks: BackgroundTasks, export_request: Optional[ExportRequest] = None):
+    """
+    Starts a columnar export of candidates, applications, status history, jobs and match scores
+    in the background. Only rows changed since the last export are written unless full is set.
+    """
+    export_request = export_request or ExportRequest()
+    try:
+        job = export_manager.start(export_request.format, export_request.full)
+    except ExportInProgress as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    background_tasks.add_task(export_manager.run, job)
+    return job
+
+@router.get("/exports", response_model=List[ExportJob])
+async def list_analytics_exports():
+    """Recent exports, newest first."""
+    return export_manager.list_jobs()
+
+@router.get("/exports/{export_id}", response_model=ExportJob)
+async def get_analytics_export(export_id: str = Path(...)):
+    job = export_manager.get(export_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Export not found.")
+    return job
@@ -0,0 +1,414 @@
+import heapq
+import re
+import threading
+import uuid
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Protocol, Sequence, Tuple
+from zoneinfo import ZoneInfo
+
+from app.core.config import settings
+from app.schemas import InterviewHold, InterviewHoldStatus
+
+# Internally every interval is a half-open [start, end) pair of UTC epoch seconds.
+Span = Tuple[int, int]
+
+_DATE_WITH_TIME_RANGE = re.compile(
+    r'^\s*(\d{4}-\d{2}-\d{2})[ T](\d{1,2}:\d{2}(?::\d{2})?)\s*(?:-|–|to)\s*(\d{1,2}:\d{2}(?::\d{2})?)'
+    r'\s*(Z|UTC|GMT|[+-]\d{1,2}:?\d{2}|[A-Za-z_]+/[A-Za-z_]+(?:/[A-Za-z_]+)?)?\s*$',
+    re.IGNORECASE
+)
+_RANGE_SEPARATOR = re.compile(r'\s+(?:-|–|to)\s+|/', re.IGNORECASE)
+
+class SlotParseError(ValueError):
+    pass
+
+def _to_epoch(value: datetime) -> int:
+    return int(value.timestamp())
+
+def _from_epoch(value: int) -> datetime:
+    return datetime.fromtimestamp(value, tz=timezone.utc)
+
+def _resolve_timezone(suffix: str, default_tz: timezone):
+    suffix = suffix.strip()
+    if not suffix:
+        return default_tz
+    if suffix.upper() in ("Z", "UTC", "GMT"):
+        return timezone.utc
+    offset = re.fullmatch(r'([+-])(\d{1,2}):?(\d{2})', suffix)
+    if offset:
+        sign = 1 if offset.group(1) == "+" else -1
+        return timezone(sign * timedelta(hours=int(offset.group(2)), minutes=int(offset.group(3))))
+    try:
+        return ZoneInfo(suffix)
+    except Exception:
+        raise SlotParseError(f"Unknown timezone '{suffix}'.")
+
+def _parse_datetime(value: str, default_tz) -> datetime:
+    try:
+        parsed = datetime.fromisoformat(value.strip())
+    except ValueError:
+        raise SlotParseError(f"Could not parse date/time '{value}'.")
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=default_tz)
+    return parsed
+
+def parse_slot(slot: str, default_tz=timezone.utc) -> Span:
+    """
+    Parses a free-text slot into a UTC interval. Accepted forms:
+      2026-10-20T09:00/2026-10-20T11:00          (ISO interval, offsets allowed)
+      2026-10-20T09:00+02:00 - 2026-10-20T11:00+02:00
+      2026-10-20 09:00-11:00 [UTC | +05:30 | Europe/Berlin]
+    Times without an offset are read in `default_tz`.
+    """
+    match = _DATE_WITH_TIME_RANGE.match(slot)
+    if match:
+        day, start_time, end_time, tz_suffix = match.groups()
+        tz = _resolve_timezone(tz_suffix or "", default_tz)
+        start = _parse_datetime(f"{day}T{start_time}", tz)
+        end = _parse_datetime(f"{day}T{end_time}", tz)
+        if end <= start:
+            end += timedelta(days=1)
+    else:
+        parts = _RANGE_SEPARATOR.split(slot.strip())
+        if len(parts) != 2:
+            raise SlotParseError(f"Could not parse slot '{slot}'. Use 'YYYY-MM-DDTHH:MM/YYYY-MM-DDTHH:MM'.")
+        start = _parse_datetime(parts[0], default_tz)
+        end = _parse_datetime(parts[1], default_tz)
+
+    start_epoch, end_epoch = _to_epoch(start), _to_epoch(end)
+    if end_epoch <= start_epoch:
+        raise SlotParseError(f"Slot '{slot}' ends before it starts.")
+    return start_epoch, end_epoch
+
+def parse_slots(slots: Iterable[str], default_tz=timezone.utc) -> List[Span]:
+    return normalize([parse_slot(slot, default_tz) for slot in slots])
+
+def normalize(spans: Iterable[Span]) -> List[Span]:
+    """Sorts spans and merges overlapping or touching ones."""
+    merged: List[Span] = []
+    for start, end in sorted(spans):
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+def subtract(spans: List[Span], removed: List[Span]) -> List[Span]:
+    """Linear-time difference of two normalized span lists."""
+    result: List[Span] = []
+    j = 0
+    for start, end in spans:
+        cursor = start
+        while j < len(removed) and removed[j][1] <= cursor:
+            j += 1
+        k = j
+        while k < len(removed) and removed[k][0] < end:
+            if removed[k][0] > cursor:
+                result.append((cursor, removed[k][0]))
+            cursor = max(cursor, removed[k][1])
+            k += 1
+        if cursor < end:
+            result.append((cursor, end))
+    return result
+
+def common_free_spans(participant_spans: Sequence[List[Span]], min_duration: int = 0) -> List[Span]:
+    """
+    Sweep-line intersection: the spans during which every participant is free.
+    Each input list must be normalized (sorted, non-overlapping).
+    """
+    if not participant_spans:
+        return []
+    required = len(participant_spans)
+    events: List[Tuple[int, int]] = []
+    for spans in participant_spans:
+        if not spans:
+            return []
+        for start, end in spans:
+            # Ends sort before starts at the same instant, so touching spans do not count as overlap.
+            events.append((start, 1))
+            events.append((end, -1))
+    events.sort()
+
+    common: List[Span] = []
+    active = 0
+    opened_at = 0
+    for instant, delta in events:
+        if delta == 1:
+            active += 1
+            if active == required:
+                opened_at = instant
+        else:
+            if active == required and instant - opened_at >= max(min_duration, 1):
+                common.append((opened_at, instant))
+            active -= 1
+    return common
+
+class IntervalIndex:
+    """
+    Sorted, non-overlapping intervals with O(log n) overlap lookups.
+
+    Every interval stored per participant is kept disjoint (availability is
+    merged on insert, bookings are rejected on conflict), so a pair of sorted
+    arrays answers the same stabbing/overlap queries an interval tree would.
+    """
+
+    def __init__(self):
+        self._starts: List[int] = []
+        self._ends: List[int] = []
+        self._labels: List[Optional[str]] = []
+
+    def __len__(self) -> int:
+        return len(self._starts)
+
+    def spans(self) -> List[Span]:
+        return list(zip(self._starts, self._ends))
+
+    def overlapping(self, start: int, end: int) -> List[Tuple[int, int, Optional[str]]]:
+        first = bisect_right(self._ends, start)
+        last = bisect_left(self._starts, end)
+        return [(self._starts[i], self._ends[i], self._labels[i]) for i in range(first, last)]
+
+    def spans_within(self, start: int, end: int) -> List[Span]:
+        return [(max(s, start), min(e, end)) for s, e, _ in self.overlapping(start, end)]
+
+    def insert(self, start: int, end: int, label: Optional[str] = None) -> None:
+        """Inserts a labelled interval. Raises ValueError if it overlaps an existing one."""
+        if self.overlapping(start, end):
+            raise ValueError("Interval overlaps an existing entry.")
+        position = bisect_left(self._starts, start)
+        self._starts.insert(position, start)
+        self._ends.insert(position, end)
+        self._labels.insert(position, label)
+
+    def remove_label(self, label: str) -> None:
+        keep = [i for i, existing in enumerate(self._labels) if existing != label]
+        self._starts = [self._starts[i] for i in keep]
+        self._ends = [self._ends[i] for i in keep]
+        self._labels = [self._labels[i] for i in keep]
+
+    def replace(self, spans: List[Span]) -> None:
+        normalized = normalize(spans)
+        self._starts = [start for start, _ in normalized]
+        self._ends = [end for _, end in normalized]
+        self._labels = [None] * len(normalized)
+
+class CalendarProvider(Protocol):
+    """External calendar integration (e.g. Microsoft Graph). Busy times are merged with local bookings."""
+
+    def get_busy(self, participant: str, start: datetime, end: datetime) -> List[Tuple[datetime, datetime]]:
+        ...
+
+    def create_event(self, hold: InterviewHold) -> str:
+        ...
+
+    def cancel_event(self, event_id: str) -> None:
+        ...
+
+class InMemoryCalendarProvider:
+    """Local calendar used until a real provider is configured; also handy as a test stub."""
+
+    def __init__(self):
+        self.busy: Dict[str, List[Tuple[datetime, datetime]]] = {}
+        self.events: Dict[str, InterviewHold] = {}
+
+    def get_busy(self, participant: str, start: datetime, end: datetime) -> List[Tuple[datetime, datetime]]:
+        return [(s, e) for s, e in self.busy.get(participant, []) if s < end and e > start]
+
+    def create_event(self, hold: InterviewHold) -> str:
+        event_id = str(uuid.uuid4())
+        self.events[event_id] = hold
+        return event_id
+
+    def cancel_event(self, event_id: str) -> None:
+        self.events.pop(event_id, None)
+
+def interviewer_key(interviewer_id: str) -> str:
+    return f"interviewer:{interviewer_id}"
+
+def candidate_key(candidate_profile_id: str) -> str:
+    return f"candidate:{candidate_profile_id}"
+
+class SchedulingConflict(Exception):
+    pass
+
+class SchedulingEngine:
+    """
+    Matches interviewer panels and candidates on common free time.
+
+    Availability and bookings (holds and confirmed interviews) are kept per
+    participant as IntervalIndex instances. A participant without registered
+    availability is treated as free throughout the requested windows.
+    """
+
+    def __init__(self, calendar: CalendarProvider, hold_ttl: timedelta = timedelta(minutes=30), slot_step: timedelta = timedelta(minutes=15)):
+        self.calendar = calendar
+        self.hold_ttl = hold_ttl
+        self.slot_step = int(slot_step.total_seconds())
+        self._availability: Dict[str, IntervalIndex] = {}
+        self._bookings: Dict[str, IntervalIndex] = {}
+        self._holds: Dict[str, InterviewHold] = {}
+        self._expiry_heap: List[Tuple[int, str]] = []
+        self._lock = threading.RLock()
+
+    def set_availability(self, participant: str, spans: List[Span]) -> None:
+        with self._lock:
+            self._availability.setdefault(participant, IntervalIndex()).replace(spans)
+
+    def get_availability(self, participant: str) -> List[Span]:
+        index = self._availability.get(participant)
+        return index.spans() if index else []
+
+    def get_hold(self, hold_id: str) -> Optional[InterviewHold]:
+        with self._lock:
+            self._expire_holds()
+            return self._holds.get(hold_id)
+
+    def free_spans(self, participant: str, windows: List[Span]) -> List[Span]:
+        """Free time of one participant inside the windows: availability minus bookings and calendar busy time."""
+        available = self._availability.get(participant)
+        if available is None:
+            spans = list(windows)
+        else:
+            spans = normalize(span for start, end in windows for span in available.spans_within(start, end))
+        if not spans:
+            return []
+
+        window_start, window_end = spans[0][0], spans[-1][1]
+        busy = []
+        bookings = self._bookings.get(participant)
+        if bookings is not None:
+            busy.extend((start, end) for start, end, _ in bookings.overlapping(window_start, window_end))
+        busy.extend(
+            (_to_epoch(start), _to_epoch(end))
+            for start, end in self.calendar.get_busy(participant, _from_epoch(window_start), _from_epoch(window_end))
+        )
+        return subtract(spans, normalize(busy))
+
+    def find_slots(self, participants: List[str], windows: List[Span], duration: timedelta, limit: int = 5) -> List[Span]:
+        """Earliest `limit` slots of `duration` when all participants are free, aligned to the slot step."""
+        length = int(duration.total_seconds())
+        with self._lock:
+            self._expire_holds()
+            common = common_free_spans([self.free_spans(p, normalize(windows)) for p in participants], length)
+
+        slots: List[Span] = []
+        for start, end in common:
+            slot_start = -(-start // self.slot_step) * self.slot_step
+            while slot_start + length <= end and len(slots) < limit:
+                slots.append((slot_start, slot_start + length))
+                slot_start += length
+            if len(slots) >= limit:
+                break
+        return slots
+
+    def hold(self, job_id: str, candidate_profile_id: str, interviewer_ids: List[str], span: Span) -> InterviewHold:
+        """
+        Tentatively books a slot for the candidate and every interviewer. Raises SchedulingConflict on overlap.
+        All or nothing: either every participant is booked or none is.
+        """
+        interviewer_ids = list(dict.fromkeys(interviewer_ids))
+        participants = [candidate_key(candidate_profile_id)] + [interviewer_key(i) for i in interviewer_ids]
+        with self._lock:
+            self._expire_holds()
+            for participant in participants:
+                bookings = self._bookings.get(participant)
+                if bookings is not None and bookings.overlapping(*span):
+                    raise SchedulingConflict(f"{participant} is already booked during the requested slot.")
+
+            now = datetime.now(timezone.utc)
+            hold = InterviewHold(
+                job_id=job_id,
+                candidate_profile_id=candidate_profile_id,
+                interviewer_ids=interviewer_ids,
+                start=_from_epoch(span[0]),
+                end=_from_epoch(span[1]),
+                status=InterviewHoldStatus.HELD,
+                expires_at=now + self.hold_ttl,
+            )
+            booked: List[IntervalIndex] = []
+            try:
+                for participant in participants:
+                    bookings = self._bookings.setdefault(participant, IntervalIndex())
+                    bookings.insert(span[0], span[1], hold.id)
+                    booked.append(bookings)
+            except ValueError:
+                for bookings in booked:
+                    bookings.remove_label(hold.id)
+                raise SchedulingConflict(f"{participant} is already booked during the requested slot.")
+            self._holds[hold.id] = hold
+            heapq.heappush(self._expiry_heap, (_to_epoch(hold.expires_at), hold.id))
+            return hold
+
+    def confirm(self, hold_id: str) -> InterviewHold:
+        with self._lock:
+            self._expire_holds()
+            hold = self._holds.get(hold_id)
+            if hold is None:
+                raise KeyError(hold_id)
+            if hold.status == InterviewHoldStatus.CONFIRMED:
+                return hold
+            hold.calendar_event_id = self.calendar.create_event(hold)
+            hold.status = InterviewHoldStatus.CONFIRMED
+            hold.expires_at = None
+            return hold
+
+    def release(self, hold_id: str) -> InterviewHold:
+        with self._lock:
+            hold = self._holds.pop(hold_id, None)
+            if hold is None:
+                raise KeyError(hold_id)
+            self._unbook(hold)
+            if hold.calendar_event_id:
+                self.calendar.cancel_event(hold.calendar_event_id)
+            hold.status = InterviewHoldStatus.RELEASED
+            return hold
+
+    def schedule_many(
+        self,
+        job_id: str,
+        candidate_profile_ids: List[str],
+        interviewer_ids: List[str],
+        windows: List[Span],
+        duration: timedelta,
+    ) -> Dict[str, Optional[InterviewHold]]:
+        """Holds the earliest common slot for each candidate in order; None where no slot is left."""
+        interviewer_ids = list(dict.fromkeys(interviewer_ids))
+        panel = [interviewer_key(i) for i in interviewer_ids]
+        results: Dict[str, Optional[InterviewHold]] = {}
+        with self._lock:
+            for candidate_profile_id in dict.fromkeys(candidate_profile_ids):
+                slots = self.find_slots(panel + [candidate_key(candidate_profile_id)], windows, duration, limit=1)
+                results[candidate_profile_id] = (
+                    self.hold(job_id, candidate_profile_id, interviewer_ids, slots[0]) if slots else None
+                )
+        return results
+
+    def _unbook(self, hold: InterviewHold) -> None:
+        for participant in [candidate_key(hold.candidate_profile_id)] + [interviewer_key(i) for i in hold.interviewer_ids]:
+            bookings = self._bookings.get(participant)
+            if bookings is not None:
+                bookings.remove_label(hold.id)
+
+    def _expire_holds(self) -> None:
+        now = _to_epoch(datetime.now(timezone.utc))
+        while self._expiry_heap and self._expiry_heap[0][0] <= now:
+            _, hold_id = heapq.heappop(self._expiry_heap)
+            hold = self._holds.get(hold_id)
+            if hold is not None and hold.status == InterviewHoldStatus.HELD:
+                self._unbook(hold)
+                hold.status = InterviewHoldStatus.EXPIRED
+                del self._holds[hold_id]
+
+def format_span(span: Span) -> Tuple[datetime, datetime]:
+    return _from_epoch(span[0]), _from_epoch(span[1])
+
+def default_timezone():
+    return _resolve_timezone(settings.SCHEDULING_DEFAULT_TIMEZONE, timezone.utc)
+
+scheduling_engine = SchedulingEngine(
+    InMemoryCalendarProvider(),
+    hold_ttl=timedelta(minutes=settings.INTERVIEW_HOLD_TTL_MINUTES),
+    slot_step=timedelta(minutes=settings.SCHEDULING_SLOT_STEP_MINUTES),
+)
@@ -28,6 +28,20 @@ class CandidateProfile(BaseModel):
     raw_text: Optional[str] = None
     embedding: Optional[List[float]] = None
 
+class CandidateProfileSummary(BaseModel):
+    """Lean projection of a CandidateProfile without raw text or embedding."""
+    id: str
+    user_id: Optional[str] = None
+    name: Optional[str] = None
+    email: Optional[str] = None
+    phone: Optional[str] = None
+    total_experience_years: Optional[float] = None
+    skills: List[str] = []
+    education: List[Education] = []
+    experience: List[Experience] = []
+
+CANDIDATE_SUMMARY_FIELDS = set(CandidateProfileSummary.model_fields)
+
 class JobDescriptionBase(BaseModel):
     title: str
     description: str
@@ -37,6 +51,10 @@ class JobDescriptionBase(BaseModel):
 class JobDescriptionCreate(JobDescriptionBase):
     pass
 
+class JobListing(JobDescriptionBase):
+    """Default projection of a job in public listings and search results."""
+    id: str
+
 class JobDescription(JobDescriptionBase):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     processed_candidate_profiles_ids: List[str] = []
@@ -45,15 +63,58 @@ class JobDescription(JobDescriptionBase):
     class Config:
         from_attributes = True
 
+class JobSearchMode(str, Enum):
+    KEYWORD = "keyword"
+    SEMANTIC = "semantic"
+
 class InterviewRequest(BaseModel):
     job_id: str
     candidate_profile_id: str
     interviewer_ids: List[str]
     preferred_dates_times: List[str]
+    duration_minutes: int = Field(60, ge=15, le=480)
     notes: Optional[str] = None
 
+class InterviewHoldStatus(str, Enum):
+    HELD = "Held"
+    CONFIRMED = "Confirmed"
+    RELEASED = "Released"
+    EXPIRED = "Expired"
+
+class InterviewHold(BaseModel):
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    job_id: str
+    candidate_profile_id: str
+    interviewer_ids: List[str]
+    start: datetime
+    end: datetime
+    status: InterviewHoldStatus = InterviewHoldStatus.HELD
+    expires_at: Optional[datetime] = None
+    calendar_event_id: Optional[str] = None
+
+class InterviewerAvailability(BaseModel):
+    available_slots: List[str]
+
+class ShortlistScheduleRequest(BaseModel):
+    interviewer_ids: List[str]
+    preferred_dates_times: List[str]
+    duration_minutes: int = Field(60, ge=15, le=480)
+    candidate_profile_ids: Optional[List[str]] = None
+
+class ShortlistScheduleResponse(BaseModel):
+    scheduled: List[InterviewHold]
+    unscheduled_candidate_profile_ids: List[str]
+
+class CandidateRecommendation(BaseModel):
+    candidate_profile: CandidateProfileSummary
+    match_score: float
+
+class JobRecommendation(BaseModel):
+    job: JobListing
+    match_score: float
+
 class RankedCandidateResponse(BaseModel):
-    candidate_profile: CandidateProfile
+    candidate_profile: CandidateProfileSummary
     match_score: float
     explainability: Dict
 
@@ -69,8 +130,7 @@ class RankedCandidateResponse(BaseModel):
                     "total_experience_years": 5.0,
                     "skills": ["Python", "Machine Learning", "FastAPI"],
                     "education": [],
-                    "experience": [],
-                    "embedding": []
+                    "experience": []
                 },
                 "match_score": 85.5,
                 "explainability": {
@@ -114,6 +174,10 @@ class ApplicationStatus(str, Enum):
     REJECTED = "Rejected"
     HIRED = "Hired"
 
+class ApplicationStatusChange(BaseModel):
+    status: ApplicationStatus
+    changed_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
 class CandidateApplication(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     candidate_user_id: str
@@ -121,9 +185,40 @@ class CandidateApplication(BaseModel):
     candidate_profile_id: str
     status: ApplicationStatus = ApplicationStatus.APPLIED
     applied_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    status_history: List[ApplicationStatusChange] = []
+
+class ApplicationStatusUpdate(BaseModel):
+    status: ApplicationStatus
 
 class CandidateAvailability(BaseModel):
     candidate_id: str
     job_id: str
     available_slots: List[str]
-    notes: Optional[str] = None
\ No newline at end of file
+    notes: Optional[str] = None
+
+class ExportFormat(str, Enum):
+    PARQUET = "parquet"
+    ARROW = "arrow"
+    CSV = "csv"
+
+class ExportStatus(str, Enum):
+    RUNNING = "Running"
+    COMPLETED = "Completed"
+    FAILED = "Failed"
+
+class ExportRequest(BaseModel):
+    format: Optional[ExportFormat] = None
+    full: bool = False
+
+class ExportJob(BaseModel):
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    format: ExportFormat
+    full: bool = False
+    status: ExportStatus = ExportStatus.RUNNING
+    from_sequence: int = 0
+    to_sequence: int = 0
+    row_counts: Dict[str, int] = {}
+    files: List[str] = []
+    started_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    finished_at: Optional[datetime] = None
+    error: Optional[str] = None
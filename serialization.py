@@ -0,0 +1,74 @@
+import json
+from collections import OrderedDict
+from typing import Any, Dict, List, Tuple
+
+from app.schemas import CandidateProfile, JobDescription, CANDIDATE_SUMMARY_FIELDS
+from app.core.config import settings
+from app.metrics import record_cache_lookup
+
+try:
+    import orjson
+except ImportError:
+    print("Warning: orjson is not installed. Falling back to the standard json module for response serialization.")
+    orjson = None
+
+# LRU of profile id -> (profile object the fragment was rendered from, JSON bytes), at most PROFILE_FRAGMENT_CACHE_MAX_ENTRIES
+_profile_fragments: "OrderedDict[str, Tuple[CandidateProfile, bytes]]" = OrderedDict()
+
+def dumps(obj: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+def render_profile_fragment(profile: CandidateProfile) -> bytes:
+    """Serializes the lean CandidateProfileSummary projection of a profile."""
+    return dumps(profile.model_dump(include=CANDIDATE_SUMMARY_FIELDS))
+
+def get_profile_fragment(profile: CandidateProfile) -> bytes:
+    """
+    Returns the cached summary fragment for a profile, rendering it on first use.
+    Profiles are replaced rather than edited in place, so a cached entry is only
+    reused while it still belongs to the same profile object.
+    """
+    cached = _profile_fragments.get(profile.id)
+    if cached is not None and cached[0] is profile:
+        record_cache_lookup("profile_fragment", hit=True)
+        _profile_fragments.move_to_end(profile.id)
+        return cached[1]
+    record_cache_lookup("profile_fragment", hit=False)
+
+    fragment = render_profile_fragment(profile)
+    if settings.PROFILE_FRAGMENT_CACHE_MAX_ENTRIES > 0:
+        _profile_fragments[profile.id] = (profile, fragment)
+        _profile_fragments.move_to_end(profile.id)
+        while len(_profile_fragments) > settings.PROFILE_FRAGMENT_CACHE_MAX_ENTRIES:
+            _profile_fragments.popitem(last=False)
+    return fragment
+
+def invalidate_profile_fragment(profile_id: str) -> None:
+    """Drops the cached fragment for a profile that was replaced, modified in place or deleted."""
+    _profile_fragments.pop(profile_id, None)
+
+def clear_profile_fragments() -> None:
+    _profile_fragments.clear()
+
+def render_ranked_candidates(scored_candidates: List[Tuple[CandidateProfile, float, Dict]]) -> bytes:
+    """
+    Assembles a List[RankedCandidateResponse] JSON body from the output of
+    ai_matcher.score_candidates, reusing the cached per-profile fragments.
+    """
+    parts = []
+    for profile, match_score, explainability in scored_candidates:
+        parts.append(
+            b'{"candidate_profile":' + get_profile_fragment(profile)
+            + b',"match_score":' + dumps(match_score)
+            + b',"explainability":' + dumps(explainability)
+            + b'}'
+        )
+    return b"[" + b",".join(parts) + b"]"
+
+def render_jobs(jobs: List[JobDescription]) -> bytes:
+    return dumps([job.model_dump(mode="json") for job in jobs])
+
+def render_job(job: JobDescription) -> bytes:
+    return dumps(job.model_dump(mode="json"))
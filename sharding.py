@@ -0,0 +1,581 @@
+"""
+Sharded candidate store: candidate profiles and embeddings partitioned by a
+consistent hash of the profile id across shard processes, with scatter-gather
+ranking from a coordinator.
+
+Shards speak multiprocessing.connection (pickled requests, HMAC handshake)
+over Unix sockets or TCP. Run a standalone shard with:
+
+    CANDIDATE_SHARD_AUTHKEY=... python -m app.sharding --listen /tmp/shard-0.sock
+    CANDIDATE_SHARD_AUTHKEY=... python -m app.sharding --listen 10.0.0.5:7001
+
+Requests are unpickled, so whoever holds the authkey can run code in a shard
+process. Standalone shards therefore require their own CANDIDATE_SHARD_AUTHKEY
+(shared by the API and every shard), and TCP shards must only be reachable on
+a trusted network: bind them to a private interface and firewall the port.
+"""
+import argparse
+import atexit
+import bisect
+import hashlib
+import heapq
+import multiprocessing
+import os
+import shutil
+import tempfile
+import threading
+import time
+from multiprocessing.connection import Client, Connection, Listener
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from app.schemas import CandidateProfile, CANDIDATE_SUMMARY_FIELDS
+
+Address = Union[str, Tuple[str, int]]
+# (profile id, lean profile summary, embedding)
+ShardEntry = Tuple[str, Dict, np.ndarray]
+# (profile id, match score, lean profile summary)
+RankedEntry = Tuple[str, float, Dict]
+
+def parse_address(address: str) -> Address:
+    """host:port for TCP, anything else is a Unix socket path."""
+    host, sep, port = address.rpartition(":")
+    if sep and port.isdigit() and "/" not in address:
+        return (host or "127.0.0.1", int(port))
+    return address
+
+def _hash(key: str) -> int:
+    return int.from_bytes(hashlib.md5(key.encode("utf-8")).digest()[:8], "big")
+
+class HashRing:
+    """Consistent hash ring with virtual nodes; adding a shard only moves about 1/N of the keys."""
+
+    def __init__(self, shard_names: Iterable[str] = (), virtual_nodes: int = 128):
+        self.virtual_nodes = virtual_nodes
+        self._points: List[int] = []
+        self._owners: List[str] = []
+        self.shard_names: List[str] = []
+        for name in shard_names:
+            self.add(name)
+
+    def add(self, name: str) -> None:
+        if name in self.shard_names:
+            return
+        self.shard_names.append(name)
+        for i in range(self.virtual_nodes):
+            point = _hash(f"{name}#{i}")
+            position = bisect.bisect(self._points, point)
+            self._points.insert(position, point)
+            self._owners.insert(position, name)
+
+    def remove(self, name: str) -> None:
+        if name not in self.shard_names:
+            return
+        self.shard_names.remove(name)
+        kept = [(point, owner) for point, owner in zip(self._points, self._owners) if owner != name]
+        self._points = [point for point, _ in kept]
+        self._owners = [owner for _, owner in kept]
+
+    def shard_for(self, key: str) -> str:
+        if not self._points:
+            raise LookupError("The hash ring has no shards.")
+        position = bisect.bisect(self._points, _hash(key)) % len(self._points)
+        return self._owners[position]
+
+class CandidateShard:
+    """One shard's candidates: lean summaries plus a matrix of normalized embeddings with reusable rows."""
+
+    def __init__(self):
+        self.summaries: Dict[str, Dict] = {}
+        self.embeddings: Dict[str, np.ndarray] = {}
+        self.row_by_id: Dict[str, int] = {}
+        self.id_by_row: List[Optional[str]] = []
+        self.free_rows: List[int] = []
+        self.matrix: Optional[np.ndarray] = None
+        self.live = np.zeros(0, dtype=bool)
+
+    def put(self, entries: Sequence[ShardEntry]) -> int:
+        for profile_id, summary, embedding in entries:
+            self.delete([profile_id])
+            self.summaries[profile_id] = summary
+            self.embeddings[profile_id] = embedding
+            norm = np.linalg.norm(embedding)
+            if norm > 0:
+                self._index(profile_id, embedding / norm)
+        return len(self.summaries)
+
+    def delete(self, profile_ids: Sequence[str]) -> int:
+        for profile_id in profile_ids:
+            self.summaries.pop(profile_id, None)
+            self.embeddings.pop(profile_id, None)
+            row = self.row_by_id.pop(profile_id, None)
+            if row is not None:
+                self.matrix[row] = 0.0
+                self.live[row] = False
+                self.id_by_row[row] = None
+                self.free_rows.append(row)
+        return len(self.summaries)
+
+    def get(self, profile_ids: Sequence[str]) -> List[ShardEntry]:
+        return [(profile_id, self.summaries[profile_id], self.embeddings[profile_id]) for profile_id in profile_ids if profile_id in self.summaries]
+
+    def ids(self) -> List[str]:
+        return list(self.summaries)
+
+    def rank(self, query: np.ndarray, limit: int) -> List[RankedEntry]:
+        """Local top `limit` candidates by cosine similarity to the normalized query, on the 0-100 scale, unrounded."""
+        if not self.row_by_id or limit <= 0:
+            return []
+        size = len(self.id_by_row)
+        scores = self.matrix[:size] @ query * 100
+        scores[~self.live[:size]] = -np.inf
+        limit = min(limit, len(self.row_by_id))
+        top_rows = np.argpartition(-scores, limit - 1)[:limit]
+        top_rows = top_rows[np.argsort(-scores[top_rows])]
+        return [(self.id_by_row[row], float(scores[row]), self.summaries[self.id_by_row[row]]) for row in top_rows]
+
+    def score(self, query: np.ndarray, profile_ids: Sequence[str]) -> List[Tuple[str, float]]:
+        """Unrounded 0-100 scores of those profile_ids stored here with a non-zero embedding."""
+        found = [profile_id for profile_id in profile_ids if profile_id in self.row_by_id]
+        if not found:
+            return []
+        scores = self.matrix[[self.row_by_id[profile_id] for profile_id in found]] @ query * 100
+        return list(zip(found, scores.tolist()))
+
+    def _index(self, profile_id: str, vector: np.ndarray) -> None:
+        if self.matrix is None:
+            self.matrix = np.zeros((1024, vector.shape[0]), dtype=np.float32)
+            self.live = np.zeros(1024, dtype=bool)
+        if self.free_rows:
+            row = self.free_rows.pop()
+        else:
+            row = len(self.id_by_row)
+            self.id_by_row.append(None)
+            if row >= self.matrix.shape[0]:
+                grown = np.zeros((self.matrix.shape[0] * 2, self.matrix.shape[1]), dtype=np.float32)
+                grown[:self.matrix.shape[0]] = self.matrix
+                self.matrix = grown
+                live = np.zeros(grown.shape[0], dtype=bool)
+                live[:self.live.shape[0]] = self.live
+                self.live = live
+        self.matrix[row] = vector
+        self.live[row] = True
+        self.row_by_id[profile_id] = row
+        self.id_by_row[row] = profile_id
+
+def _serve_connection(shard: CandidateShard, lock: threading.Lock, conn: Connection, stop: threading.Event) -> None:
+    handlers = {
+        "put": shard.put,
+        "delete": shard.delete,
+        "get": shard.get,
+        "ids": shard.ids,
+        "rank": shard.rank,
+        "score": shard.score,
+        "count": lambda: len(shard.summaries),
+    }
+    with conn:
+        while True:
+            try:
+                op, args = conn.recv()
+            except (EOFError, OSError):
+                return
+            if op == "shutdown":
+                conn.send((True, None))
+                stop.set()
+                return
+            try:
+                with lock:
+                    result = handlers[op](*args)
+                conn.send((True, result))
+            except Exception as e:
+                conn.send((False, f"{type(e).__name__}: {e}"))
+
+def serve_shard(address: Address, authkey: bytes) -> None:
+    """Serves one CandidateShard until a shutdown request. One thread per coordinator connection."""
+    shard = CandidateShard()
+    lock = threading.Lock()
+    stop = threading.Event()
+    with Listener(address, authkey=authkey) as listener:
+        def accept_loop():
+            while not stop.is_set():
+                try:
+                    conn = listener.accept()
+                except Exception:
+                    if stop.is_set():
+                        return
+                    continue
+                threading.Thread(target=_serve_connection, args=(shard, lock, conn, stop), daemon=True).start()
+
+        threading.Thread(target=accept_loop, daemon=True).start()
+        stop.wait()
+
+class ShardError(Exception):
+    pass
+
+# Failures that leave a connection unusable or out of step with its shard.
+CONNECTION_ERRORS = (OSError, EOFError, multiprocessing.AuthenticationError)
+
+class ShardClient:
+    """Connections to one shard, one per calling thread so concurrent requests don't interleave."""
+
+    def __init__(self, name: str, address: Address, authkey: bytes):
+        self.name = name
+        self.address = address
+        self.authkey = authkey
+        self._local = threading.local()
+        self._connections: List[Connection] = []
+        self._connections_lock = threading.Lock()
+
+    def _connection(self) -> Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = Client(self.address, authkey=self.authkey)
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+
+    def send(self, op: str, *args) -> None:
+        self._connection().send((op, args))
+
+    def receive(self):
+        ok, result = self._connection().recv()
+        if not ok:
+            raise ShardError(f"Shard {self.name}: {result}")
+        return result
+
+    def call(self, op: str, *args):
+        try:
+            self.send(op, *args)
+            return self.receive()
+        except CONNECTION_ERRORS:
+            self.reset()
+            raise
+
+    def reset(self) -> None:
+        """Drops this thread's connection, e.g. after a reply was lost; the next request reconnects."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            return
+        self._local.conn = None
+        with self._connections_lock:
+            if conn in self._connections:
+                self._connections.remove(conn)
+        try:
+            conn.close()
+        except OSError:
+            pass
+
+    def close(self) -> None:
+        with self._connections_lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+        self._local = threading.local()
+
+def shard_entry(profile: CandidateProfile) -> ShardEntry:
+    return (
+        profile.id,
+        profile.model_dump(mode="json", include=CANDIDATE_SUMMARY_FIELDS),
+        np.asarray(profile.embedding or (), dtype=np.float32),
+    )
+
+class ShardCoordinator:
+    """
+    Routes candidates to shards with a consistent hash of the profile id and
+    ranks by scatter-gather: the query goes to every shard at once, each
+    returns its local top-k, and the coordinator merges them.
+
+    Writes and rebalancing are serialized; reads are not. While a rebalance
+    copies candidates to a new shard they briefly exist on two shards, so
+    merged results are de-duplicated by id.
+    """
+
+    def __init__(self, shards: Dict[str, Address], authkey: bytes, virtual_nodes: int = 128):
+        self.authkey = authkey
+        self.clients: Dict[str, ShardClient] = {name: ShardClient(name, address, authkey) for name, address in shards.items()}
+        self.ring = HashRing(self.clients, virtual_nodes)
+        self._write_lock = threading.Lock()
+
+    def put_profiles(self, profiles: Iterable[CandidateProfile]) -> int:
+        """Stores profiles on their owning shards. Returns the number stored."""
+        entries = [shard_entry(profile) for profile in profiles]
+        by_shard: Dict[str, List[ShardEntry]] = {}
+        with self._write_lock:
+            # Routed under the lock so a concurrent rebalance cannot swap the ring in between.
+            for entry in entries:
+                by_shard.setdefault(self.ring.shard_for(entry[0]), []).append(entry)
+            self._scatter({name: ("put", entries) for name, entries in by_shard.items()})
+        return sum(len(entries) for entries in by_shard.values())
+
+    def delete_profiles(self, profile_ids: Iterable[str]) -> None:
+        by_shard: Dict[str, List[str]] = {}
+        with self._write_lock:
+            for profile_id in profile_ids:
+                by_shard.setdefault(self.ring.shard_for(profile_id), []).append(profile_id)
+            self._scatter({name: ("delete", ids) for name, ids in by_shard.items()})
+
+    def rank(self, job_embedding: List[float], limit: int) -> List[RankedEntry]:
+        """Global top `limit` candidates for a job embedding, best first."""
+        query = np.asarray(job_embedding, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if norm == 0 or limit <= 0:
+            return []
+        query = query / norm
+        clients = list(self.clients.values())
+        results = self._scatter({client.name: ("rank", query, limit) for client in clients})
+
+        best: Dict[str, RankedEntry] = {}
+        for entries in results.values():
+            for entry in entries:
+                best.setdefault(entry[0], entry)
+        # Rounded only after the merge so near-ties across shards keep their order.
+        top = heapq.nlargest(limit, best.values(), key=lambda entry: entry[1])
+        return [(profile_id, round(score, 2), summary) for profile_id, score, summary in top]
+
+    def score_profiles(self, job_embedding: List[float], profile_ids: Sequence[str]) -> Dict[str, float]:
+        """
+        Match scores, rounded like rank, of the given candidates that are stored
+        with a non-zero embedding, in profile_ids order. Asks every shard rather
+        than the owner, so a candidate being moved by a rebalance is still found.
+        """
+        query = np.asarray(job_embedding or (), dtype=np.float32)
+        norm = np.linalg.norm(query) if query.size else 0.0
+        if norm == 0 or not profile_ids:
+            return {}
+        query = query / norm
+        profile_ids = list(profile_ids)
+        results = self._scatter({name: ("score", query, profile_ids) for name in list(self.clients)})
+
+        scores: Dict[str, float] = {}
+        for entries in results.values():
+            scores.update(entries)
+        return {profile_id: round(scores[profile_id], 2) for profile_id in profile_ids if profile_id in scores}
+
+    def embedding(self, profile_id: str) -> Optional[List[float]]:
+        """The stored embedding of a candidate, or None if no shard has it."""
+        for entries in self._scatter({name: ("get", [profile_id]) for name in list(self.clients)}).values():
+            for _, _, embedding in entries:
+                return embedding.tolist() or None
+        return None
+
+    def count(self) -> Dict[str, int]:
+        return self._scatter({name: ("count",) for name in self.clients})
+
+    def add_shard(self, name: str, address: Address) -> int:
+        """Adds a shard and moves the candidates it now owns onto it. Returns the number moved."""
+        with self._write_lock:
+            client = ShardClient(name, address, self.authkey)
+            new_ring = HashRing(self.ring.shard_names, self.ring.virtual_nodes)
+            new_ring.add(name)
+
+            moves: Dict[str, List[str]] = {}
+            for source, ids in self._scatter({source: ("ids",) for source in self.clients}).items():
+                moving = [profile_id for profile_id in ids if new_ring.shard_for(profile_id) == name]
+                if moving:
+                    moves[source] = moving
+
+            # Copy first, switch routing, then delete, so every candidate stays queryable throughout.
+            # The shard only becomes visible to reads once its copy is complete.
+            try:
+                for source, ids in moves.items():
+                    client.call("put", self.clients[source].call("get", ids))
+            except Exception:
+                client.close()
+                raise
+            self.clients[name] = client
+            self.ring = new_ring
+            self._scatter({source: ("delete", ids) for source, ids in moves.items()})
+            return sum(len(ids) for ids in moves.values())
+
+    def remove_shard(self, name: str) -> int:
+        """Moves a shard's candidates to the remaining shards and drops it. Returns the number moved."""
+        with self._write_lock:
+            if len(self.clients) <= 1:
+                raise ValueError("Cannot remove the last shard.")
+            new_ring = HashRing([shard for shard in self.ring.shard_names if shard != name], self.ring.virtual_nodes)
+            leaving = self.clients[name]
+            entries = leaving.call("get", leaving.call("ids"))
+            by_shard: Dict[str, List[ShardEntry]] = {}
+            for entry in entries:
+                by_shard.setdefault(new_ring.shard_for(entry[0]), []).append(entry)
+            self._scatter({target: ("put", moved) for target, moved in by_shard.items()})
+            self.ring = new_ring
+            del self.clients[name]
+            leaving.close()
+            return len(entries)
+
+    def _scatter(self, requests: Dict[str, tuple]) -> Dict[str, object]:
+        """
+        Sends every request before reading any reply, so shards work in parallel.
+        Every reply that was asked for is read, even after another shard failed,
+        and a connection that fails mid-exchange (or is abandoned by an
+        unexpected error) is dropped, so no connection is left with an unread
+        reply that the next request would take for its own.
+        """
+        results, errors = {}, []
+        pending: List[ShardClient] = []
+        try:
+            for name, (op, *args) in requests.items():
+                client = self.clients[name]
+                try:
+                    client.send(op, *args)
+                except CONNECTION_ERRORS as e:
+                    client.reset()
+                    errors.append(f"Shard {name}: {type(e).__name__}: {e}")
+                    continue
+                pending.append(client)
+
+            while pending:
+                client = pending[0]
+                try:
+                    results[client.name] = client.receive()
+                except ShardError as e:
+                    errors.append(str(e))
+                except CONNECTION_ERRORS as e:
+                    client.reset()
+                    errors.append(f"Shard {client.name}: {type(e).__name__}: {e}")
+                pending.pop(0)
+        finally:
+            for client in pending:
+                client.reset()
+        if errors:
+            raise ShardError("; ".join(errors))
+        return results
+
+    def close(self) -> None:
+        for client in self.clients.values():
+            client.close()
+
+def _wait_for_shard(address: Address, authkey: bytes, timeout: float) -> None:
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            conn = Client(address, authkey=authkey)
+        except (FileNotFoundError, ConnectionRefusedError):
+            if time.monotonic() > deadline:
+                raise ShardError(f"Shard at {address} did not start within {timeout:.0f}s.")
+            time.sleep(0.05)
+            continue
+        except multiprocessing.AuthenticationError:
+            raise ShardError(
+                f"Shard at {address} rejected the handshake: CANDIDATE_SHARD_AUTHKEY must be set "
+                "to the same value for the API and every shard."
+            )
+        conn.close()
+        return
+
+class LocalShardCluster:
+    """Shard processes on this machine, one Unix socket each, standing in for separate nodes."""
+
+    def __init__(self, authkey: bytes, socket_dir: Optional[str] = None, virtual_nodes: int = 128):
+        self.authkey = authkey
+        self._owns_socket_dir = not socket_dir
+        self.socket_dir = socket_dir or tempfile.mkdtemp(prefix="candidate-shards-")
+        os.makedirs(self.socket_dir, exist_ok=True)
+        self.virtual_nodes = virtual_nodes
+        self.processes: Dict[str, multiprocessing.Process] = {}
+        self.coordinator: Optional[ShardCoordinator] = None
+        self._context = multiprocessing.get_context("spawn")
+
+    def _spawn(self) -> Tuple[str, str]:
+        name = f"shard-{len(self.processes)}"
+        address = os.path.join(self.socket_dir, f"{name}.sock")
+        if os.path.exists(address):
+            os.unlink(address)
+        process = self._context.Process(target=serve_shard, args=(address, self.authkey), name=name, daemon=True)
+        process.start()
+        self.processes[name] = process
+        return name, address
+
+    def start(self, shard_count: int, timeout: float = 30.0) -> ShardCoordinator:
+        shards = dict(self._spawn() for _ in range(max(1, shard_count)))
+        for address in shards.values():
+            _wait_for_shard(address, self.authkey, timeout)
+        self.coordinator = ShardCoordinator(shards, self.authkey, self.virtual_nodes)
+        return self.coordinator
+
+    def add_shard(self, timeout: float = 30.0) -> int:
+        """Starts one more shard process and rebalances onto it. Returns the number of candidates moved."""
+        name, address = self._spawn()
+        _wait_for_shard(address, self.authkey, timeout)
+        return self.coordinator.add_shard(name, address)
+
+    def stop(self) -> None:
+        if self.coordinator is not None:
+            for client in self.coordinator.clients.values():
+                try:
+                    with Client(client.address, authkey=self.authkey) as conn:
+                        conn.send(("shutdown", ()))
+                        conn.recv()
+                except (OSError, EOFError):
+                    pass
+            self.coordinator.close()
+            self.coordinator = None
+        for process in self.processes.values():
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        self.processes.clear()
+        if self._owns_socket_dir:
+            shutil.rmtree(self.socket_dir, ignore_errors=True)
+
+    def __enter__(self) -> "LocalShardCluster":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+def shard_authkey(secret: str) -> bytes:
+    return hashlib.sha256(f"candidate-shards:{secret}".encode("utf-8")).digest()
+
+def configured_shard_authkey(settings, addresses: Sequence[Address]) -> bytes:
+    """
+    Authkey for shards listed in CANDIDATE_SHARD_ADDRESSES or started with
+    --listen. They run as separate processes and cannot share the API's
+    SECRET_KEY (random per process when unset), so CANDIDATE_SHARD_AUTHKEY is
+    required. Only LocalShardCluster, which hands its key to the processes
+    it spawns, falls back to SECRET_KEY.
+    """
+    if not settings.CANDIDATE_SHARD_AUTHKEY:
+        raise ValueError(
+            f"Candidate shards at {', '.join(map(str, addresses))} require CANDIDATE_SHARD_AUTHKEY, set to the same value "
+            "for the API and every shard. Shards unpickle requests, so the key must be a dedicated secret and shards "
+            "must only be reachable on a trusted network."
+        )
+    return shard_authkey(settings.CANDIDATE_SHARD_AUTHKEY)
+
+def create_shard_coordinator(settings) -> ShardCoordinator:
+    """
+    Connects to the shards listed in CANDIDATE_SHARD_ADDRESSES, or starts
+    CANDIDATE_SHARDS local shard processes (stopped at exit).
+    """
+    addresses = [parse_address(address.strip()) for address in settings.CANDIDATE_SHARD_ADDRESSES.split(",") if address.strip()]
+    if addresses:
+        authkey = configured_shard_authkey(settings, addresses)
+        for address in addresses:
+            _wait_for_shard(address, authkey, timeout=30.0)
+        return ShardCoordinator(
+            {f"shard-{i}": address for i, address in enumerate(addresses)},
+            authkey,
+            settings.CANDIDATE_SHARD_VIRTUAL_NODES,
+        )
+
+    # The cluster passes its key to the shard processes it spawns, so a per-process SECRET_KEY is fine here.
+    authkey = shard_authkey(settings.CANDIDATE_SHARD_AUTHKEY or settings.SECRET_KEY)
+    cluster = LocalShardCluster(authkey, settings.CANDIDATE_SHARD_SOCKET_DIR or None, settings.CANDIDATE_SHARD_VIRTUAL_NODES)
+    atexit.register(cluster.stop)
+    print(f"Started {settings.CANDIDATE_SHARDS} local candidate shards in {cluster.socket_dir}.")
+    return cluster.start(settings.CANDIDATE_SHARDS)
+
+def main(argv: Optional[List[str]] = None) -> None:
+    from app.core.config import settings
+
+    arg_parser = argparse.ArgumentParser(description="Run one candidate shard.")
+    arg_parser.add_argument("--listen", required=True, help="Unix socket path, or host:port on a trusted network")
+    args = arg_parser.parse_args(argv)
+    address = parse_address(args.listen)
+    serve_shard(address, configured_shard_authkey(settings, [address]))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,252 @@
+import heapq
+import threading
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+from app.schemas import CandidateProfile, JobDescription
+
+# Score slack (0-100 scale) when telling heap members from the rest after batched rescoring.
+FLOOR_TOLERANCE = 1e-3
+VACANCY_SHORTLIST = 4
+
+class _MatchSide:
+    """
+    One side of the match (jobs or candidates): a matrix of normalized
+    embeddings with reusable rows, plus a bounded min-heap of (score, id) per
+    item holding its best matches on the other side.
+    """
+
+    def __init__(self):
+        self.row_by_id: Dict[str, int] = {}
+        self.id_by_row: List[Optional[str]] = []
+        self.free_rows: List[int] = []
+        self.matrix: Optional[np.ndarray] = None
+        # Whether an item may appear in the other side's heaps (candidates only see public jobs).
+        self.eligible = np.zeros(0, dtype=bool)
+        # Score a new match must beat to enter the item's heap; +inf for free rows.
+        self.floor = np.zeros(0, dtype=np.float32)
+        self.heaps: Dict[str, List[Tuple[float, str]]] = {}
+        # For each item, the other side's items whose heaps currently contain it.
+        self.holders: Dict[str, Set[str]] = {}
+
+    @property
+    def size(self) -> int:
+        return len(self.id_by_row)
+
+    def live_rows(self) -> np.ndarray:
+        return self.matrix[:self.size] if self.matrix is not None else np.zeros((0, 0), dtype=np.float32)
+
+    def allocate(self, item_id: str, vector: np.ndarray, eligible: bool) -> int:
+        if self.matrix is None:
+            self.matrix = np.zeros((16, vector.shape[0]), dtype=np.float32)
+            self.eligible = np.zeros(16, dtype=bool)
+            self.floor = np.full(16, np.inf, dtype=np.float32)
+
+        if self.free_rows:
+            row = self.free_rows.pop()
+        else:
+            row = self.size
+            self.id_by_row.append(None)
+            if row >= self.matrix.shape[0]:
+                self._grow(self.matrix.shape[0] * 2)
+
+        self.matrix[row] = vector
+        self.eligible[row] = eligible
+        self.row_by_id[item_id] = row
+        self.id_by_row[row] = item_id
+        self.holders.setdefault(item_id, set())
+        return row
+
+    def _grow(self, capacity: int) -> None:
+        matrix = np.zeros((capacity, self.matrix.shape[1]), dtype=np.float32)
+        matrix[:self.matrix.shape[0]] = self.matrix
+        eligible = np.zeros(capacity, dtype=bool)
+        eligible[:self.eligible.shape[0]] = self.eligible
+        floor = np.full(capacity, np.inf, dtype=np.float32)
+        floor[:self.floor.shape[0]] = self.floor
+        self.matrix, self.eligible, self.floor = matrix, eligible, floor
+
+    def release(self, item_id: str) -> None:
+        row = self.row_by_id.pop(item_id)
+        self.matrix[row] = 0.0
+        self.eligible[row] = False
+        self.floor[row] = np.inf
+        self.id_by_row[row] = None
+        self.free_rows.append(row)
+
+class StandingMatchEngine:
+    """
+    Standing match queries between jobs and candidates, kept up to date
+    incrementally instead of re-ranking on every read:
+
+    - a new or updated job is scored once against the candidate matrix, and a
+      new candidate once against the job matrix;
+    - each job keeps its top_k candidates and each candidate its top_k public
+      jobs in bounded min-heaps; a new item is only pushed into the heaps whose
+      current minimum it beats, found with one vectorized comparison;
+    - removing or re-embedding an item only refills the slot it leaves in the
+      heaps that held it.
+
+    Scores use the same 0-100 cosine scale as score_candidates.
+    """
+
+    def __init__(self, top_k: int, min_score: float = 0.0):
+        self.top_k = max(1, top_k)
+        self.min_score = min_score
+        self._lock = threading.Lock()
+        self._jobs = _MatchSide()
+        self._candidates = _MatchSide()
+
+    def upsert_job(self, job: JobDescription) -> None:
+        self.upsert_jobs([job])
+
+    def upsert_jobs(self, jobs: Iterable[JobDescription]) -> None:
+        with self._lock:
+            for job in jobs:
+                self._upsert(self._jobs, self._candidates, job.id, job.embedding, job.is_public)
+
+    def remove_job(self, job_id: str) -> None:
+        with self._lock:
+            self._remove(self._jobs, self._candidates, job_id)
+
+    def upsert_candidate(self, profile: CandidateProfile) -> None:
+        self.upsert_candidates([profile])
+
+    def upsert_candidates(self, profiles: Iterable[CandidateProfile]) -> None:
+        with self._lock:
+            for profile in profiles:
+                self._upsert(self._candidates, self._jobs, profile.id, profile.embedding, True)
+
+    def top_candidates(self, job_id: str, limit: Optional[int] = None) -> List[Tuple[str, float]]:
+        """(candidate id, score) for the job's best matches, best first."""
+        return self._top(self._jobs, job_id, limit)
+
+    def top_jobs(self, candidate_id: str, limit: Optional[int] = None) -> List[Tuple[str, float]]:
+        """(job id, score) for the candidate's best matching public jobs, best first."""
+        return self._top(self._candidates, candidate_id, limit)
+
+    def match_jobs(self, embedding: Optional[List[float]], limit: Optional[int] = None) -> List[Tuple[str, float]]:
+        """
+        (job id, score) for the best matching public jobs of an embedding scored
+        on demand, best first, on the same terms as top_jobs. For candidates
+        whose embeddings live on the candidate shards rather than in the engine.
+        """
+        vector = np.asarray(embedding or (), dtype=np.float32)
+        norm = np.linalg.norm(vector) if vector.size else 0.0
+        if norm == 0:
+            return []
+        with self._lock:
+            if not self._jobs.size:
+                return []
+            scores = self._jobs.live_rows() @ (vector / norm) * 100
+            valid = np.flatnonzero(self._jobs.eligible[:self._jobs.size] & (scores > self.min_score))
+            matches = [(float(scores[row]), self._jobs.id_by_row[row]) for row in valid]
+        best = heapq.nlargest(limit or self.top_k, matches)
+        return [(job_id, round(score, 2)) for score, job_id in best]
+
+    def _top(self, side: _MatchSide, item_id: str, limit: Optional[int]) -> List[Tuple[str, float]]:
+        with self._lock:
+            heap = list(side.heaps.get(item_id, ()))
+        best = heapq.nlargest(limit or self.top_k, heap)
+        return [(other_id, round(score, 2)) for score, other_id in best]
+
+    def _upsert(self, side: _MatchSide, other: _MatchSide, item_id: str, embedding: Optional[List[float]], eligible: bool) -> None:
+        vector = np.asarray(embedding or (), dtype=np.float32)
+        norm = np.linalg.norm(vector) if vector.size else 0.0
+        if norm == 0:
+            # Nothing to match on; drop any previous state.
+            self._remove(side, other, item_id)
+            return
+
+        if item_id in side.row_by_id:
+            self._remove(side, other, item_id)
+        row = side.allocate(item_id, vector / norm, eligible)
+
+        scores = other.live_rows() @ side.matrix[row] * 100 if other.size else np.zeros(0, dtype=np.float32)
+        self._rebuild_heap(side, other, item_id, scores)
+
+        if not eligible or not other.size:
+            return
+        improved_rows = np.flatnonzero(scores > other.floor[:other.size])
+        for other_row in improved_rows:
+            self._push(other, side, other.id_by_row[other_row], item_id, float(scores[other_row]))
+
+    def _remove(self, side: _MatchSide, other: _MatchSide, item_id: str) -> None:
+        if item_id not in side.row_by_id:
+            return
+        for _, other_id in side.heaps.pop(item_id, ()):
+            other.holders[other_id].discard(item_id)
+        side.release(item_id)
+        self._fill_vacancies(other, side, side.holders.pop(item_id), item_id)
+
+    def _fill_vacancies(self, side: _MatchSide, other: _MatchSide, holder_ids: Set[str], removed_id: str) -> None:
+        """
+        Drops removed_id from the heaps of holder_ids and refills each with its
+        best match not already in the heap, scoring all holders in one matrix
+        product. Batched products round slightly differently from the scores
+        in the heaps, so a short list just below each floor is checked against
+        actual membership.
+        """
+        if not holder_ids:
+            return
+        holder_ids = list(holder_ids)
+        rows = [side.row_by_id[holder_id] for holder_id in holder_ids]
+        scores = side.matrix[rows] @ other.live_rows().T * 100
+        ceiling = side.floor[rows][:, None] + FLOOR_TOLERANCE
+        scores[~other.eligible[:other.size] | (scores > ceiling) | (scores <= self.min_score)] = -np.inf
+        shortlist = min(VACANCY_SHORTLIST, other.size)
+        best_rows = np.argpartition(-scores, shortlist - 1, axis=1)[:, :shortlist]
+
+        for holder_id, holder_scores, shortlisted in zip(holder_ids, scores, best_rows):
+            heap = side.heaps[holder_id] = [entry for entry in side.heaps[holder_id] if entry[1] != removed_id]
+            members = {other_id for _, other_id in heap}
+            replacement = None
+            for row in shortlisted[np.argsort(-holder_scores[shortlisted])]:
+                if not np.isfinite(holder_scores[row]):
+                    break
+                if other.id_by_row[row] not in members:
+                    replacement = (float(holder_scores[row]), other.id_by_row[row])
+                    break
+            else:
+                # Every shortlisted row is already a member (near-ties at the floor); rescore this heap.
+                self._rebuild_heap(side, other, holder_id, other.live_rows() @ side.matrix[side.row_by_id[holder_id]] * 100)
+                continue
+
+            if replacement is not None:
+                heap.append(replacement)
+                other.holders[replacement[1]].add(holder_id)
+            heapq.heapify(heap)
+            self._update_floor(side, holder_id)
+
+    def _rebuild_heap(self, side: _MatchSide, other: _MatchSide, item_id: str, scores: np.ndarray) -> None:
+        for _, other_id in side.heaps.get(item_id, ()):
+            other.holders[other_id].discard(item_id)
+
+        valid = np.flatnonzero(other.eligible[:other.size] & (scores > self.min_score))
+        if len(valid) > self.top_k:
+            valid = valid[np.argpartition(-scores[valid], self.top_k - 1)[:self.top_k]]
+        heap = [(float(scores[row]), other.id_by_row[row]) for row in valid]
+        heapq.heapify(heap)
+        side.heaps[item_id] = heap
+        for _, other_id in heap:
+            other.holders[other_id].add(item_id)
+        self._update_floor(side, item_id)
+
+    def _push(self, side: _MatchSide, other: _MatchSide, item_id: str, other_id: str, score: float) -> None:
+        heap = side.heaps.setdefault(item_id, [])
+        if len(heap) < self.top_k:
+            heapq.heappush(heap, (score, other_id))
+        else:
+            _, evicted_id = heapq.heapreplace(heap, (score, other_id))
+            other.holders[evicted_id].discard(item_id)
+        other.holders[other_id].add(item_id)
+        self._update_floor(side, item_id)
+
+    def _update_floor(self, side: _MatchSide, item_id: str) -> None:
+        heap = side.heaps[item_id]
+        side.floor[side.row_by_id[item_id]] = heap[0][0] if len(heap) >= self.top_k else self.min_score
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"jobs": len(self._jobs.row_by_id), "candidates": len(self._candidates.row_by_id), "top_k": self.top_k}
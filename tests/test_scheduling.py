@@ -0,0 +1,132 @@
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Tuple
+
+import pytest
+
+from app.schemas import InterviewHold
+from app.scheduling import (
+    SchedulingConflict,
+    SchedulingEngine,
+    candidate_key,
+    interviewer_key,
+    _to_epoch,
+)
+
+MONDAY = datetime(2026, 11, 2, tzinfo=timezone.utc)
+
+class StubCalendar:
+    """CalendarProvider stand-in with fixed busy times that records created and cancelled events."""
+
+    def __init__(self, busy: Dict[str, List[Tuple[datetime, datetime]]] = None):
+        self.busy = busy or {}
+        self.created: List[str] = []
+        self.cancelled: List[str] = []
+
+    def get_busy(self, participant: str, start: datetime, end: datetime) -> List[Tuple[datetime, datetime]]:
+        return [(s, e) for s, e in self.busy.get(participant, []) if s < end and e > start]
+
+    def create_event(self, hold: InterviewHold) -> str:
+        self.created.append(hold.id)
+        return f"event-{hold.id}"
+
+    def cancel_event(self, event_id: str) -> None:
+        self.cancelled.append(event_id)
+
+def at(hours: float, day: int = 0) -> int:
+    return _to_epoch(MONDAY + timedelta(days=day, hours=hours))
+
+def engine_with(calendar: StubCalendar) -> SchedulingEngine:
+    return SchedulingEngine(calendar, hold_ttl=timedelta(hours=1), slot_step=timedelta(minutes=15))
+
+def booked(engine: SchedulingEngine, participant: str) -> List[Tuple[int, int]]:
+    bookings = engine._bookings.get(participant)
+    return bookings.spans() if bookings is not None else []
+
+def test_find_slots_skips_calendar_busy_time_and_respects_availability():
+    calendar = StubCalendar({interviewer_key("a"): [(MONDAY + timedelta(hours=9), MONDAY + timedelta(hours=10))]})
+    engine = engine_with(calendar)
+    engine.set_availability(interviewer_key("b"), [(at(9), at(12))])
+
+    slots = engine.find_slots([interviewer_key("a"), interviewer_key("b"), candidate_key("c")], [(at(8), at(17))], timedelta(hours=1), limit=3)
+
+    assert slots == [(at(10), at(11)), (at(11), at(12))]
+
+def test_hold_with_repeated_interviewer_books_each_participant_once():
+    engine = engine_with(StubCalendar())
+
+    hold = engine.hold("job", "cand", ["a", "b", "a"], (at(9), at(10)))
+
+    assert hold.interviewer_ids == ["a", "b"]
+    assert booked(engine, interviewer_key("a")) == [(at(9), at(10))]
+    engine.release(hold.id)
+    assert booked(engine, interviewer_key("a")) == []
+    assert booked(engine, candidate_key("cand")) == []
+
+def test_conflicting_hold_books_nobody():
+    engine = engine_with(StubCalendar())
+    engine.hold("job", "first", ["b"], (at(9), at(10)))
+
+    with pytest.raises(SchedulingConflict):
+        engine.hold("job", "second", ["a", "b"], (at(9), at(10)))
+
+    assert booked(engine, interviewer_key("a")) == []
+    assert booked(engine, candidate_key("second")) == []
+    assert booked(engine, interviewer_key("b")) == [(at(9), at(10))]
+
+def test_confirm_and_release_go_through_the_calendar_provider():
+    calendar = StubCalendar()
+    engine = engine_with(calendar)
+    hold = engine.hold("job", "cand", ["a"], (at(9), at(10)))
+
+    engine.confirm(hold.id)
+    engine.release(hold.id)
+
+    assert calendar.created == [hold.id]
+    assert calendar.cancelled == [f"event-{hold.id}"]
+
+def test_schedule_many_never_double_books_the_panel():
+    engine = engine_with(StubCalendar())
+    engine.set_availability(interviewer_key("a"), [(at(9, day), at(12, day)) for day in range(3)])
+
+    holds = engine.schedule_many("job", ["c1", "c2", "c1", "c3"], ["a", "b", "b"], [(at(0), at(0, 3))], timedelta(hours=1))
+
+    spans = [(_to_epoch(hold.start), _to_epoch(hold.end)) for hold in holds.values() if hold is not None]
+    assert list(holds) == ["c1", "c2", "c3"]
+    assert len(set(spans)) == len(spans) == 3
+    assert booked(engine, interviewer_key("b")) == sorted(spans)
+
+def test_ten_interviewer_panel_over_four_weeks_matches_brute_force_quickly():
+    rng = random.Random(7)
+    days = [day for day in range(28) if (MONDAY + timedelta(days=day)).weekday() < 5]
+    panel = [interviewer_key(f"i{n}") for n in range(10)]
+    busy = {
+        participant: [
+            (start, start + timedelta(minutes=rng.choice((30, 60, 90))))
+            for day in days
+            for start in (MONDAY + timedelta(days=day, hours=8, minutes=15 * rng.randint(0, 36)) for _ in range(2))
+        ]
+        for participant in panel
+    }
+    engine = engine_with(StubCalendar(busy))
+    for participant in panel:
+        engine.set_availability(participant, [(at(8, day), at(18, day)) for day in days])
+    window = (at(0), at(0, 28))
+
+    start = time.perf_counter()
+    slots = engine.find_slots(panel, [window], timedelta(hours=1), limit=1000)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    def free(slot_start: int) -> bool:
+        slot_end = slot_start + 3600
+        return all(
+            any(at(8, day) <= slot_start and slot_end <= at(18, day) for day in days)
+            and not any(_to_epoch(s) < slot_end and _to_epoch(e) > slot_start for s, e in busy[participant])
+            for participant in panel
+        )
+
+    assert slots and all(free(slot_start) for slot_start, _ in slots)
+    # The first slot is the earliest aligned start that brute force finds.
+    assert slots[0][0] == next(t for t in range(window[0], window[1], 900) if free(t))
+    assert elapsed_ms < 250, f"find_slots took {elapsed_ms:.1f} ms"
@@ -0,0 +1,106 @@
+import random
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pytest
+
+from app.schemas import CandidateProfile, JobDescription
+from app.standing_matches import StandingMatchEngine
+
+DIMENSION = 8
+
+class BruteForce:
+    """Reference standing matches: every query rescored against every live item."""
+
+    def __init__(self, top_k: int, min_score: float):
+        self.top_k = top_k
+        self.min_score = min_score
+        self.jobs: Dict[str, Tuple[np.ndarray, bool]] = {}
+        self.candidates: Dict[str, np.ndarray] = {}
+
+    @staticmethod
+    def _vector(embedding: Optional[List[float]]) -> Optional[np.ndarray]:
+        vector = np.asarray(embedding or (), dtype=np.float64)
+        norm = np.linalg.norm(vector) if vector.size else 0.0
+        return vector / norm if norm > 0 else None
+
+    def upsert_job(self, job: JobDescription) -> None:
+        vector = self._vector(job.embedding)
+        if vector is None:
+            self.jobs.pop(job.id, None)
+        else:
+            self.jobs[job.id] = (vector, job.is_public)
+
+    def remove_job(self, job_id: str) -> None:
+        self.jobs.pop(job_id, None)
+
+    def upsert_candidate(self, profile: CandidateProfile) -> None:
+        vector = self._vector(profile.embedding)
+        if vector is None:
+            self.candidates.pop(profile.id, None)
+        else:
+            self.candidates[profile.id] = vector
+
+    def _best(self, query: np.ndarray, others: Dict[str, np.ndarray]) -> List[Tuple[str, float]]:
+        scored = [(other_id, float(query @ vector * 100)) for other_id, vector in others.items()]
+        scored = [(other_id, score) for other_id, score in scored if score > self.min_score]
+        return sorted(scored, key=lambda item: -item[1])[:self.top_k]
+
+    def top_candidates(self, job_id: str) -> List[Tuple[str, float]]:
+        return self._best(self.jobs[job_id][0], self.candidates)
+
+    def top_jobs(self, candidate_id: str) -> List[Tuple[str, float]]:
+        public = {job_id: vector for job_id, (vector, is_public) in self.jobs.items() if is_public}
+        return self._best(self.candidates[candidate_id], public)
+
+def assert_same_matches(actual: List[Tuple[str, float]], expected: List[Tuple[str, float]]) -> None:
+    assert [item_id for item_id, _ in actual] == [item_id for item_id, _ in expected]
+    assert [score for _, score in actual] == pytest.approx([score for _, score in expected], abs=0.01)
+
+@pytest.mark.parametrize("seed, top_k, min_score", [(1, 3, 0.0), (2, 5, 20.0), (3, 1, -100.0)])
+def test_random_updates_match_brute_force_after_every_step(seed: int, top_k: int, min_score: float):
+    rng = random.Random(seed)
+    engine = StandingMatchEngine(top_k=top_k, min_score=min_score)
+    reference = BruteForce(top_k, min_score)
+    job_ids = [f"job-{i}" for i in range(20)]
+    candidate_ids = [f"candidate-{i}" for i in range(40)]
+
+    def embedding() -> Optional[List[float]]:
+        # Occasionally missing, which removes the item from matching.
+        return None if rng.random() < 0.05 else [rng.gauss(0, 1) for _ in range(DIMENSION)]
+
+    for _ in range(300):
+        action = rng.random()
+        if action < 0.35:
+            job = JobDescription(id=rng.choice(job_ids), title="t", description="d", is_public=rng.random() < 0.8, embedding=embedding())
+            engine.upsert_job(job)
+            reference.upsert_job(job)
+        elif action < 0.45:
+            job_id = rng.choice(job_ids)
+            engine.remove_job(job_id)
+            reference.remove_job(job_id)
+        else:
+            profile = CandidateProfile(id=rng.choice(candidate_ids), embedding=embedding())
+            engine.upsert_candidate(profile)
+            reference.upsert_candidate(profile)
+
+        for job_id in reference.jobs:
+            assert_same_matches(engine.top_candidates(job_id), reference.top_candidates(job_id))
+        for candidate_id in reference.candidates:
+            assert_same_matches(engine.top_jobs(candidate_id), reference.top_jobs(candidate_id))
+        for job_id in set(job_ids) - set(reference.jobs):
+            assert engine.top_candidates(job_id) == []
+        for candidate_id in set(candidate_ids) - set(reference.candidates):
+            assert engine.top_jobs(candidate_id) == []
+
+def test_match_jobs_scores_an_embedding_like_top_jobs():
+    rng = np.random.default_rng(4)
+    engine = StandingMatchEngine(top_k=4)
+    for i in range(30):
+        engine.upsert_job(JobDescription(id=f"job-{i}", title="t", description="d", is_public=i % 3 != 0, embedding=rng.normal(size=DIMENSION).tolist()))
+    embedding = rng.normal(size=DIMENSION).tolist()
+    engine.upsert_candidate(CandidateProfile(id="candidate", embedding=embedding))
+
+    assert engine.match_jobs(embedding) == engine.top_jobs("candidate")
+    assert engine.match_jobs(embedding, limit=2) == engine.top_jobs("candidate", limit=2)
+    assert engine.match_jobs(None) == []
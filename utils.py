@@ -1,9 +1,12 @@
 import os
 import aiofiles
 from fastapi import UploadFile, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from app.core.config import settings
 from app.parser import extract_text_from_pdf
+from app.metrics import timed_stage
 
+@timed_stage("read_upload")
 async def read_uploaded_file_to_text(uploaded_file: UploadFile) -> str:
     temp_path = os.path.join(settings.UPLOAD_DIR, uploaded_file.filename)
     try:
@@ -12,7 +15,7 @@ async def read_uploaded_file_to_text(uploaded_file: UploadFile) -> str:
             await out_file.write(content)
 
         if uploaded_file.filename.lower().endswith(".pdf"):
-            file_text = extract_text_from_pdf(temp_path)
+            file_text = await run_in_threadpool(extract_text_from_pdf, temp_path)
         else:
             with open(temp_path, 'r', encoding='utf-8', errors='ignore') as f:
                 file_text = f.read()